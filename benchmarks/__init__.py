@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Suite de rendimiento de SIPU (ver benchmarks/run.py)."""
@@ -0,0 +1,115 @@
+# benchmarks/generador.py
+"""
+Generador determinista de cohortes sintéticas para medir rendimiento.
+Con la misma semilla y tamaño siempre produce exactamente los mismos datos.
+"""
+import math
+import random
+from collections import Counter
+
+from sipu.infrastructure.memory_repository import InMemorySipuRepository
+
+TAMANOS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+PERIODOS = [{"id": "2025-1", "nombre": "2025 - Primer Período"},
+            {"id": "2025-2", "nombre": "2025 - Segundo Período"}]
+CARRERAS = [{"id": "is", "nombre": "Ingeniería de Software"},
+            {"id": "ic", "nombre": "Ingeniería Civil"},
+            {"id": "it", "nombre": "Tecnologías de la Información"}]
+SEDES = [{"id": "principal", "nombre": "Sede Principal"},
+         {"id": "norte", "nombre": "Sede Norte"},
+         {"id": "sur", "nombre": "Sede Sur"},
+         {"id": "este", "nombre": "Sede Este"}]
+JORNADAS = ['Matutina', 'Vespertina', 'Nocturna']
+
+# Distribuciones sesgadas, parecidas a una temporada real de inscripciones
+PESOS_PERIODO = [0.65, 0.35]
+PESOS_CARRERA = [0.5, 0.2, 0.3]
+PESOS_JORNADA = [0.55, 0.3, 0.15]
+PESOS_SEDE = [0.5, 0.2, 0.2, 0.1]
+PESOS_ESTADO = {'Inscrito': 0.85, 'Incompleto': 0.1, 'Pendiente': 0.05}
+
+CAPACIDAD_LAB = 30
+CONTRASENA = 'clave'
+
+
+def generar_cohorte(tamano: int, semilla: int = 2025) -> InMemorySipuRepository:
+    """
+    Crea un repositorio en memoria con `tamano` aspirantes, catálogos, laboratorios
+    (capacidad suficiente para el examen más grande de cada sede) y un examen por
+    combinación periodo/carrera/jornada.
+    """
+    rnd = random.Random(semilla)
+    repo = InMemorySipuRepository()
+
+    repo.reemplazar_catalogo('periods', PERIODOS)
+    repo.reemplazar_catalogo('careers', CARRERAS)
+    repo.reemplazar_catalogo('sedes', SEDES)
+    repo.crear_usuario({"nombre": "Admin Principal", "correo": "admin1", "contrasena": "123",
+                        "rol": "admin", "estado": "Activo"})
+
+    estados = list(PESOS_ESTADO)
+    pesos_estado = list(PESOS_ESTADO.values())
+    cohortes = Counter()  # (periodo, carrera, jornada, sede) -> inscritos
+    documentos = []
+
+    for i in range(tamano):
+        periodo = rnd.choices(PERIODOS, PESOS_PERIODO)[0]['id']
+        carrera = rnd.choices(CARRERAS, PESOS_CARRERA)[0]['id']
+        jornada = rnd.choices(JORNADAS, PESOS_JORNADA)[0]
+        sede = rnd.choices(SEDES, PESOS_SEDE)[0]['id']
+        estado = rnd.choices(estados, pesos_estado)[0]
+        correo = f"aspirante{i:07d}@sipu.test"
+        completo = estado != 'Incompleto'
+
+        repo.crear_usuario({
+            'nombre': f"Aspirante {rnd.randrange(10**6):06d} {i}",
+            'correo': correo,
+            'contrasena': CONTRASENA,
+            'rol': 'aspirante',
+            'estado': estado,
+            'dni': f"{1700000000 + i}" if completo else None,
+            'periodo': periodo if completo else None,
+            'carrera': carrera if completo else None,
+            'jornada': jornada if completo else None,
+            'sede': sede if completo else None
+        })
+        if estado == 'Inscrito':
+            cohortes[(periodo, carrera, jornada, sede)] += 1
+        if i % 10 == 0:
+            documentos.append({'correo': correo, 'tipo': 'Cédula', 'nombre_archivo': f"cedula_{i}.pdf",
+                               'estado': 'Aprobado', 'obs': ''})
+
+    repo.agregar_documentos(documentos)
+
+    # Laboratorios: cada sede cubre el mayor examen que recibe
+    maximo_por_sede = Counter()
+    for (_, _, _, sede), inscritos in cohortes.items():
+        maximo_por_sede[sede] = max(maximo_por_sede[sede], inscritos)
+    laboratorios = []
+    for sede in SEDES:
+        for n in range(1, max(1, math.ceil(maximo_por_sede[sede['id']] / CAPACIDAD_LAB)) + 1):
+            laboratorios.append({'id': f"lab_{sede['id']}_{n}", 'nombre': f"Laboratorio {n}",
+                                 'sede': sede['id'], 'capacidad': CAPACIDAD_LAB})
+    repo.agregar_laboratorios(laboratorios)
+
+    for periodo in PERIODOS:
+        for carrera in CARRERAS:
+            for jornada in JORNADAS:
+                repo.crear_examen({
+                    'id': f"ex_{periodo['id']}_{carrera['id']}_{jornada[:3].lower()}",
+                    'periodo': periodo['id'], 'carrera': carrera['id'], 'jornada': jornada,
+                    'fecha': '2025-03-15', 'hora_inicio': '08:00', 'hora_fin': '10:00', 'estado': 'Activo'
+                })
+
+    return repo
+
+
+def examen_mas_grande(repo: InMemorySipuRepository) -> str:
+    """Retorna el id del examen con más aspirantes inscritos (el caso más costoso de distribuir)."""
+    conteo = Counter()
+    for doc in repo.listar_estudiantes_crudos():
+        if doc.get('estado') == 'Inscrito':
+            conteo[(doc['periodo'], doc['carrera'], doc['jornada'])] += 1
+    (periodo, carrera, jornada), _ = conteo.most_common(1)[0]
+    return repo.obtener_examenes_por_periodo_carrera_jornada(periodo, carrera, jornada)[0]['id']
@@ -0,0 +1,220 @@
+# benchmarks/run.py
+"""
+Mide las rutas principales de SIPU sobre una cohorte sintética y compara contra una línea base.
+
+Uso:
+    python -m benchmarks.run --tamano 10k
+    python -m benchmarks.run --tamano 100k --salida resultados.json
+    python -m benchmarks.run --tamano 10k --guardar-baseline
+
+Termina con código 1 si algún caso es más lento que la línea base más la tolerancia.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from sipu.application.asignacion import MotorAsignacion
+from sipu.application.services import SipuService
+from sipu.domain.models import Aspirante
+
+from .generador import CONTRASENA, TAMANOS, examen_mas_grande, generar_cohorte
+
+BASELINE_POR_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Operaciones por repetición en los casos que se miden por lotes
+LOGINS_POR_LOTE = 1000
+PDFS_POR_LOTE = 20
+
+
+def _medir(funcion, repeticiones: int) -> list:
+    """Ejecuta `funcion` varias veces y retorna la duración de cada ejecución en segundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def _resumen(tiempos: list, operaciones: int) -> dict:
+    mediana = statistics.median(tiempos)
+    return {
+        'operaciones': operaciones,
+        'repeticiones': len(tiempos),
+        'mediana_s': round(mediana, 6),
+        'minimo_s': round(min(tiempos), 6),
+        'por_operacion_ms': round(mediana * 1000 / operaciones, 4),
+    }
+
+
+def ejecutar(tamano: str, repeticiones: int, semilla: int) -> dict:
+    """Genera la cohorte, mide cada caso y retorna los resultados como diccionario."""
+    inicio = time.perf_counter()
+    repo = generar_cohorte(TAMANOS[tamano], semilla)
+    generacion = time.perf_counter() - inicio
+
+    # Sin caché de PDFs: se mide el renderizado, no la lectura de disco
+    servicio = SipuService(repo)
+    rnd = random.Random(semilla)
+    aspirantes = [d for d in repo.listar_estudiantes_crudos() if d.get('rol') == 'aspirante']
+    con_dni = [d for d in aspirantes if d.get('dni')]
+    examen_id = examen_mas_grande(repo)
+    casos = {}
+
+    # 1. Distribución del examen más grande
+    def distribuir():
+        exito, mensaje = servicio.distribuir_aspirantes_en_examenes(examen_id)
+        if not exito:
+            raise RuntimeError(f"La distribución falló: {mensaje}")
+    casos['distribuir_examen'] = _resumen(_medir(distribuir, repeticiones), 1)
+
+    # 1b. Motor de asignación sin base de datos: todos los inscritos de la cohorte en una sola pasada,
+    #     con laboratorios suficientes en cada sede
+    inscritos = [{'correo': d['correo'], 'nombre': d['nombre'], 'sede': d['sede']}
+                 for d in aspirantes if d.get('estado') == 'Inscrito']
+    por_sede = {}
+    for candidato in inscritos:
+        por_sede[candidato['sede']] = por_sede.get(candidato['sede'], 0) + 1
+    laboratorios = [{'id': f"lab_{sede}_{n}", 'nombre': f"Laboratorio {n}", 'sede': sede, 'capacidad': 30}
+                    for sede, total in por_sede.items() for n in range(total // 30 + 1)]
+
+    def motor_asignacion():
+        asignaciones, _ = MotorAsignacion(laboratorios).asignar('bench', 'd1', inscritos)
+        if len(asignaciones) != len(inscritos):
+            raise RuntimeError("El motor dejó aspirantes sin asiento")
+    casos['motor_asignacion'] = _resumen(_medir(motor_asignacion, repeticiones), len(inscritos))
+
+    # 2. Listado completo de aspirantes (vista de administración sin paginar)
+    casos['lista_aspirantes'] = _resumen(_medir(servicio.obtener_lista_aspirantes, repeticiones), 1)
+
+    # 2b. Rehidratación de modelos del dominio para toda la cohorte (Aspirante.desde_documentos)
+    def rehidratar():
+        Aspirante.desde_documentos(aspirantes)
+    casos['rehidratar_aspirantes'] = _resumen(_medir(rehidratar, repeticiones), len(aspirantes))
+
+    # 3. Inicios de sesión: 80% correctos, 10% con contraseña errónea, 10% con correo inexistente
+    intentos = []
+    for i in range(LOGINS_POR_LOTE):
+        doc = rnd.choice(aspirantes)
+        if i % 10 == 8:
+            intentos.append((doc['correo'], 'incorrecta'))
+        elif i % 10 == 9:
+            intentos.append((f"nadie{i}@sipu.test", CONTRASENA))
+        else:
+            intentos.append((doc['correo'], CONTRASENA))
+
+    def autenticar():
+        for correo, contrasena in intentos:
+            servicio.autenticar_usuario(correo, contrasena)
+    casos['autenticar_usuario'] = _resumen(_medir(autenticar, repeticiones), LOGINS_POR_LOTE)
+
+    # 4. Reportes PDF
+    muestra = rnd.sample(con_dni, min(PDFS_POR_LOTE, len(con_dni)))
+
+    def pdf_inscripcion():
+        for doc in muestra:
+            servicio.generar_reporte_pdf_por_dni(doc['dni'])
+    casos['pdf_inscripcion'] = _resumen(_medir(pdf_inscripcion, repeticiones), len(muestra))
+
+    def pdf_documentos():
+        for doc in muestra:
+            servicio.generar_reporte_documentos(doc['correo'])
+    casos['pdf_documentos'] = _resumen(_medir(pdf_documentos, repeticiones), len(muestra))
+
+    # 5. Calificación en lote de todo el examen distribuido
+    filas = [{'asignacion_id': a['id'], 'nombre': a.get('aspirante_nombre'),
+              'presentó': n % 20 != 0, 'nota': str(400 + n % 600), 'observaciones': ''}
+             for n, a in enumerate(repo.obtener_asignaciones_por_examen(examen_id))]
+
+    def calificar():
+        resultados = servicio.guardar_calificaciones_examen(examen_id, filas)
+        if not all(exito for _, exito, _ in resultados):
+            raise RuntimeError("Hubo calificaciones que no se guardaron")
+    casos['calificar_examen'] = _resumen(_medir(calificar, repeticiones), len(filas))
+
+    return {
+        'tamano': tamano,
+        'aspirantes': len(aspirantes),
+        'semilla': semilla,
+        'examen': examen_id,
+        'asignaciones': len(filas),
+        'generacion_s': round(generacion, 3),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'casos': casos,
+    }
+
+
+def comparar(resultados: dict, baseline: dict, tolerancia: float, umbral_s: float = 0.005) -> list:
+    """
+    Retorna [(caso, actual, base)] de los casos más lentos que base * (1 + tolerancia).
+    Se compara el mínimo (la medida menos afectada por ruido) y se ignoran diferencias
+    menores que `umbral_s`, que en casos de pocos milisegundos son solo ruido.
+    """
+    regresiones = []
+    base_casos = baseline.get(resultados['tamano'], {}).get('casos', {})
+    for caso, medida in resultados['casos'].items():
+        base = base_casos.get(caso)
+        if not base:
+            continue
+        actual, referencia = medida['minimo_s'], base['minimo_s']
+        if actual > referencia * (1 + tolerancia) and actual - referencia > umbral_s:
+            regresiones.append((caso, actual, referencia))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de SIPU con cohortes sintéticas.")
+    parser.add_argument('--tamano', choices=sorted(TAMANOS), default='10k')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--semilla', type=int, default=2025)
+    parser.add_argument('--salida', help="Archivo donde escribir los resultados en JSON (por defecto, stdout)")
+    parser.add_argument('--baseline', default=BASELINE_POR_DEFECTO)
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Fracción de lentitud permitida respecto a la línea base (0.25 = 25%%)")
+    parser.add_argument('--umbral-ms', type=float, default=5.0,
+                        help="Diferencia mínima, en milisegundos, para considerar una regresión")
+    parser.add_argument('--guardar-baseline', action='store_true',
+                        help="Guarda estos resultados como nueva línea base para el tamaño medido")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.tamano, args.repeticiones, args.semilla)
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    else:
+        print(texto)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.guardar_baseline:
+        baseline[args.tamano] = resultados
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.write('\n')
+        print(f"Línea base '{args.tamano}' guardada en {args.baseline}", file=sys.stderr)
+        return
+
+    if args.tamano not in baseline:
+        print(f"No hay línea base para '{args.tamano}'; nada que comparar.", file=sys.stderr)
+        return
+
+    regresiones = comparar(resultados, baseline, args.tolerancia, args.umbral_ms / 1000)
+    for caso, actual, base in regresiones:
+        print(f"REGRESIÓN {caso}: {actual:.4f}s (línea base {base:.4f}s, mínimos)", file=sys.stderr)
+    if regresiones:
+        sys.exit(1)
+    print(f"Sin regresiones respecto a la línea base '{args.tamano}'.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
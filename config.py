@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 
 # Carga las variables desde un archivo .env si existe
@@ -6,18 +7,83 @@ load_dotenv()
 
 class Config:
     """Configuración base del sistema SIPU."""
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'clave-secreta-para-desarrollo'
+    # Debe ser la misma en todos los workers y nodos: firma la cookie de sesión.
+    # Sin valor por defecto: create_app se niega a arrancar si falta (salvo en desarrollo)
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+
+    # Sesiones del lado del servidor: 'mongo' (compartida entre nodos), 'sqlite' (un nodo) o 'cookie'
+    SESION_ALMACEN = os.environ.get('SESION_ALMACEN', 'mongo')
+    SESION_SQLITE_RUTA = os.environ.get('SESION_SQLITE_RUTA', os.path.join('data', 'sesiones.sqlite3'))
+    PERMANENT_SESSION_LIFETIME = timedelta(hours=int(os.environ.get('SESION_HORAS', 8)))
+    SESSION_COOKIE_HTTPONLY = True
+    SESSION_COOKIE_SAMESITE = 'Lax'
     
     # Configuración de MongoDB
     MONGODB_URI = os.environ.get('MONGODB_URI') or 'mongodb://localhost:27017/'
-    DATABASE_NAME = 'sipu_db'
+    DATABASE_NAME = os.environ.get('DATABASE_NAME') or 'sipu_db'
+
+    # Pool de conexiones de MongoDB (ajustar con las métricas sipu_mongo_pool_* de /metrics)
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 300000))
+    # Cuánto espera un hilo por una conexión libre antes de fallar (en lugar de colgarse)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 30000))
+    # Compresión de red en orden de preferencia; se omiten los que no tengan su biblioteca instalada
+    MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zstd,snappy,zlib')
+    MONGO_ZLIB_LEVEL = int(os.environ.get('MONGO_ZLIB_LEVEL', 6))
+
+    # Caché de catálogos (periodos, carreras, sedes) en segundos; 0 la desactiva
+    CATALOGO_CACHE_TTL = int(os.environ.get('CATALOGO_CACHE_TTL', 300))
+
+    # Caché en disco de PDFs generados (se limita por tamaño, LRU)
+    PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR')  # None: carpeta temporal del sistema
+    PDF_CACHE_MAX_MB = int(os.environ.get('PDF_CACHE_MAX_MB', 256))
+
+    # Procesos para renderizar PDFs en exportaciones masivas (0 = un proceso por núcleo)
+    EXPORTACION_PROCESOS = int(os.environ.get('EXPORTACION_PROCESOS', 0))
+    # Carpeta de los archivos que generan las exportaciones en segundo plano (None: carpeta temporal)
+    EXPORTACION_DIR = os.environ.get('EXPORTACION_DIR')
+
+    # Hilos para trabajos en segundo plano (distribuciones, exportaciones)
+    TRABAJOS_HILOS = int(os.environ.get('TRABAJOS_HILOS', 2))
+
+    # Registro de consultas lentas de MongoDB (0 lo desactiva), con rotación de archivos
+    CONSULTA_LENTA_MS = float(os.environ.get('CONSULTA_LENTA_MS', 100))
+    CONSULTAS_LENTAS_LOG = os.environ.get('CONSULTAS_LENTAS_LOG', os.path.join('logs', 'consultas_lentas.log'))
+    CONSULTAS_LENTAS_MAX_MB = int(os.environ.get('CONSULTAS_LENTAS_MAX_MB', 10))
+    CONSULTAS_LENTAS_RESPALDOS = int(os.environ.get('CONSULTAS_LENTAS_RESPALDOS', 5))
+
+    # Carpeta compartida por los workers para que /metrics sume todos los procesos (None: solo el propio)
+    METRICAS_DIR = os.environ.get('SIPU_METRICAS_DIR')
     
     # Configuración de Flask
-    DEBUG = True
+    DEBUG = False
     TESTING = False
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    # Clave conocida solo para desarrollo local; nunca se usa fuera de esta configuración
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'clave-secreta-para-desarrollo'
 
 class ProductionConfig(Config):
-    DEBUG = False
\ No newline at end of file
+    DEBUG = False
+    SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', '1') == '1'
+    # Conexiones listas desde el arranque para no pagar el handshake en las primeras peticiones
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 5))
+
+# Configuraciones disponibles; se elige con la variable de entorno SIPU_CONFIG
+configuraciones = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+}
+
+def obtener_configuracion(nombre: str = None):
+    """Retorna la clase de configuración por nombre (o la de SIPU_CONFIG; desarrollo por defecto)."""
+    nombre = nombre or os.environ.get('SIPU_CONFIG', 'development')
+    if nombre not in configuraciones:
+        # Un nombre mal escrito no debe terminar en la configuración de desarrollo
+        raise ValueError(f"Configuración desconocida: {nombre} (opciones: {', '.join(configuraciones)})")
+    return configuraciones[nombre]
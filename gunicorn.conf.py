@@ -0,0 +1,41 @@
+# refactorizacion/gunicorn.conf.py
+"""Configuración de gunicorn para SIPU (todo se puede sobreescribir con variables de entorno)."""
+import multiprocessing
+import os
+
+bind = os.environ.get('SIPU_BIND', '0.0.0.0:8000')
+
+# Regla habitual: 2 workers por CPU + 1
+workers = int(os.environ.get('SIPU_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('SIPU_HILOS', 4))
+
+# La app se importa una vez en el maestro y los workers la heredan con fork (copy-on-write).
+# Es seguro porque MongoDBClient, el contenedor de servicios y los pools se reinician en cada hijo.
+preload_app = os.environ.get('SIPU_PRELOAD', '1') == '1'
+
+timeout = int(os.environ.get('SIPU_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('SIPU_GRACEFUL_TIMEOUT', 30))
+# Reciclar workers acota el crecimiento de memoria, pero los trabajos en segundo plano
+# (distribuciones, exportaciones) corren dentro del worker: reciclarlo los corta a medias
+# y quedan como fallidos. Por eso está desactivado (0); si se activa, hágalo con un
+# SIPU_GRACEFUL_TIMEOUT mayor que el trabajo más largo (el worker los espera al salir).
+max_requests = int(os.environ.get('SIPU_MAX_PETICIONES', 0))
+max_requests_jitter = 200 if max_requests else 0
+
+accesslog = '-'
+errorlog = '-'
+
+# Métricas de todos los workers en /metrics: cada uno deja su instantánea en esta carpeta
+if not os.environ.get('SIPU_METRICAS_DIR'):
+    import tempfile
+    os.environ['SIPU_METRICAS_DIR'] = tempfile.mkdtemp(prefix='sipu_metricas_')
+
+
+def on_starting(server):
+    from sipu.infrastructure.metricas import limpiar_directorio_metricas
+    limpiar_directorio_metricas(os.environ['SIPU_METRICAS_DIR'])
+
+
+def child_exit(server, worker):
+    from sipu.infrastructure.metricas import retirar_proceso_metricas
+    retirar_proceso_metricas(os.environ['SIPU_METRICAS_DIR'], worker.pid)
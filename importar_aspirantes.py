@@ -0,0 +1,52 @@
+# refactorizacion/importar_aspirantes.py
+"""
+Importa aspirantes en lote desde un CSV (mismo formato que /admin/importar/aspirantes).
+Uso: python importar_aspirantes.py aspirantes.csv [--reporte errores.csv] [--lote 1000]
+"""
+import argparse
+import csv
+import sys
+from config import obtener_configuracion
+from sipu.application.importacion import ImportadorAspirantes, ENCABEZADOS_ERRORES, TAMANO_LOTE_IMPORTACION
+from sipu.application.services import SipuService
+from sipu.infrastructure.database import MongoDBClient, opciones_cliente
+from sipu.infrastructure.repositories import MongoSipuRepository
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa aspirantes desde un CSV.")
+    parser.add_argument('archivo', help="CSV con columnas nombre, correo, contrasena [, dni, periodo, carrera, jornada, sede]")
+    parser.add_argument('--reporte', default='errores_importacion.csv', help="CSV donde se escriben las filas con errores")
+    parser.add_argument('--lote', type=int, default=TAMANO_LOTE_IMPORTACION, help="Filas por escritura masiva")
+    args = parser.parse_args()
+
+    # Misma base de datos y opciones de conexión que la aplicación (config.py / SIPU_CONFIG)
+    config = obtener_configuracion()
+    ajustes = {clave: getattr(config, clave) for clave in dir(config) if clave.isupper()}
+    MongoDBClient.configurar(config.MONGODB_URI, config.DATABASE_NAME, opciones_cliente(ajustes))
+    repositorio = MongoSipuRepository()
+    # Los inscritos importados reciben asiento si su examen ya tiene distribución publicada
+    importador = ImportadorAspirantes(repositorio, tamano_lote=args.lote,
+                                      asignar_asientos=SipuService(repositorio).asignar_asientos_importados)
+
+    def progreso(porcentaje, mensaje=None):
+        if mensaje:
+            print(f">>> {mensaje}")
+
+    print(f">>> Importando aspirantes desde {args.archivo}...")
+    with open(args.archivo, encoding='utf-8-sig', newline='') as archivo:
+        resumen = importador.importar(archivo, progreso=progreso)
+
+    print(f">>> {resumen['leidas']} filas leídas, {resumen['creados']} aspirantes creados, "
+          f"{resumen['asientos']} asientos asignados, {resumen['con_errores']} con errores.")
+    if resumen['con_errores'] > len(resumen['errores']):
+        print(f">>> El reporte incluye solo las primeras {len(resumen['errores'])} filas con errores")
+    if resumen['errores']:
+        with open(args.reporte, 'w', encoding='utf-8-sig', newline='') as reporte:
+            escritor = csv.writer(reporte)
+            escritor.writerow(ENCABEZADOS_ERRORES)
+            escritor.writerows(['' if valor is None else valor for valor in error] for error in resumen['errores'])
+        print(f">>> Filas con errores en {args.reporte}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
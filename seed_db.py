@@ -1,5 +1,9 @@
 # refactorizacion/seed_db.py
-from sipu.infrastructure.database import MongoDBClient
+import sys
+from config import obtener_configuracion
+from sipu.infrastructure.database import MongoDBClient, opciones_cliente
+from sipu.infrastructure.indices import asegurar_indices, imprimir_reporte, verificar_planes
+from sipu.infrastructure.repositories import MongoSipuRepository
 
 def seed_admin(db):
     """Crea el usuario administrador inicial."""
@@ -18,15 +22,15 @@ def seed_admin(db):
     )
     print(">>> Usuario 'admin1' configurado.")
 
-def seed_catalogos(db):
+def seed_catalogos(repo):
     """Crea los datos para los desplegables de inscripción."""
     # Configuración de Períodos
     periodos = [
         {"id": "2025-1", "nombre": "2025 - Primer Período", "activo": True},
         {"id": "2025-2", "nombre": "2025 - Segundo Período", "activo": True}
     ]
-    db.periods.delete_many({})  # Limpiamos para evitar duplicados
-    db.periods.insert_many(periodos)
+    # Reemplazamos el catálogo completo (evita duplicados e invalida la caché)
+    repo.reemplazar_catalogo('periods', periodos)
     
     # Configuración de Carreras
     carreras = [
@@ -34,8 +38,7 @@ def seed_catalogos(db):
         {"id": "ic", "nombre": "Ingeniería Civil"},
         {"id": "it", "nombre": "Tecnologías de la Información"}
     ]
-    db.careers.delete_many({})
-    db.careers.insert_many(carreras)
+    repo.reemplazar_catalogo('careers', carreras)
     
     # Configuración de Sedes
     sedes = [
@@ -44,8 +47,7 @@ def seed_catalogos(db):
         {"id": "sur", "nombre": "Sede Sur"},
         {"id": "este", "nombre": "Sede Este"}
     ]
-    db.sedes.delete_many({})
-    db.sedes.insert_many(sedes)
+    repo.reemplazar_catalogo('sedes', sedes)
     
     print(">>> Catálogos de Período, Carrera y Sede configurados.")
 
@@ -98,17 +100,43 @@ def seed_laboratorios(db):
     
     print(">>> Laboratorios configurados (5 labs con capacidad total de 80 máquinas).")
 
+def seed_indices(db, reparar=False, verificar=False):
+    """Crea los índices declarados y, opcionalmente, verifica que cada consulta use IXSCAN."""
+    imprimir_reporte(asegurar_indices(db, reparar=reparar))
+    print(">>> Índices verificados.")
+
+    if verificar:
+        sin_indice = 0
+        for descripcion, usa_indice, etapas in verificar_planes(db):
+            print(f"    {'IXSCAN ' if usa_indice else 'SIN ÍNDICE'} {descripcion}: {' > '.join(etapas)}")
+            sin_indice += 0 if usa_indice else 1
+        if sin_indice:
+            print(f">>> {sin_indice} consultas del repositorio no usan índice.")
+            return False
+    return True
+
 def main():
     print(">>> Iniciando proceso de seed...")
+    # Misma base de datos y opciones de conexión que la aplicación (config.py / SIPU_CONFIG)
+    config = obtener_configuracion()
+    ajustes = {clave: getattr(config, clave) for clave in dir(config) if clave.isupper()}
+    MongoDBClient.configurar(config.MONGODB_URI, config.DATABASE_NAME, opciones_cliente(ajustes))
     # Obtenemos la conexión única a través del Singleton configurado en infrastructure
     client = MongoDBClient()
     db = client.database
+    repo = MongoSipuRepository()
     
     seed_admin(db)
-    seed_catalogos(db)
+    seed_catalogos(repo)
     seed_laboratorios(db)
+    # --reparar-indices recrea los índices que difieren; --verificar-indices revisa los planes
+    planes_ok = seed_indices(db,
+                             reparar='--reparar-indices' in sys.argv,
+                             verificar='--verificar-indices' in sys.argv)
     
     print(">>> Base de datos SIPU inicializada exitosamente.")
+    if not planes_ok:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
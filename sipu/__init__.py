@@ -2,12 +2,63 @@
 from flask import Flask
 import os
 
-def create_app():
+def create_app(config_class=None, fabrica_repositorio=None):
+    """
+    App Factory. No abre conexiones ni crea hilos: el repositorio, el servicio y los trabajos
+    se construyen en cada proceso la primera vez que se usan (seguro con servidores pre-fork).
+    `fabrica_repositorio` permite inyectar otro ISipuRepository (por defecto, MongoDB).
+    """
     app = Flask(__name__, 
                 template_folder='templates', 
                 static_folder='static')
     
-    app.secret_key = os.urandom(24)
+    # Configuración (config.py): por defecto la indicada en SIPU_CONFIG
+    from config import obtener_configuracion
+    app.config.from_object(config_class or obtener_configuracion())
+    
+    # Clave estable (no aleatoria por proceso): una cookie firmada por un worker la acepta cualquier otro
+    if not app.config.get('SECRET_KEY'):
+        raise RuntimeError("Falta SECRET_KEY en la configuración (variable de entorno SECRET_KEY)")
+
+    # Sesión del lado del servidor (la cookie solo lleva el identificador)
+    from .infrastructure.sesiones import registrar_sesiones
+    registrar_sesiones(app)
+
+    # Conexión a MongoDB con el pool, timeouts y compresión configurados (antes de la primera consulta)
+    from .infrastructure.database import MongoDBClient, opciones_cliente
+    MongoDBClient.configurar(app.config['MONGODB_URI'], app.config['DATABASE_NAME'],
+                             opciones_cliente(app.config))
+
+    # Cachés y registros de proceso
+    from .infrastructure.cache import CatalogoCache
+    from .infrastructure.consultas_lentas import RegistroConsultasLentas
+    CatalogoCache().configurar(app.config['CATALOGO_CACHE_TTL'])
+    RegistroConsultasLentas().configurar(umbral_ms=app.config['CONSULTA_LENTA_MS'],
+                                         ruta=app.config['CONSULTAS_LENTAS_LOG'],
+                                         max_bytes=app.config['CONSULTAS_LENTAS_MAX_MB'] * 1024 * 1024,
+                                         respaldos=app.config['CONSULTAS_LENTAS_RESPALDOS'])
+
+    # Índices de MongoDB: se crean si faltan y se reportan diferencias (idempotente)
+    # (solo con el repositorio de MongoDB; la conexión usada se cierra para no heredarla en un fork)
+    if fabrica_repositorio is None and os.environ.get('SIPU_ASEGURAR_INDICES', '1') == '1':
+        from .infrastructure.indices import asegurar_indices, imprimir_reporte
+        try:
+            imprimir_reporte(asegurar_indices(MongoDBClient().database))
+        except Exception as e:
+            print(f"Error al asegurar índices: {e}")
+        finally:
+            MongoDBClient.cerrar()
+
+    # Latencia por endpoint y comandos de MongoDB por petición, expuestos en /metrics
+    # (antes del contenedor: su teardown debe correr después del cierre de la petición)
+    from .infrastructure.metricas import registrar_metricas
+    registrar_metricas(app)
+
+    # Dependencias de la aplicación (perezosas, una vez por proceso)
+    from .infrastructure.contenedor import registrar_contenedor
+    from .infrastructure.exportacion import configurar_procesos
+    registrar_contenedor(app, fabrica_repositorio)
+    configurar_procesos(app.config.get('EXPORTACION_PROCESOS'))
 
     # CORRECCIÓN: Importa desde la nueva ruta de infraestructura
     from .infrastructure.routes.sipu_routes import bp as main_bp
@@ -16,5 +67,5 @@ def create_app():
     # Registro de Blueprints
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp)
-    
+
     return app
\ No newline at end of file
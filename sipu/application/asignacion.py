@@ -0,0 +1,99 @@
+# sipu/application/asignacion.py
+"""
+Motor de asignación de asientos para exámenes.
+Cada aspirante se ubica en un laboratorio de SU sede, respetando la capacidad de cada laboratorio.
+Es lógica pura (sin base de datos): recibe candidatos y laboratorios y retorna las asignaciones.
+"""
+from typing import Iterable, List
+
+
+class IndiceCapacidad:
+    """Laboratorios de una sede en orden fijo, con su capacidad total precalculada."""
+
+    def __init__(self, sede: str, laboratorios: list):
+        self.sede = sede
+        # Orden estable por id: la misma entrada produce siempre los mismos asientos
+        self.laboratorios = sorted((lab for lab in laboratorios if lab.get('capacidad', 0) > 0),
+                                   key=lambda lab: lab['id'])
+        self.capacidad = sum(lab['capacidad'] for lab in self.laboratorios)
+
+    def asientos(self):
+        """Genera (laboratorio, num_computadora) en orden de llenado."""
+        for lab in self.laboratorios:
+            for num_computadora in range(1, lab['capacidad'] + 1):
+                yield lab, num_computadora
+
+
+class MotorAsignacion:
+    """
+    Asigna aspirantes a asientos agrupándolos por sede.
+    Los índices de capacidad por sede se construyen una sola vez y sirven para cualquier examen.
+    Costo: O(L log L) al construirlo (L = laboratorios) y O(n) por distribución (n = aspirantes).
+    """
+
+    def __init__(self, laboratorios: list):
+        por_sede = {}
+        for lab in laboratorios:
+            por_sede.setdefault(lab.get('sede'), []).append(lab)
+        self.indices = {sede: IndiceCapacidad(sede, labs) for sede, labs in por_sede.items()}
+
+    @property
+    def capacidad_total(self) -> int:
+        return sum(indice.capacidad for indice in self.indices.values())
+
+    def asignar(self, examen_id: str, distribucion_id: str, candidatos: Iterable[dict]) -> tuple:
+        """
+        Retorna (asignaciones, resumen) donde resumen es
+        {sede: {'aspirantes', 'capacidad', 'asignados', 'excedente'}}.
+        Los aspirantes que no caben en su sede (o cuya sede no tiene laboratorios) quedan como excedente.
+        """
+        # 1. Agrupar candidatos por sede, conservando el orden de llegada
+        por_sede = {}
+        for candidato in candidatos:
+            por_sede.setdefault(candidato.get('sede'), []).append(candidato)
+
+        # 2. Llenar los laboratorios de cada sede en orden
+        asignaciones: List[dict] = []
+        resumen = {}
+        for sede, grupo in por_sede.items():
+            indice = self.indices.get(sede)
+            asignados = 0
+            if indice is not None:
+                for candidato, (lab, num_computadora) in zip(grupo, indice.asientos()):
+                    asignaciones.append({
+                        'id': f"asig_{examen_id}_{distribucion_id}_{candidato['correo']}",
+                        'examen_id': examen_id,
+                        'distribucion_id': distribucion_id,
+                        'aspirante_correo': candidato['correo'],
+                        'aspirante_nombre': candidato.get('nombre'),
+                        'lab_id': lab['id'],
+                        'lab_nombre': lab['nombre'],
+                        'num_computadora': num_computadora,
+                        'sede': lab['sede'],
+                        'estado': 'Pendiente'
+                    })
+                    asignados += 1
+            resumen[sede] = {
+                'aspirantes': len(grupo),
+                'capacidad': indice.capacidad if indice is not None else 0,
+                'asignados': asignados,
+                'excedente': len(grupo) - asignados
+            }
+        return asignaciones, resumen
+
+    def ocupacion(self, asignaciones: list) -> list:
+        """
+        Contadores iniciales por laboratorio (todos, aunque queden vacíos) para una distribución.
+        Con ellos, las inscripciones tardías toman el siguiente asiento libre sin redistribuir.
+        """
+        ocupados = {}
+        for asignacion in asignaciones:
+            ocupados[asignacion['lab_id']] = ocupados.get(asignacion['lab_id'], 0) + 1
+        return [{'lab_id': lab['id'], 'lab_nombre': lab['nombre'], 'sede': lab['sede'],
+                 'capacidad': lab['capacidad'], 'ocupados': ocupados.get(lab['id'], 0)}
+                for indice in self.indices.values() for lab in indice.laboratorios]
+
+
+def sedes_con_excedente(resumen: dict) -> dict:
+    """Filtra el resumen de una asignación y deja solo las sedes donde no cupieron todos."""
+    return {sede: datos for sede, datos in resumen.items() if datos['excedente'] > 0}
@@ -0,0 +1,158 @@
+# sipu/application/importacion.py
+"""
+Importación masiva de aspirantes desde CSV.
+El archivo se lee en flujo (fila a fila) y se procesa por lotes: cada lote se valida, se buscan
+sus duplicados con una sola consulta y se escribe con una sola escritura masiva.
+"""
+import csv
+import re
+from typing import Iterable, List
+
+from ..domain.interfaces import ISipuRepository
+
+# Columnas reconocidas del CSV (nombre, correo y contrasena son obligatorias)
+COLUMNAS = ('nombre', 'correo', 'contrasena', 'dni', 'periodo', 'carrera', 'jornada', 'sede')
+OBLIGATORIAS = ('nombre', 'correo', 'contrasena')
+# Con todos estos campos el aspirante queda 'Inscrito'; si falta alguno, 'Incompleto'
+CAMPOS_INSCRIPCION = ('dni', 'periodo', 'carrera', 'jornada', 'sede')
+JORNADAS = ('matutina', 'vespertina', 'nocturna')
+
+ENCABEZADOS_ERRORES = ['Fila', 'Correo', 'DNI', 'Error']
+
+TAMANO_LOTE_IMPORTACION = 1000
+# Filas con error que se guardan para el reporte (las demás solo se cuentan)
+MAX_ERRORES_REPORTE = 10000
+
+_CORREO_VALIDO = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+_DNI_VALIDO = re.compile(r'^[0-9A-Za-z-]{5,20}$')
+
+
+class ImportadorAspirantes:
+    """
+    Valida y guarda aspirantes desde las líneas de un CSV.
+    Los duplicados dentro del archivo se detectan con conjuntos en memoria;
+    los duplicados contra la base de datos, con una búsqueda por lote.
+    Los que llegan inscritos pasan por `asignar_asientos(docs) -> int` (si se indica), igual que
+    una inscripción por formulario: si su examen ya fue distribuido, reciben asiento.
+    """
+
+    def __init__(self, repository: ISipuRepository, tamano_lote: int = TAMANO_LOTE_IMPORTACION,
+                 asignar_asientos=None, max_errores: int = MAX_ERRORES_REPORTE):
+        self.repository = repository
+        self.tamano_lote = tamano_lote
+        self.asignar_asientos = asignar_asientos
+        self.max_errores = max_errores
+
+    def _anotar_error(self, resumen: dict, error: tuple):
+        resumen['con_errores'] += 1
+        if len(resumen['errores']) < self.max_errores:
+            resumen['errores'].append(error)
+
+    def importar(self, lineas: Iterable[str], progreso=None) -> dict:
+        """
+        Importa los aspirantes. `lineas` es cualquier iterable de texto (un archivo abierto, por ejemplo).
+        Retorna {'leidas', 'creados', 'asientos', 'con_errores', 'errores': [(fila, correo, dni, motivo)]}
+        ('errores' guarda como máximo max_errores filas; 'con_errores' las cuenta todas).
+        """
+        progreso = progreso or (lambda porcentaje, mensaje=None: None)
+        resumen = {'leidas': 0, 'creados': 0, 'asientos': 0, 'con_errores': 0, 'errores': []}
+
+        lector = csv.DictReader(lineas)
+        encabezados = [(c or '').strip().lower().lstrip('\ufeff') for c in (lector.fieldnames or [])]
+        faltantes = [c for c in OBLIGATORIAS if c not in encabezados]
+        if faltantes:
+            self._anotar_error(resumen, (1, None, None, f"Faltan columnas obligatorias: {', '.join(faltantes)}"))
+            return resumen
+        lector.fieldnames = encabezados
+
+        # Catálogos válidos (desde la caché) y lo ya visto en este archivo
+        catalogos = {
+            'periodo': self.repository.obtener_mapa_periodos(),
+            'carrera': self.repository.obtener_mapa_carreras(),
+            'sede': self.repository.obtener_mapa_sedes(),
+        }
+        vistos_correo, vistos_dni = set(), set()
+
+        lote = []
+        # La fila 1 es el encabezado
+        for numero, fila in enumerate(lector, 2):
+            resumen['leidas'] += 1
+            doc, motivo = self._validar_fila(fila, catalogos)
+            if doc is not None:
+                if doc['correo'] in vistos_correo:
+                    motivo = "Correo repetido en el archivo"
+                elif doc.get('dni') and doc['dni'] in vistos_dni:
+                    motivo = "DNI repetido en el archivo"
+            if motivo:
+                self._anotar_error(resumen, (numero, (fila.get('correo') or '').strip(),
+                                             (fila.get('dni') or '').strip(), motivo))
+                continue
+
+            vistos_correo.add(doc['correo'])
+            if doc.get('dni'):
+                vistos_dni.add(doc['dni'])
+            lote.append((numero, doc))
+            if len(lote) >= self.tamano_lote:
+                self._guardar_lote(lote, resumen)
+                lote = []
+                progreso(None, f"{resumen['leidas']} filas procesadas, {resumen['creados']} aspirantes creados")
+
+        if lote:
+            self._guardar_lote(lote, resumen)
+        resumen['errores'].sort(key=lambda error: error[0])
+        return resumen
+
+    @staticmethod
+    def _validar_fila(fila: dict, catalogos: dict) -> tuple:
+        """Retorna (documento, None) si la fila es válida o (None, motivo) si no."""
+        valores = {c: (fila.get(c) or '').strip() for c in COLUMNAS}
+        vacias = [c for c in OBLIGATORIAS if not valores[c]]
+        if vacias:
+            return None, f"Campos obligatorios vacíos: {', '.join(vacias)}"
+
+        if not _CORREO_VALIDO.match(valores['correo']):
+            return None, "Correo no válido"
+        if valores['dni'] and not _DNI_VALIDO.match(valores['dni']):
+            return None, "DNI no válido"
+        if valores['jornada']:
+            valores['jornada'] = valores['jornada'].lower()
+            if valores['jornada'] not in JORNADAS:
+                return None, f"Jornada no válida. Use: {', '.join(JORNADAS)}"
+        for campo, mapa in catalogos.items():
+            if valores[campo] and valores[campo] not in mapa:
+                return None, f"{campo.capitalize()} '{valores[campo]}' no existe"
+
+        doc = {c: (valores[c] or None) for c in COLUMNAS}
+        doc['rol'] = 'aspirante'
+        doc['estado'] = 'Inscrito' if all(doc[c] for c in CAMPOS_INSCRIPCION) else 'Incompleto'
+        return doc, None
+
+    def _guardar_lote(self, lote: List[tuple], resumen: dict):
+        """Descarta los que ya existen (una consulta) y escribe el resto (una escritura)."""
+        correos = [doc['correo'] for _, doc in lote]
+        dnis = [doc['dni'] for _, doc in lote if doc.get('dni')]
+        correos_existentes, dnis_existentes = self.repository.buscar_aspirantes_existentes(correos, dnis)
+
+        nuevos = []
+        for numero, doc in lote:
+            if doc['correo'] in correos_existentes:
+                self._anotar_error(resumen, (numero, doc['correo'], doc.get('dni'), "El correo ya está registrado"))
+            elif doc.get('dni') and doc['dni'] in dnis_existentes:
+                self._anotar_error(resumen, (numero, doc['correo'], doc.get('dni'), "El DNI ya está registrado"))
+            else:
+                nuevos.append((numero, doc))
+        if not nuevos:
+            return
+
+        # Otro proceso pudo crear alguno entre la consulta y la escritura: el repositorio lo reporta
+        resultado = self.repository.importar_aspirantes([doc for _, doc in nuevos])
+        errores = resultado.get('errores', {})
+        for numero, doc in nuevos:
+            if doc['correo'] in errores:
+                self._anotar_error(resumen, (numero, doc['correo'], doc.get('dni'), errores[doc['correo']]))
+        resumen['creados'] += resultado.get('insertados', 0)
+
+        inscritos = [doc for _, doc in nuevos if doc['estado'] == 'Inscrito' and doc['correo'] not in errores]
+        if inscritos and self.asignar_asientos is not None:
+            resumen['asientos'] += self.asignar_asientos(inscritos)
+
@@ -0,0 +1,213 @@
+# sipu/application/reportes.py
+"""
+Diseño de los reportes PDF del sistema.
+Son funciones puras (datos -> bytes): no consultan la base de datos, así que pueden
+ejecutarse en otros procesos y su resultado puede guardarse en caché por contenido.
+"""
+import io
+from datetime import datetime
+from fpdf import FPDF
+
+# Versiones de diseño: cambiarlas invalida los PDFs guardados en caché
+VERSION_REPORTE_INSCRIPCION = 'inscripcion-v1'
+VERSION_REPORTE_DOCUMENTOS = 'documentos-v1'
+
+
+def construir_pdf_inscripcion(datos: dict) -> bytes:
+    """
+    Reporte de inscripción (fpdf2).
+    `datos` trae nombre, correo, dni, jornada y los nombres ya traducidos
+    periodo_nombre, carrera_nombre y sede_nombre.
+    """
+    pdf = FPDF()
+    pdf.add_page()
+    
+    # Encabezado
+    pdf.set_font("Arial", "B", 20)
+    pdf.cell(0, 15, "REPORTE DE INSCRIPCIÓN", ln=True, align='C')
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(0, 8, "Sistema de Inscripción SIPU", ln=True, align='C')
+    pdf.ln(5)
+    
+    # Línea separadora
+    pdf.set_draw_color(100, 100, 100)
+    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(5)
+    
+    # Tabla de Información del Aspirante
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "INFORMACIÓN DEL ASPIRANTE", ln=True)
+    pdf.ln(2)
+    
+    # Tabla 1: Datos del aspirante
+    pdf.set_font("Arial", "", 10)
+    pdf.set_fill_color(200, 200, 200)
+    
+    # Encabezados
+    pdf.cell(50, 8, "Campo", border=1, fill=True, align='C')
+    pdf.cell(0, 8, "Valor", border=1, fill=True, ln=True, align='L')
+    
+    # Datos
+    pdf.set_fill_color(240, 240, 240)
+    data_aspirante = [
+        ("Nombre", datos.get('nombre')),
+        ("Correo", datos.get('correo')),
+        ("DNI/Cédula", datos.get('dni')),
+    ]
+    
+    fill = False
+    for label, valor in data_aspirante:
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(50, 8, label, border=1, fill=fill)
+        pdf.set_font("Arial", "", 10)
+        pdf.cell(0, 8, str(valor), border=1, fill=fill, ln=True)
+        fill = not fill
+    
+    pdf.ln(5)
+    
+    # Línea separadora
+    pdf.set_draw_color(100, 100, 100)
+    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(5)
+    
+    # Tabla 2: Información de Inscripción
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "INFORMACIÓN DE INSCRIPCIÓN", ln=True)
+    pdf.ln(2)
+    
+    pdf.set_font("Arial", "", 10)
+    pdf.set_fill_color(200, 200, 200)
+    
+    # Encabezados
+    pdf.cell(50, 8, "Campo", border=1, fill=True, align='C')
+    pdf.cell(0, 8, "Valor", border=1, fill=True, ln=True, align='L')
+    
+    # Datos
+    pdf.set_fill_color(240, 240, 240)
+    data_inscripcion = [
+        ("Período", datos['periodo_nombre']),
+        ("Carrera", datos['carrera_nombre']),
+        ("Jornada", datos.get('jornada') or "No asignada"),
+        ("Sede", datos['sede_nombre']),
+    ]
+    
+    fill = False
+    for label, valor in data_inscripcion:
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(50, 8, label, border=1, fill=fill)
+        pdf.set_font("Arial", "", 10)
+        pdf.cell(0, 8, str(valor), border=1, fill=fill, ln=True)
+        fill = not fill
+    
+    pdf.ln(10)
+    
+    # Línea separadora
+    pdf.set_draw_color(100, 100, 100)
+    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(5)
+    
+    # Pie de página
+    pdf.set_font("Arial", "", 9)
+    pdf.cell(0, 8, f"Documento generado automáticamente | Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}", ln=True, align='C')
+
+    buffer = io.BytesIO()
+    pdf.output(buffer)
+    return buffer.getvalue()
+
+
+def construir_pdf_documentos(datos: dict, documentos: list) -> bytes:
+    """
+    Reporte de documentos del aspirante (reportlab).
+    `datos` es el documento del aspirante con periodo_nombre, carrera_nombre y sede_nombre.
+    """
+    # Crear PDF en memoria
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib import colors
+    
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    
+    # Contenedor de elementos
+    elementos = []
+    styles = getSampleStyleSheet()
+    
+    # Título
+    titulo_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=30,
+        alignment=1  # Centrado
+    )
+    elementos.append(Paragraph("DOCUMENTOS DEL ASPIRANTE", titulo_style))
+    elementos.append(Spacer(1, 0.3*inch))
+    
+    # Información del aspirante en tabla
+    datos_aspirante = [
+        ['Nombre:', datos.get('nombre', 'N/A')],
+        ['Correo:', datos.get('correo', 'N/A')],
+        ['DNI:', datos.get('dni', 'N/A')],
+        ['Período:', datos['periodo_nombre']],
+        ['Carrera:', datos['carrera_nombre']],
+        ['Jornada:', datos.get('jornada', 'N/A')],
+        ['Sede:', datos['sede_nombre']],
+        ['Estado:', datos.get('estado', 'Pendiente')]
+    ]
+    
+    tabla_info = Table(datos_aspirante, colWidths=[1.5*inch, 4*inch])
+    tabla_info.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+    ]))
+    
+    elementos.append(tabla_info)
+    elementos.append(Spacer(1, 0.4*inch))
+    
+    # Sección de documentos adjuntos
+    elementos.append(Paragraph("DOCUMENTOS ADJUNTOS", styles['Heading2']))
+    elementos.append(Spacer(1, 0.2*inch))
+    
+    if documentos:
+        datos_docs = [['#', 'Tipo', 'Archivo', 'Estado', 'Observaciones']]
+        # No reutilizar `doc`: es la plantilla que construye el PDF al final
+        for idx, documento in enumerate(documentos, 1):
+            datos_docs.append([
+                str(idx),
+                documento.get('tipo', 'Documento'),
+                documento.get('nombre_archivo', 'sin_nombre.pdf'),
+                documento.get('estado', 'Pendiente'),
+                documento.get('obs', 'Sin observaciones')
+            ])
+        
+        tabla_docs = Table(datos_docs, colWidths=[0.4*inch, 1.5*inch, 1.8*inch, 1*inch, 1.8*inch])
+        tabla_docs.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+        ]))
+        elementos.append(tabla_docs)
+    else:
+        elementos.append(Paragraph("No hay documentos registrados para este aspirante.", styles['Normal']))
+    
+    # Construir PDF
+    doc.build(elementos)
+    return buffer.getvalue()
+    
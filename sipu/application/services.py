@@ -1,7 +1,17 @@
-from ..domain.models import Aspirante
+from ..domain.models import Aspirante, Usuario
 from ..domain.interfaces import ISipuRepository
+from .asignacion import MotorAsignacion, sedes_con_excedente
+from .importacion import ImportadorAspirantes
+from .reportes import (construir_pdf_inscripcion, construir_pdf_documentos,
+                       VERSION_REPORTE_INSCRIPCION, VERSION_REPORTE_DOCUMENTOS)
 from fpdf import FPDF
+import base64
 import io
+import json
+
+# Tamaño de página del listado de aspirantes
+TAMANO_PAGINA = 25
+TAMANO_PAGINA_MAXIMO = 100
 
 class SipuService:
     """
@@ -9,9 +19,11 @@ class SipuService:
     Aquí aplicamos Inyección de Dependencias (Unidad 2).
     """
 
-    def __init__(self, repository: ISipuRepository):
+    def __init__(self, repository: ISipuRepository, cache_pdf=None):
         # Inyectamos el repositorio (DIP)
         self.repository = repository
+        # Caché opcional de PDFs generados (ver infrastructure/pdf_cache.py)
+        self.cache_pdf = cache_pdf
         
     def obtener_periodos_activos(self):
         """Llama al repositorio para obtener los periodos de la DB."""
@@ -22,40 +34,77 @@ class SipuService:
         return self.repository.obtener_carreras()
     
     def obtener_lista_aspirantes(self):
-        # Obtenemos los aspirantes reales (excluyendo admin)
-        todos = self.repository.listar_estudiantes_crudos()
-        aspirantes = [u for u in todos if u.get('rol') != 'admin']
+        # Obtenemos los aspirantes reales (excluyendo admin), solo con los campos de la tabla
+        aspirantes = self.repository.listar_filas_aspirantes()
         
-        # Creamos diccionarios de traducción ID -> Nombre
-        per_map = {p['id']: p['nombre'] for p in self.repository.obtener_periodos()}
-        car_map = {c['id']: c['nombre'] for c in self.repository.obtener_carreras()}
+        # Diccionarios de traducción ID -> Nombre (servidos desde la caché de catálogos)
+        per_map = self.repository.obtener_mapa_periodos()
+        car_map = self.repository.obtener_mapa_carreras()
         
         for a in aspirantes:
             # Traducimos los IDs a nombres para la tabla
-            a['dni_display'] = a.get('dni', 'Sin DNI')
-            a['periodo_nombre'] = per_map.get(a.get('periodo'), 'No asignado')
-            a['carrera_nombre'] = car_map.get(a.get('carrera'), 'No asignada')
+            a.dni_display = a.dni or 'Sin DNI'
+            a.periodo_nombre = per_map.get(a.periodo, 'No asignado')
+            a.carrera_nombre = car_map.get(a.carrera, 'No asignada')
             
         return aspirantes
     
+    @staticmethod
+    def _codificar_token(valor, id_documento) -> str:
+        """Codifica la posición del último aspirante de una página como token opaco."""
+        crudo = json.dumps([valor, str(id_documento)]).encode('utf-8')
+        return base64.urlsafe_b64encode(crudo).decode('ascii')
+
+    @staticmethod
+    def _decodificar_token(token: str):
+        """Retorna (valor, id) del token, o None si no es válido."""
+        try:
+            valor, id_documento = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        except (ValueError, TypeError):
+            return None
+        # El token lo envía el cliente: un objeto o lista como valor sería un operador en el filtro
+        if isinstance(valor, bool) or not isinstance(valor, (str, int, float, type(None))):
+            return None
+        if not isinstance(id_documento, str):
+            return None
+        return valor, id_documento
+
+    def obtener_pagina_aspirantes(self, filtros: dict = None, orden: str = 'nombre', descendente: bool = False,
+                                  limite: int = TAMANO_PAGINA, token: str = None) -> tuple:
+        """
+        Retorna (aspirantes, siguiente_token) de una página del listado.
+        Filtra en el servidor por estado, periodo, carrera y sede; siguiente_token es None en la última página.
+        """
+        limite = max(1, min(int(limite or TAMANO_PAGINA), TAMANO_PAGINA_MAXIMO))
+        despues = self._decodificar_token(token) if token else None
+
+        # Pedimos uno más para saber si existe una página siguiente
+        aspirantes = self.repository.listar_aspirantes_pagina(
+            filtros or {}, orden=orden, descendente=descendente, limite=limite + 1, despues=despues
+        )
+        siguiente_token = None
+        if len(aspirantes) > limite:
+            aspirantes = aspirantes[:limite]
+            ultimo = aspirantes[-1]
+            siguiente_token = self._codificar_token(getattr(ultimo, orden), ultimo._id)
+
+        per_map = self.repository.obtener_mapa_periodos()
+        car_map = self.repository.obtener_mapa_carreras()
+        sed_map = self.repository.obtener_mapa_sedes()
+        for a in aspirantes:
+            a.dni_display = a.dni or 'Sin DNI'
+            a.periodo_nombre = per_map.get(a.periodo, 'No asignado')
+            a.carrera_nombre = car_map.get(a.carrera, 'No asignada')
+            a.sede_nombre = sed_map.get(a.sede, 'No asignada')
+
+        return aspirantes, siguiente_token
+    
     def autenticar_usuario(self, correo: str, contrasena: str):
-        usuario_doc = self.repository.students.find_one({'correo': correo})
+        usuario_doc = self.repository.obtener_aspirante_crudo_por_correo(correo)
         
         if usuario_doc and usuario_doc.get('contrasena') == contrasena:
-            if usuario_doc.get('rol') == 'admin':
-                from ..domain.models import Administrador
-                return Administrador(nombre=usuario_doc['nombre'], correo=usuario_doc['correo'])
-            else:
-                # REHIDRATAR CON CAMPOS COMPLETOS
-                aspirante = Aspirante(
-                    nombre=usuario_doc['nombre'], 
-                    correo=usuario_doc['correo'],
-                    dni=usuario_doc.get('dni'),
-                    periodo=usuario_doc.get('periodo'),
-                    carrera=usuario_doc.get('carrera')
-                )
-                aspirante.estado = usuario_doc.get('estado', 'Pendiente')
-                return aspirante
+            # Administrador o Aspirante según el rol, con todos sus campos
+            return Usuario.desde_documento(usuario_doc)
         return None
     
     # application/services.py
@@ -65,8 +114,8 @@ class SipuService:
         if not aspirante: return None
 
         # Mapas de traducción: Usan el campo 'id' (no _id) para coincidir con lo guardado en estudiantes
-        per_map = {p.get('id'): p.get('nombre') for p in self.repository.obtener_periodos()}
-        car_map = {c.get('id'): c.get('nombre') for c in self.repository.obtener_carreras()}
+        per_map = self.repository.obtener_mapa_periodos()
+        car_map = self.repository.obtener_mapa_carreras()
 
         pdf = FPDF()
         pdf.add_page()
@@ -90,122 +139,163 @@ class SipuService:
         buffer.seek(0)
         return buffer
     
+    def _servir_pdf(self, partes_clave: tuple, generar):
+        """
+        Retorna el PDF como archivo binario.
+        Con caché, la clave se calcula de todas las entradas del documento y se sirve desde disco.
+        """
+        if self.cache_pdf is None:
+            return io.BytesIO(generar())
+        return self.cache_pdf.obtener_o_generar(self.cache_pdf.clave(*partes_clave), generar)
+
+    def _datos_reporte_inscripcion(self, campos: dict) -> dict:
+        """Arma los datos del reporte de inscripción con los nombres de catálogo ya traducidos."""
+        # Mapas de traducción: Usan el campo 'id' para coincidir con lo guardado en estudiantes
+        per_map = self.repository.obtener_mapa_periodos()
+        car_map = self.repository.obtener_mapa_carreras()
+        sed_map = self.repository.obtener_mapa_sedes()
+
+        periodo, carrera, sede = campos.get('periodo'), campos.get('carrera'), campos.get('sede')
+        return {
+            'nombre': campos.get('nombre'),
+            'correo': campos.get('correo'),
+            'dni': campos.get('dni'),
+            'jornada': campos.get('jornada'),
+            # TRADUCCIÓN: Buscamos los nombres reales usando los IDs
+            'periodo_nombre': per_map.get(periodo, periodo or "No asignado"),
+            'carrera_nombre': car_map.get(carrera, carrera or "No asignada"),
+            'sede_nombre': sed_map.get(sede, sede or "No asignada"),
+        }
+
+    # ========== SELLOS DE VERSIÓN (caché HTTP condicional) ==========
+
+    def _sello_catalogos(self) -> tuple:
+        """Los nombres de catálogo que muestran las páginas (servidos desde la caché, sin consultas)."""
+        return tuple(tuple(sorted(mapa.items())) for mapa in (self.repository.obtener_mapa_periodos(),
+                                                              self.repository.obtener_mapa_carreras(),
+                                                              self.repository.obtener_mapa_sedes()))
+
+    def sello_dashboard_aspirante(self, correo: str):
+        """Todo lo que cambia el dashboard del aspirante. None si no existe."""
+        version = self.repository.obtener_version_aspirante(correo=correo)
+        if version is None:
+            return None
+        return ('dashboard', correo, version, self._sello_catalogos())
+
+    def sello_examenes_aspirante(self, correo: str):
+        """Todo lo que cambia "mis exámenes": sus asignaciones publicadas y los exámenes de cada una."""
+        return ('examenes', correo, tuple(self.repository.obtener_versiones_examenes_aspirante(correo)),
+                self._sello_catalogos())
+
+    def sello_reporte_pdf_por_dni(self, dni: str):
+        """Todo lo que cambia el PDF de inscripción. None si no existe."""
+        version = self.repository.obtener_version_aspirante(dni=dni)
+        if version is None:
+            return None
+        return ('reporte', dni, version, VERSION_REPORTE_INSCRIPCION, self._sello_catalogos())
+
     def generar_reporte_pdf_por_dni(self, dni: str):
         """Genera PDF buscando por DNI en lugar de correo."""
         aspirante = self.repository.obtener_aspirante_por_dni(dni)
         if not aspirante: 
             return None
 
-        # Mapas de traducción: Usan el campo 'id' para coincidir con lo guardado en estudiantes
-        periodos = self.repository.obtener_periodos()
-        carreras = self.repository.obtener_carreras()
-        sedes = self.repository.obtener_sedes()
-        
-        # Crear mapas usando 'id' (no _id)
-        per_map = {p.get('id'): p.get('nombre') for p in periodos}
-        car_map = {c.get('id'): c.get('nombre') for c in carreras}
-        sed_map = {s.get('id'): s.get('nombre') for s in sedes}
+        datos = self._datos_reporte_inscripcion({
+            'nombre': aspirante.nombre, 'correo': aspirante.correo, 'dni': aspirante.dni,
+            'periodo': aspirante.periodo, 'carrera': aspirante.carrera,
+            'jornada': aspirante.jornada, 'sede': aspirante.sede
+        })
+        return self._servir_pdf((VERSION_REPORTE_INSCRIPCION, datos),
+                                lambda: construir_pdf_inscripcion(datos))
 
-        # TRADUCCIÓN: Buscamos los nombres reales usando los IDs
-        periodo_real = per_map.get(aspirante.periodo, aspirante.periodo or "No asignado")
-        carrera_real = car_map.get(aspirante.carrera, aspirante.carrera or "No asignada")
-        sede_real = sed_map.get(aspirante.sede, aspirante.sede or "No asignada")
+    def iterar_datos_reportes(self, filtros: dict):
+        """
+        Genera, uno a uno, los datos del reporte de inscripción de cada aspirante que cumple los filtros
+        (periodo, carrera, sede, estado y opcionalmente examen_id). Sirve para exportaciones masivas.
+        """
+        correos = None
+        if filtros.get('examen_id'):
+            asignaciones = self.repository.obtener_asignaciones_por_examen(filtros['examen_id'])
+            correos = [a.aspirante_correo for a in asignaciones]
 
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Encabezado
-        pdf.set_font("Arial", "B", 20)
-        pdf.cell(0, 15, "REPORTE DE INSCRIPCIÓN", ln=True, align='C')
-        pdf.set_font("Arial", "", 10)
-        pdf.cell(0, 8, "Sistema de Inscripción SIPU", ln=True, align='C')
-        pdf.ln(5)
-        
-        # Línea separadora
-        pdf.set_draw_color(100, 100, 100)
-        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-        pdf.ln(5)
-        
-        # Tabla de Información del Aspirante
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 8, "INFORMACIÓN DEL ASPIRANTE", ln=True)
-        pdf.ln(2)
-        
-        # Tabla 1: Datos del aspirante
-        pdf.set_font("Arial", "", 10)
-        pdf.set_fill_color(200, 200, 200)
-        
-        # Encabezados
-        pdf.cell(50, 8, "Campo", border=1, fill=True, align='C')
-        pdf.cell(0, 8, "Valor", border=1, fill=True, ln=True, align='L')
-        
-        # Datos
-        pdf.set_fill_color(240, 240, 240)
-        data_aspirante = [
-            ("Nombre", aspirante.nombre),
-            ("Correo", aspirante.correo),
-            ("DNI/Cédula", aspirante.dni),
-        ]
-        
-        fill = False
-        for label, valor in data_aspirante:
-            pdf.set_font("Arial", "B", 10)
-            pdf.cell(50, 8, label, border=1, fill=fill)
-            pdf.set_font("Arial", "", 10)
-            pdf.cell(0, 8, str(valor), border=1, fill=fill, ln=True)
-            fill = not fill
-        
-        pdf.ln(5)
-        
-        # Línea separadora
-        pdf.set_draw_color(100, 100, 100)
-        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-        pdf.ln(5)
-        
-        # Tabla 2: Información de Inscripción
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 8, "INFORMACIÓN DE INSCRIPCIÓN", ln=True)
-        pdf.ln(2)
-        
-        pdf.set_font("Arial", "", 10)
-        pdf.set_fill_color(200, 200, 200)
-        
-        # Encabezados
-        pdf.cell(50, 8, "Campo", border=1, fill=True, align='C')
-        pdf.cell(0, 8, "Valor", border=1, fill=True, ln=True, align='L')
-        
-        # Datos
-        pdf.set_fill_color(240, 240, 240)
-        data_inscripcion = [
-            ("Período", periodo_real),
-            ("Carrera", carrera_real),
-            ("Jornada", aspirante.jornada or "No asignada"),
-            ("Sede", sede_real),
-        ]
-        
-        fill = False
-        for label, valor in data_inscripcion:
-            pdf.set_font("Arial", "B", 10)
-            pdf.cell(50, 8, label, border=1, fill=fill)
-            pdf.set_font("Arial", "", 10)
-            pdf.cell(0, 8, str(valor), border=1, fill=fill, ln=True)
-            fill = not fill
-        
-        pdf.ln(10)
-        
-        # Línea separadora
-        pdf.set_draw_color(100, 100, 100)
-        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-        pdf.ln(5)
-        
-        # Pie de página
-        pdf.set_font("Arial", "", 9)
-        pdf.cell(0, 8, f"Documento generado automáticamente | Fecha: {__import__('datetime').datetime.now().strftime('%d/%m/%Y %H:%M')}", ln=True, align='C')
+        for doc in self.repository.iterar_aspirantes(filtros, correos=correos):
+            yield self._datos_reporte_inscripcion(doc)
 
-        buffer = io.BytesIO()
-        pdf.output(buffer)
-        buffer.seek(0)
-        return buffer
+    # ========== EXPORTACIONES (filas para hojas de cálculo) ==========
+
+    ENCABEZADOS_ASPIRANTES = ['Nombre', 'Correo', 'DNI', 'Período', 'Carrera', 'Jornada', 'Sede', 'Estado']
+    ENCABEZADOS_ASIGNACIONES = ['Examen', 'Aspirante', 'Correo', 'Sede', 'Laboratorio', 'Computadora', 'Estado']
+    ENCABEZADOS_CALIFICACIONES = ['Examen', 'Período', 'Carrera', 'Jornada', 'Fecha examen', 'Aspirante',
+                                  'Correo', 'Estado', 'Nota', 'Observaciones', 'Fecha evaluación']
+
+    def iterar_filas_aspirantes(self, filtros: dict):
+        """Genera las filas de la exportación de aspirantes (los catálogos se resuelven una sola vez)."""
+        per_map = self.repository.obtener_mapa_periodos()
+        car_map = self.repository.obtener_mapa_carreras()
+        sed_map = self.repository.obtener_mapa_sedes()
+
+        for a in self.repository.iterar_aspirantes(filtros):
+            yield (
+                a.get('nombre'), a.get('correo'), a.get('dni'),
+                per_map.get(a.get('periodo'), a.get('periodo')),
+                car_map.get(a.get('carrera'), a.get('carrera')),
+                a.get('jornada'),
+                sed_map.get(a.get('sede'), a.get('sede')),
+                a.get('estado')
+            )
+
+    def iterar_filas_asignaciones(self, examen_id: str):
+        """Genera las filas de la exportación de asignaciones de un examen."""
+        sed_map = self.repository.obtener_mapa_sedes()
+
+        for a in self.repository.iterar_asignaciones(examen_id):
+            yield (
+                a.get('examen_id'), a.get('aspirante_nombre'), a.get('aspirante_correo'),
+                sed_map.get(a.get('sede'), a.get('sede')), a.get('lab_nombre'),
+                a.get('num_computadora'), a.get('estado')
+            )
+
+    def iterar_filas_calificaciones(self, examen_id: str = None):
+        """Genera las filas de la exportación de calificaciones (de un examen o de todos)."""
+        per_map = self.repository.obtener_mapa_periodos()
+        car_map = self.repository.obtener_mapa_carreras()
+        # Los exámenes son pocos: se cargan una vez en lugar de consultarlos por fila
+        examenes = {e.id: e for e in self.repository.obtener_examenes()}
+
+        for a in self.repository.iterar_asignaciones(examen_id, solo_evaluadas=True):
+            examen = examenes.get(a.get('examen_id'), {})
+            yield (
+                a.get('examen_id'),
+                per_map.get(examen.get('periodo'), examen.get('periodo')),
+                car_map.get(examen.get('carrera'), examen.get('carrera')),
+                examen.get('jornada'), examen.get('fecha'),
+                a.get('aspirante_nombre'), a.get('aspirante_correo'), a.get('estado'),
+                a.get('nota'), a.get('observaciones'), a.get('fecha_evaluacion')
+            )
+
+    def generar_reporte_documentos(self, correo: str):
+        """
+        Genera el PDF con los datos y documentos de un aspirante.
+        Retorna (archivo, nombre_sugerido) o None si el aspirante no existe.
+        """
+        aspirante_doc = self.repository.obtener_aspirante_crudo_por_correo(correo)
+        if not aspirante_doc:
+            return None
+
+        # Solo los campos que se imprimen (la contraseña y el _id no forman parte del reporte)
+        datos = {campo: aspirante_doc.get(campo) for campo in
+                 ('nombre', 'correo', 'dni', 'periodo', 'carrera', 'jornada', 'sede', 'estado')}
+        datos = {k: v for k, v in datos.items() if v is not None}
+        datos['periodo_nombre'] = self.repository.obtener_mapa_periodos().get(datos.get('periodo'), 'No asignado')
+        datos['carrera_nombre'] = self.repository.obtener_mapa_carreras().get(datos.get('carrera'), 'No asignada')
+        datos['sede_nombre'] = self.repository.obtener_mapa_sedes().get(datos.get('sede'), 'No asignada')
+
+        documentos = self.repository.listar_documentos_crudos(correo)
+
+        archivo = self._servir_pdf((VERSION_REPORTE_DOCUMENTOS, datos, documentos),
+                                   lambda: construir_pdf_documentos(datos, documentos))
+        nombre_archivo = f"documentos_{datos.get('nombre', 'aspirante').replace(' ', '_')}.pdf"
+        return archivo, nombre_archivo
     
     def registrar_nuevo_aspirante(self, nombre: str, correo: str) -> bool:
         """
@@ -223,6 +313,11 @@ class SipuService:
         # 3. Guardamos a través del repositorio (Abstracción)
         return self.repository.guardar_aspirante(nuevo_aspirante)
 
+    def importar_aspirantes(self, lineas, progreso=None) -> dict:
+        """Crea aspirantes en lote desde las líneas de un CSV (ver application/importacion.py)."""
+        return ImportadorAspirantes(self.repository, asignar_asientos=self.asignar_asientos_importados) \
+            .importar(lineas, progreso=progreso)
+
     def procesar_inscripcion(self, form_data: dict):
         try:
             # Obtener datos del formulario
@@ -249,9 +344,14 @@ class SipuService:
             aspirante.sede = sede
             aspirante.estado = 'Inscrito'
 
-            # Guardar cambios
-            self.repository.guardar_aspirante(aspirante)
+            # Guardar cambios (antes de tocar los asientos: si falla, no se reserva nada)
+            if not self.repository.guardar_aspirante(aspirante):
+                return False, "No se pudo guardar la inscripción. Verifique que el DNI no esté registrado."
             
+            # Si su examen ya fue distribuido, se le da el siguiente asiento libre (sin redistribuir)
+            asientos = self.asignar_asientos_incrementales(aspirante)
+            if asientos:
+                return True, f"Inscripción procesada correctamente. {' '.join(asientos)}"
             return True, "Inscripción procesada correctamente"
             
         except Exception as e:
@@ -259,12 +359,100 @@ class SipuService:
             return False, str(e)
     
     # ========== MÉTODOS PARA EXÁMENES ==========
+
+    def _inicializar_ocupacion(self, examen_id: str, distribucion_id: str) -> bool:
+        """
+        Crea los contadores de ocupación de una distribución publicada antes de que existieran,
+        contando las asignaciones actuales de cada laboratorio (solo ocurre una vez por distribución).
+        """
+        ocupacion = [{'lab_id': lab['id'], 'lab_nombre': lab['nombre'], 'sede': lab['sede'],
+                      'capacidad': lab['capacidad'],
+                      'ocupados': self.repository.contar_asignaciones_por_lab(lab['id'], examen_id)}
+                     for lab in self.repository.obtener_laboratorios()]
+        return self.repository.registrar_ocupacion(examen_id, distribucion_id, ocupacion)
+
+    def asignar_asientos_incrementales(self, aspirante: Aspirante) -> list:
+        """
+        Ubica a un aspirante recién inscrito en los exámenes ya distribuidos de su periodo/carrera/jornada.
+        Toma el siguiente asiento libre de su sede (contador atómico, O(1)) y no mueve a nadie más.
+        Retorna los mensajes para mostrar al aspirante.
+        """
+        mensajes = []
+        examenes = self.repository.obtener_examenes_por_periodo_carrera_jornada(
+            aspirante.periodo, aspirante.carrera, aspirante.jornada
+        )
+        ya_asignados = {a.get('examen_id')
+                        for a in self.repository.obtener_asignaciones_por_aspirante(aspirante.correo)}
+
+        for examen in examenes:
+            if not examen.get('distribucion_id') or examen['id'] in ya_asignados:
+                # Sin distribución publicada: entrará en la próxima distribución completa
+                continue
+            asiento = self._asignar_asiento(aspirante, examen)
+            if asiento is not None:
+                mensajes.append(f"Asiento asignado: {asiento['lab_nombre']}, computadora {asiento['num_computadora']}.")
+            else:
+                mensajes.append(f"Tu asiento para el examen {examen['id']} se asignará en la próxima distribución.")
+        return mensajes
+
+    def _asignar_asiento(self, aspirante: Aspirante, examen: dict):
+        """Reserva el siguiente asiento libre del examen (ya distribuido) y crea la asignación. None si no pudo."""
+        asiento = self.repository.reservar_asiento(examen['id'], aspirante.sede)
+        if asiento is None and not self.repository.obtener_ocupacion(examen['id']):
+            if self._inicializar_ocupacion(examen['id'], examen['distribucion_id']):
+                asiento = self.repository.reservar_asiento(examen['id'], aspirante.sede)
+        if asiento is None:
+            print(f"Sin asientos libres en la sede {aspirante.sede} para el examen {examen['id']}")
+            return None
+
+        creada = self.repository.crear_asignacion_examen({
+            'id': f"asig_{examen['id']}_{asiento['distribucion_id']}_{aspirante.correo}",
+            'examen_id': examen['id'],
+            'distribucion_id': asiento['distribucion_id'],
+            'aspirante_correo': aspirante.correo,
+            'aspirante_nombre': aspirante.nombre,
+            'lab_id': asiento['lab_id'],
+            'lab_nombre': asiento['lab_nombre'],
+            'num_computadora': asiento['num_computadora'],
+            'sede': asiento['sede'],
+            'estado': 'Pendiente'
+        })
+        if not creada:
+            # El asiento quedó reservado sin asignación: se devuelve para no perderlo
+            self.repository.liberar_asiento(examen['id'], asiento)
+            return None
+        return asiento
+
+    def asignar_asientos_importados(self, docs: list) -> int:
+        """
+        Igual que una inscripción por formulario: ubica a los aspirantes importados ya inscritos
+        en los exámenes ya distribuidos. Los exámenes se buscan una vez por periodo/carrera/jornada.
+        Retorna cuántos asientos se asignaron.
+        """
+        examenes_por_grupo = {}
+        asignados = 0
+        for doc in docs:
+            grupo = (doc.get('periodo'), doc.get('carrera'), doc.get('jornada'))
+            if grupo not in examenes_por_grupo:
+                examenes_por_grupo[grupo] = [
+                    examen for examen in self.repository.obtener_examenes_por_periodo_carrera_jornada(*grupo)
+                    if examen.get('distribucion_id')
+                ]
+            if not examenes_por_grupo[grupo]:
+                continue
+            aspirante = Aspirante.desde_documento(doc)
+            for examen in examenes_por_grupo[grupo]:
+                if self._asignar_asiento(aspirante, examen) is not None:
+                    asignados += 1
+        return asignados
     
-    def distribuir_aspirantes_en_examenes(self, examen_id: str) -> tuple:
+    def distribuir_aspirantes_en_examenes(self, examen_id: str, progreso=None) -> tuple:
         """
         Distribuye automáticamente aspirantes en laboratorios para un examen.
+        `progreso(porcentaje, mensaje)` es opcional (lo usan los trabajos en segundo plano).
         Retorna (éxito: bool, mensaje: str)
         """
+        progreso = progreso or (lambda porcentaje, mensaje=None: None)
         try:
             # 1. Obtener datos del examen
             examen = self.repository.obtener_examen_por_id(examen_id)
@@ -275,77 +463,72 @@ class SipuService:
             carrera = examen.get('carrera')
             jornada = examen.get('jornada')
             
-            # 2. Obtener aspirantes que pertenecen a este examen
-            todos_aspirantes = self.repository.listar_estudiantes_crudos()
-            aspirantes_examen = [
-                a for a in todos_aspirantes 
-                if a.get('estado') == 'Inscrito' and 
-                   a.get('periodo') == periodo and 
-                   a.get('carrera') == carrera and 
-                   a.get('jornada') == jornada and 
-                   a.get('rol') == 'aspirante'
-            ]
+            # 2. Obtener aspirantes que pertenecen a este examen (filtrados en la base de datos)
+            aspirantes_examen = list(self.repository.iterar_candidatos_examen(periodo, carrera, jornada))
             
             if not aspirantes_examen:
                 return False, "No hay aspirantes para este examen"
+            progreso(20, f"{len(aspirantes_examen)} aspirantes encontrados")
             
             # 3. Obtener laboratorios disponibles
             laboratorios = self.repository.obtener_laboratorios()
             if not laboratorios:
                 return False, "No hay laboratorios disponibles"
             
-            # 4. Calcular distribución (usando round-robin)
-            total_aspirantes = len(aspirantes_examen)
-            total_capacidad = sum(lab['capacidad'] for lab in laboratorios)
+            # 4. Ubicar a cada aspirante en un laboratorio de su sede (sin exceder capacidades)
+            import uuid
+            distribucion_id = uuid.uuid4().hex[:8]
+            motor = MotorAsignacion(laboratorios)
+            asignaciones, resumen = motor.asignar(examen_id, distribucion_id, aspirantes_examen)
             
-            if total_capacidad < total_aspirantes:
-                return False, f"Capacidad insuficiente: {total_aspirantes} aspirantes vs {total_capacidad} computadoras"
-            
-            # 5. Eliminar asignaciones anteriores si existen
-            self.repository.eliminar_asignaciones_examen(examen_id)
-            
-            # 6. Crear asignaciones distribuidas
-            lab_index = 0
-            comp_numero = 1  # Número de computadora dentro del lab
-            contador_asignaciones = 0
+            # 5. Si alguna sede no alcanza, no se publica nada y se informa el excedente por sede
+            excedentes = sedes_con_excedente(resumen)
+            if excedentes:
+                sed_map = self.repository.obtener_mapa_sedes()
+                detalle = ', '.join(
+                    f"{sed_map.get(sede, sede or 'Sin sede')}: {datos['aspirantes']} aspirantes vs "
+                    f"{datos['capacidad']} computadoras"
+                    for sede, datos in excedentes.items()
+                )
+                sin_asiento = sum(datos['excedente'] for datos in excedentes.values())
+                return False, f"Capacidad insuficiente ({sin_asiento} sin asiento) en {detalle}"
             
-            for aspirante in aspirantes_examen:
-                lab_actual = laboratorios[lab_index]
-                
-                asignacion = {
-                    'id': f"asig_{examen_id}_{aspirante['correo']}",
-                    'examen_id': examen_id,
-                    'aspirante_correo': aspirante['correo'],
-                    'aspirante_nombre': aspirante['nombre'],
-                    'lab_id': lab_actual['id'],
-                    'lab_nombre': lab_actual['nombre'],
-                    'num_computadora': comp_numero,
-                    'sede': lab_actual['sede'],
-                    'estado': 'Pendiente'
-                }
-                
-                self.repository.crear_asignacion_examen(asignacion)
-                contador_asignaciones += 1
-                
-                # Avanzar a siguiente computadora
-                comp_numero += 1
-                
-                # Si se alcanzó la capacidad del lab, pasar al siguiente
-                if comp_numero > lab_actual['capacidad']:
-                    comp_numero = 1
-                    lab_index += 1
-                    
-                    # Si no hay más labs, reiniciar (distribuir en múltiples tandas)
-                    if lab_index >= len(laboratorios):
-                        lab_index = 0
+            # 6. Guardar en lote y publicar de forma atómica (reemplaza la distribución anterior)
+            progreso(50, f"Guardando {len(asignaciones)} asignaciones")
+            if not self.repository.publicar_distribucion(examen_id, distribucion_id, asignaciones,
+                                                         ocupacion=motor.ocupacion(asignaciones)):
+                return False, "Error al guardar la distribución"
+            contador_asignaciones = len(asignaciones)
+            labs_usados = len({a['lab_id'] for a in asignaciones})
             
-            mensaje = f"✅ {contador_asignaciones} aspirantes distribuidos en {len(laboratorios)} laboratorios"
+            mensaje = (f"✅ {contador_asignaciones} aspirantes distribuidos en {labs_usados} laboratorios "
+                       f"de {len(resumen)} sedes")
             return True, mensaje
         
         except Exception as e:
             print(f"Error en distribución: {e}")
             return False, f"Error: {str(e)}"
     
+    def _enriquecer_con_examen(self, asignaciones: list) -> list:
+        """
+        Agrega a cada asignación los datos de su examen.
+        Los exámenes se traen en una sola consulta ($in) y los catálogos se resuelven una vez.
+        """
+        examenes = self.repository.obtener_examenes_por_ids(a.get('examen_id') for a in asignaciones)
+        periodos = self.repository.obtener_mapa_periodos()
+        carreras = self.repository.obtener_mapa_carreras()
+
+        for asignacion in asignaciones:
+            examen = examenes.get(asignacion.get('examen_id'))
+            if examen:
+                asignacion['examen_periodo'] = periodos.get(examen.get('periodo'), 'N/A')
+                asignacion['examen_carrera'] = carreras.get(examen.get('carrera'), 'N/A')
+                asignacion['examen_jornada'] = examen.get('jornada')
+                asignacion['examen_fecha'] = examen.get('fecha')
+                asignacion['examen_hora_inicio'] = examen.get('hora_inicio')
+                asignacion['examen_hora_fin'] = examen.get('hora_fin')
+        return asignaciones
+
     def obtener_examen_aspirante(self, correo: str):
         """Obtiene el examen más reciente asignado a un aspirante con toda la información."""
         try:
@@ -359,14 +542,7 @@ class SipuService:
             asignacion_con_nota = next((a for a in asignaciones if a.get('nota')), None)
             asignacion = asignacion_con_nota if asignacion_con_nota else asignaciones[-1]
             
-            examen = self.repository.obtener_examen_por_id(asignacion['examen_id'])
-            
-            if examen:
-                asignacion['examen_fecha'] = examen.get('fecha')
-                asignacion['examen_hora_inicio'] = examen.get('hora_inicio')
-                asignacion['examen_hora_fin'] = examen.get('hora_fin')
-            
-            return asignacion
+            return self._enriquecer_con_examen([asignacion])[0]
         
         except Exception as e:
             print(f"Error al obtener examen: {e}")
@@ -389,26 +565,54 @@ class SipuService:
         except Exception as e:
             return False, str(e)
     
+    def guardar_calificaciones_examen(self, examen_id: str, filas: list) -> list:
+        """
+        Valida y guarda en lote las calificaciones de un examen.
+        Cada fila es un dict con asignacion_id, nombre, presentó, nota (texto) y observaciones.
+        Retorna [(asignacion_id, éxito, mensaje)] en el mismo orden de las filas.
+        """
+        resultados = {}
+        validas = []
+
+        # 1. Validar todas las filas antes de escribir
+        for fila in filas:
+            asignacion_id = fila['asignacion_id']
+            nombre = fila.get('nombre') or asignacion_id
+            presentó = fila.get('presentó', False)
+            nota = (fila.get('nota') or '').strip()
+
+            nota_int = None
+            if presentó:
+                try:
+                    nota_int = int(nota)
+                except ValueError:
+                    resultados[asignacion_id] = (False, f"Nota inválida para {nombre}")
+                    continue
+                if not (1 <= nota_int <= 1000):
+                    resultados[asignacion_id] = (False, f"Nota inválida para {nombre}: debe estar entre 1-1000")
+                    continue
+
+            validas.append((asignacion_id, presentó, nota_int, fila.get('observaciones', '')))
+
+        # 2. Una sola escritura para todas las filas válidas
+        guardadas = self.repository.guardar_calificaciones_lote(examen_id, validas)
+        for asignacion_id, *_ in validas:
+            if guardadas.get(asignacion_id):
+                resultados[asignacion_id] = (True, "Calificación guardada correctamente")
+            else:
+                # No existe en este examen o falló su escritura
+                resultados[asignacion_id] = (False, f"No se pudo guardar la calificación de {asignacion_id}")
+
+        return [(fila['asignacion_id'], *resultados[fila['asignacion_id']]) for fila in filas]
+    
     def obtener_calificaciones_aspirante(self, correo: str):
         """Obtiene todas las calificaciones de un aspirante con información del examen."""
         try:
             calificaciones = self.repository.obtener_calificaciones_aspirante(correo)
             
-            # Enriquecer con información del examen
-            for cal in calificaciones:
-                examen = self.repository.obtener_examen_por_id(cal.get('examen_id'))
-                if examen:
-                    periodos = {p['id']: p['nombre'] for p in self.repository.obtener_periodos()}
-                    carreras = {c['id']: c['nombre'] for c in self.repository.obtener_carreras()}
-                    
-                    cal['examen_periodo'] = periodos.get(examen.get('periodo'), 'N/A')
-                    cal['examen_carrera'] = carreras.get(examen.get('carrera'), 'N/A')
-                    cal['examen_jornada'] = examen.get('jornada')
-                    cal['examen_fecha'] = examen.get('fecha')
-            
-            return calificaciones
+            # Enriquecer con información del examen (una consulta para todos)
+            return self._enriquecer_con_examen(calificaciones)
         
         except Exception as e:
             print(f"Error al obtener calificaciones: {e}")
             return []
-    
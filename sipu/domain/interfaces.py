@@ -1,32 +1,322 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from .models import Aspirante, Documento, Universidad
+from .lecturas import FilaAspirante, FilaAsignacion, FilaExamen
 
 class ISipuRepository(ABC):
     """
     Interfaz para el repositorio principal (Polimorfismo con Clases Abstractas).
     Define las operaciones que cualquier base de datos debe cumplir.
+    Los servicios y las rutas solo deben usar estos métodos (nunca colecciones directamente).
     """
 
+    # Campos por los que se puede ordenar y filtrar el listado paginado de aspirantes
+    CAMPOS_ORDEN_LISTADO = ('nombre', 'correo', 'dni')
+    FILTROS_LISTADO = ('estado', 'periodo', 'carrera', 'sede')
+
+    # ---------- Catálogos ----------
+
+    @abstractmethod
+    def obtener_periodos(self) -> list:
+        """Retorna todos los periodos disponibles."""
+        pass
+
+    @abstractmethod
+    def obtener_carreras(self) -> list:
+        """Retorna todas las carreras disponibles."""
+        pass
+
+    @abstractmethod
+    def obtener_sedes(self) -> list:
+        """Retorna todas las sedes disponibles."""
+        pass
+
+    @abstractmethod
+    def obtener_mapa_periodos(self) -> dict:
+        """Retorna el mapa id -> nombre de los periodos."""
+        pass
+
+    @abstractmethod
+    def obtener_mapa_carreras(self) -> dict:
+        """Retorna el mapa id -> nombre de las carreras."""
+        pass
+
+    @abstractmethod
+    def obtener_mapa_sedes(self) -> dict:
+        """Retorna el mapa id -> nombre de las sedes."""
+        pass
+
+    @abstractmethod
+    def invalidar_catalogos(self, coleccion: str = None):
+        """Descarta lo guardado en caché de los catálogos."""
+        pass
+
+    @abstractmethod
+    def reemplazar_catalogo(self, coleccion: str, items: list) -> bool:
+        """Reemplaza por completo un catálogo ('periods', 'careers' o 'sedes')."""
+        pass
+
+    # ---------- Aspirantes y usuarios ----------
+
     @abstractmethod
     def guardar_aspirante(self, aspirante: Aspirante) -> bool:
         """Guarda o actualiza un aspirante en el sistema."""
         pass
 
+    @abstractmethod
+    def guardar_aspirantes(self, aspirantes: List[Aspirante]) -> bool:
+        """Guarda o actualiza varios aspirantes en una sola escritura."""
+        pass
+
     @abstractmethod
     def obtener_aspirante_por_correo(self, correo: str) -> Optional[Aspirante]:
         """Busca un aspirante por su correo electrónico."""
         pass
 
+    @abstractmethod
+    def obtener_aspirante_por_dni(self, dni: str) -> Optional[Aspirante]:
+        """Busca un aspirante por su DNI."""
+        pass
+
+    @abstractmethod
+    def obtener_aspirante_crudo_por_correo(self, correo: str) -> Optional[dict]:
+        """Retorna el documento completo de un usuario (aspirante o admin) por su correo."""
+        pass
+
+    @abstractmethod
+    def crear_usuario(self, usuario_doc: dict) -> bool:
+        """Inserta un usuario nuevo. Retorna False si el correo ya existe."""
+        pass
+
+    @abstractmethod
+    def buscar_aspirantes_existentes(self, correos: list, dnis: list) -> tuple:
+        """De los correos y DNIs dados, retorna (correos, dnis) que ya están registrados (una consulta)."""
+        pass
+
+    @abstractmethod
+    def importar_aspirantes(self, docs: list) -> dict:
+        """
+        Crea en lote los aspirantes que no existan (por correo), sin modificar los existentes.
+        Retorna {'insertados': n, 'errores': {correo: motivo}} con los que no se pudieron crear.
+        """
+        pass
+
+    @abstractmethod
+    def listar_estudiantes_crudos(self) -> list:
+        """Retorna todos los usuarios como diccionarios (documentos completos)."""
+        pass
+
+    @abstractmethod
+    def listar_filas_aspirantes(self) -> List[FilaAspirante]:
+        """Retorna todos los aspirantes (sin admins) como filas de listado proyectadas."""
+        pass
+
+    @abstractmethod
+    def listar_aspirantes_pagina(self, filtros: dict, orden: str = 'nombre', descendente: bool = False,
+                                 limite: int = 25, despues: tuple = None) -> List[FilaAspirante]:
+        """Retorna una página de aspirantes (filas proyectadas) con paginación por clave (orden, _id)."""
+        pass
+
+    @abstractmethod
+    def iterar_aspirantes(self, filtros: dict, correos: list = None) -> Iterable[dict]:
+        """Itera los aspirantes que cumplen los filtros, sin la contraseña."""
+        pass
+
+    @abstractmethod
+    def iterar_candidatos_examen(self, periodo: str, carrera: str, jornada: str) -> Iterable[dict]:
+        """Itera (correo, nombre, sede) de los aspirantes inscritos para un examen."""
+        pass
+
+    # ---------- Documentos ----------
+
     @abstractmethod
     def listar_documentos(self, propietario_id: str) -> List[Documento]:
         """Obtiene la lista de documentos de un aspirante."""
         pass
 
+    @abstractmethod
+    def listar_documentos_crudos(self, correo: str) -> list:
+        """Retorna los documentos de un aspirante como diccionarios."""
+        pass
+
+    # ---------- Laboratorios ----------
+
+    @abstractmethod
+    def obtener_laboratorios(self) -> list:
+        """Retorna todos los laboratorios disponibles."""
+        pass
+
+    @abstractmethod
+    def obtener_laboratorios_por_sede(self, sede: str) -> list:
+        """Retorna los laboratorios de una sede específica."""
+        pass
+
+    # ---------- Exámenes ----------
+
+    @abstractmethod
+    def crear_examen(self, examen_dict: dict) -> bool:
+        """Crea un nuevo examen."""
+        pass
+
+    @abstractmethod
+    def obtener_examenes(self) -> List[FilaExamen]:
+        """Retorna todos los exámenes como filas (solo los campos que se muestran)."""
+        pass
+
+    @abstractmethod
+    def obtener_examenes_por_periodo_carrera_jornada(self, periodo: str, carrera: str, jornada: str) -> list:
+        """Obtiene exámenes para una combinación específica."""
+        pass
+
+    @abstractmethod
+    def obtener_examen_por_id(self, examen_id: str) -> Optional[dict]:
+        """Obtiene un examen específico por su ID."""
+        pass
+
+    @abstractmethod
+    def obtener_examenes_por_ids(self, examen_ids) -> dict:
+        """Obtiene varios exámenes a la vez. Retorna {id: examen}."""
+        pass
+
+    # ---------- Asignaciones y calificaciones ----------
+
+    @abstractmethod
+    def crear_asignacion_examen(self, asignacion_dict: dict) -> bool:
+        """Crea una asignación de aspirante a examen."""
+        pass
+
+    @abstractmethod
+    def obtener_asignaciones_por_examen(self, examen_id: str) -> List[FilaAsignacion]:
+        """Obtiene las asignaciones de la distribución publicada de un examen, como filas proyectadas."""
+        pass
+
+    @abstractmethod
+    def obtener_asignaciones_por_aspirante(self, correo: str) -> list:
+        """Obtiene las asignaciones publicadas de un aspirante."""
+        pass
+
+    @abstractmethod
+    def contar_asignaciones_por_lab(self, lab_id: str, examen_id: str) -> int:
+        """Cuenta cuántas personas están asignadas a un laboratorio en un examen."""
+        pass
+
+    @abstractmethod
+    def eliminar_asignaciones_examen(self, examen_id: str) -> bool:
+        """Elimina todas las asignaciones de un examen."""
+        pass
+
+    @abstractmethod
+    def publicar_distribucion(self, examen_id: str, distribucion_id: str, asignaciones: list,
+                              ocupacion: list = None) -> bool:
+        """
+        Reemplaza la distribución de un examen de forma atómica para los lectores.
+        `ocupacion` son los contadores iniciales por laboratorio (ver registrar_ocupacion).
+        """
+        pass
+
+    @abstractmethod
+    def registrar_ocupacion(self, examen_id: str, distribucion_id: str, ocupacion: list) -> bool:
+        """
+        Crea los contadores de ocupación por laboratorio de una distribución (idempotente).
+        Cada elemento: {lab_id, lab_nombre, sede, capacidad, ocupados}.
+        """
+        pass
+
+    @abstractmethod
+    def obtener_ocupacion(self, examen_id: str) -> list:
+        """Retorna los contadores de ocupación de la distribución publicada de un examen."""
+        pass
+
+    @abstractmethod
+    def reservar_asiento(self, examen_id: str, sede: str) -> Optional[dict]:
+        """Toma de forma atómica el siguiente asiento libre de la sede. None si no queda ninguno."""
+        pass
+
+    @abstractmethod
+    def liberar_asiento(self, examen_id: str, asiento: dict) -> bool:
+        """
+        Devuelve un asiento tomado con reservar_asiento que no llegó a asignarse.
+        Solo si sigue siendo el último tomado del laboratorio (si no, su número quedaría repetido).
+        """
+        pass
+
+    @abstractmethod
+    def iterar_asignaciones(self, examen_id: str = None, solo_evaluadas: bool = False) -> Iterable[dict]:
+        """Itera las asignaciones publicadas (de un examen o de todos)."""
+        pass
+
+    @abstractmethod
+    def guardar_calificacion(self, asignacion_id: str, presentó: bool, nota: int, observaciones: str) -> bool:
+        """Guarda la calificación de un aspirante."""
+        pass
+
+    @abstractmethod
+    def guardar_calificaciones_lote(self, examen_id: str, calificaciones: list) -> dict:
+        """Guarda varias calificaciones de un examen. Retorna {asignacion_id: bool}."""
+        pass
+
+    @abstractmethod
+    def obtener_calificaciones_aspirante(self, correo: str) -> list:
+        """Obtiene todas las calificaciones de un aspirante."""
+        pass
+
+    # ---------- Versiones (caché HTTP condicional) ----------
+
+    @abstractmethod
+    def obtener_version_aspirante(self, correo: str = None, dni: str = None) -> Optional[int]:
+        """
+        Versión del aspirante (por correo o por DNI): cambia en cada escritura.
+        None si no existe; 0 si el documento es anterior a las versiones.
+        """
+        pass
+
+    @abstractmethod
+    def obtener_versiones_examenes_aspirante(self, correo: str) -> list:
+        """
+        (asignacion_id, versión, examen_id, versión del examen) de las asignaciones publicadas
+        de un aspirante, en una sola consulta y sin traer los documentos completos.
+        """
+        pass
+
+    # ---------- Trabajos en segundo plano ----------
+
+    @abstractmethod
+    def crear_trabajo(self, trabajo: dict) -> bool:
+        """Registra un trabajo nuevo (en cola)."""
+        pass
+
+    @abstractmethod
+    def actualizar_trabajo(self, trabajo_id: str, cambios: dict) -> bool:
+        """Actualiza el estado, progreso o resultado de un trabajo."""
+        pass
+
+    @abstractmethod
+    def obtener_trabajo(self, trabajo_id: str) -> Optional[dict]:
+        """Obtiene un trabajo por su ID."""
+        pass
+
+    @abstractmethod
+    def listar_trabajos(self, limite: int = 20) -> list:
+        """Retorna los trabajos más recientes primero."""
+        pass
+
+    @abstractmethod
+    def registrar_latido_trabajos(self, trabajo_ids: list, momento: str) -> bool:
+        """Anota en cada trabajo que el proceso que lo tiene sigue vivo."""
+        pass
+
+    @abstractmethod
+    def marcar_trabajos_huerfanos(self, estados: list, latido_limite: str, cambios: dict) -> int:
+        """
+        Aplica `cambios` a los trabajos en alguno de `estados` cuyo último latido es anterior
+        a `latido_limite` (o no tienen). Retorna cuántos se marcaron.
+        """
+        pass
+
 class INotificador(ABC):
     """
     Interfaz para el patrón Observer o servicios de mensajería.
     """
     @abstractmethod
     def enviar(self, destinatario: str, mensaje: str):
-        pass
\ No newline at end of file
+        pass
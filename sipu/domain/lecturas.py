@@ -0,0 +1,110 @@
+"""
+Modelos de lectura (solo para mostrar): filas de los listados grandes de administración.
+Usan __slots__ (sin __dict__ por instancia) y se construyen desde consultas proyectadas,
+así cada fila trae solo los campos que usa su plantilla (nunca la contraseña).
+"""
+from typing import Iterable, List
+
+
+class FilaLectura:
+    """
+    Base de las filas. Cada subclase recibe sus CAMPOS en orden en __init__ (asignaciones directas,
+    más rápidas que setattr); los que no vienen en el documento quedan en None.
+    `get` y `fila['campo']` se mantienen para el código y las plantillas que trataban las filas como dict.
+    """
+    __slots__ = ()
+
+    # Campos que se leen de la base de datos (el resto de __slots__ los completa el servicio)
+    CAMPOS: tuple = ()
+
+    @classmethod
+    def proyeccion(cls) -> dict:
+        """Proyección de MongoDB con exactamente los CAMPOS de la fila."""
+        proyeccion = {campo: 1 for campo in cls.CAMPOS}
+        if '_id' not in proyeccion:
+            proyeccion['_id'] = 0
+        return proyeccion
+
+    @classmethod
+    def desde_documento(cls, doc: dict):
+        return cls(*map(doc.get, cls.CAMPOS))
+
+    @classmethod
+    def desde_documentos(cls, docs: Iterable[dict]) -> List['FilaLectura']:
+        campos = cls.CAMPOS
+        return [cls(*map(doc.get, campos)) for doc in docs]
+
+    def get(self, campo: str, defecto=None):
+        """Como dict.get; un campo ausente (None) retorna `defecto`."""
+        valor = getattr(self, campo, None)
+        return defecto if valor is None else valor
+
+    def __getitem__(self, campo: str):
+        try:
+            return getattr(self, campo)
+        except AttributeError:
+            raise KeyError(campo) from None
+
+    def a_dict(self) -> dict:
+        return {campo: getattr(self, campo) for campo in self.__slots__ if getattr(self, campo) is not None}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.a_dict()})"
+
+
+class FilaAspirante(FilaLectura):
+    """Fila del listado de aspirantes (lista.html). `_id` se conserva para la paginación por clave."""
+    CAMPOS = ('_id', 'nombre', 'correo', 'dni', 'periodo', 'carrera', 'jornada', 'sede', 'estado')
+    __slots__ = CAMPOS + ('dni_display', 'periodo_nombre', 'carrera_nombre', 'sede_nombre')
+
+    def __init__(self, _id=None, nombre=None, correo=None, dni=None, periodo=None, carrera=None,
+                 jornada=None, sede=None, estado=None):
+        self._id = _id
+        self.nombre = nombre
+        self.correo = correo
+        self.dni = dni
+        self.periodo = periodo
+        self.carrera = carrera
+        self.jornada = jornada
+        self.sede = sede
+        self.estado = estado
+        # Los completa el servicio con los catálogos
+        self.dni_display = None
+        self.periodo_nombre = None
+        self.carrera_nombre = None
+        self.sede_nombre = None
+
+
+class FilaAsignacion(FilaLectura):
+    """Fila de las vistas de asignaciones y de evaluación de un examen."""
+    CAMPOS = ('id', 'examen_id', 'aspirante_correo', 'aspirante_nombre', 'sede', 'lab_nombre',
+              'num_computadora', 'estado')
+    __slots__ = CAMPOS
+
+    def __init__(self, id=None, examen_id=None, aspirante_correo=None, aspirante_nombre=None, sede=None,
+                 lab_nombre=None, num_computadora=None, estado=None):
+        self.id = id
+        self.examen_id = examen_id
+        self.aspirante_correo = aspirante_correo
+        self.aspirante_nombre = aspirante_nombre
+        self.sede = sede
+        self.lab_nombre = lab_nombre
+        self.num_computadora = num_computadora
+        self.estado = estado
+
+
+class FilaExamen(FilaLectura):
+    """Tarjeta de un examen en admin_examenes.html."""
+    CAMPOS = ('id', 'periodo', 'carrera', 'jornada', 'fecha', 'hora_inicio', 'hora_fin', 'estado')
+    __slots__ = CAMPOS
+
+    def __init__(self, id=None, periodo=None, carrera=None, jornada=None, fecha=None, hora_inicio=None,
+                 hora_fin=None, estado=None):
+        self.id = id
+        self.periodo = periodo
+        self.carrera = carrera
+        self.jornada = jornada
+        self.fecha = fecha
+        self.hora_inicio = hora_inicio
+        self.hora_fin = hora_fin
+        self.estado = estado
@@ -1,12 +1,41 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, List
+
+# ==========================================
+# SECCIÓN: BASE DE LOS MODELOS
+# ==========================================
+
+class Modelo(ABC):
+    """
+    Base de los modelos del dominio: todos usan __slots__ (sin __dict__ por instancia).
+    La rehidratación (desde_documento) no valida: los datos ya pasaron por validar() al escribirse.
+    """
+    __slots__ = ()
+
+    @classmethod
+    @abstractmethod
+    def desde_documento(cls, doc: dict):
+        """Crea la instancia a partir de un documento de la base de datos."""
+        pass
+
+    @classmethod
+    def desde_documentos(cls, docs: Iterable[dict]) -> list:
+        """Convierte un cursor (o cualquier iterable de documentos) en instancias, en una sola pasada."""
+        rehidratar = cls.desde_documento
+        return [rehidratar(doc) for doc in docs]
+
+    def validar(self):
+        """Valida el estado antes de escribirlo. Lanza ValueError si algo no es válido."""
+        pass
 
 # ==========================================
 # SECCIÓN: USUARIOS (Unidad 2: Herencia y Polimorfismo)
 # ==========================================
 
-class Usuario(ABC):
+class Usuario(Modelo, ABC):
     """Clase base abstracta (Polimorfismo con clases abstractas)."""
+    __slots__ = ('_nombre', '_correo')
+
     def __init__(self, nombre: str, correo: str):
         self._nombre = nombre  # Encapsulamiento
         self._correo = correo
@@ -22,10 +51,34 @@ class Usuario(ABC):
         """Método abstracto que obliga a las subclases a implementarlo."""
         pass
 
+    @classmethod
+    def desde_documento(cls, doc: dict) -> 'Usuario':
+        """
+        Rehidrata un usuario. Desde Usuario se elige la subclase por el rol del documento
+        (Factory Method); desde una subclase se construye esa clase.
+        """
+        if cls is Usuario:
+            cls = Administrador if doc.get('rol') == 'admin' else Aspirante
+        usuario = cls.__new__(cls)
+        usuario._nombre = doc.get('nombre')
+        usuario._correo = doc.get('correo')
+        usuario._rehidratar(doc)
+        return usuario
+
+    def _rehidratar(self, doc: dict):
+        """Campos propios de cada subclase."""
+        pass
+
+    def validar(self):
+        if not self._nombre or not self._correo:
+            raise ValueError("El nombre y el correo son obligatorios")
+
     def __str__(self):
         return f"{self.__class__.__name__}(nombre={self._nombre}, correo={self._correo})"
 
 class Administrador(Usuario):
+    __slots__ = ()
+
     def get_rol(self) -> str:
         return "admin"
 
@@ -34,6 +87,12 @@ class Administrador(Usuario):
         return Universidad(nombre, sedes)
 
 class Aspirante(Usuario):
+    __slots__ = ('dni', 'periodo', 'carrera', 'jornada', 'sede', 'rol', 'estado')
+
+    ESTADOS = ('Incompleto', 'Pendiente', 'Inscrito')
+    # Campos que se leen de la base de datos para rehidratarlo (nunca la contraseña)
+    CAMPOS = ('nombre', 'correo', 'dni', 'periodo', 'carrera', 'jornada', 'sede', 'estado')
+
     def __init__(self, nombre, correo, dni=None, periodo=None, carrera=None, jornada=None, sede=None):
         super().__init__(nombre, correo) # Llama al padre Usuario
         self.dni = dni
@@ -46,19 +105,43 @@ class Aspirante(Usuario):
 
     def get_rol(self) -> str:
         return "postulante"
-    
-    @property
-    def estado(self): return self._estado
-    
-    @estado.setter
-    def estado(self, nuevo_estado):
-        self._estado = nuevo_estado
+
+    def _rehidratar(self, doc: dict):
+        get = doc.get
+        self.dni = get('dni')
+        self.periodo = get('periodo')
+        self.carrera = get('carrera')
+        self.jornada = get('jornada')
+        self.sede = get('sede')
+        self.rol = 'aspirante'
+        self.estado = get('estado') or 'Pendiente'
+
+    def validar(self):
+        super().validar()
+        if self.estado not in self.ESTADOS:
+            raise ValueError(f"Estado no válido. Use: {list(self.ESTADOS)}")
+
+    def a_documento(self) -> dict:
+        """Campos que se escriben en la colección de aspirantes."""
+        return {
+            'nombre': self._nombre,
+            'correo': self._correo,
+            'dni': self.dni,
+            'periodo': self.periodo,
+            'carrera': self.carrera,
+            'jornada': self.jornada,
+            'sede': self.sede,
+            'rol': 'aspirante',
+            'estado': self.estado
+        }
 
 # ==========================================
 # SECCIÓN: ENTIDADES (Unidad 1: Encapsulamiento)
 # ==========================================
 
-class Universidad:
+class Universidad(Modelo):
+    __slots__ = ('_nombre', '_sedes')
+
     def __init__(self, nombre: str, sedes: List[str]):
         self._nombre = nombre
         self._sedes = sedes
@@ -66,8 +149,22 @@ class Universidad:
     @property
     def nombre(self): return self._nombre
 
-class Documento:
+    @property
+    def sedes(self): return self._sedes
+
+    @classmethod
+    def desde_documento(cls, doc: dict) -> 'Universidad':
+        universidad = cls.__new__(cls)
+        universidad._nombre = doc.get('nombre')
+        universidad._sedes = list(doc.get('sedes') or [])
+        return universidad
+
+class Documento(Modelo):
     """Entidad con encapsulamiento total y validación interna."""
+    __slots__ = ('_tipo', '_nombre_archivo', '_propietario', '_estado_aprobacion', '_observaciones')
+
+    ESTADOS = ("Aprobado", "Rechazado", "Pendiente")
+
     def __init__(self, tipo: str, nombre_archivo: str, propietario: str):
         self._tipo = tipo
         self._nombre_archivo = nombre_archivo
@@ -79,20 +176,31 @@ class Documento:
     def estado_aprobacion(self):
         return self._estado_aprobacion
 
+    @classmethod
+    def desde_documento(cls, doc: dict) -> 'Documento':
+        documento = cls.__new__(cls)
+        documento._tipo = doc.get('tipo')
+        documento._nombre_archivo = doc.get('nombre_archivo', 'archivo_sin_nombre')
+        documento._propietario = doc.get('student_id')
+        documento._estado_aprobacion = doc.get('estado') or 'Pendiente'
+        documento._observaciones = doc.get('obs') or ''
+        return documento
+
     def revisar_documento(self, estado: str, observaciones: str):
         """Lógica de negocio encapsulada."""
-        validos = ["Aprobado", "Rechazado", "Pendiente"]
-        if estado in validos:
+        if estado in self.ESTADOS:
             self._estado_aprobacion = estado
             self._observaciones = observaciones
         else:
-            raise ValueError(f"Estado no válido. Use: {validos}")
+            raise ValueError(f"Estado no válido. Use: {list(self.ESTADOS)}")
 
 # ==========================================
 # SECCIÓN: EVALUACIÓN (Unidad 1: Propiedades)
 # ==========================================
 
-class Evaluacion:
+class Evaluacion(Modelo):
+    __slots__ = ('__nota', '_tiempo')
+
     def __init__(self, nota: float, tiempo_evaluacion: int):
         self.__nota = None
         self.nota = nota # Usa el setter para validar desde el inicio
@@ -108,6 +216,13 @@ class Evaluacion:
             raise ValueError("La nota debe estar entre 0 y 20")
         self.__nota = valor
 
+    @classmethod
+    def desde_documento(cls, doc: dict) -> 'Evaluacion':
+        evaluacion = cls.__new__(cls)
+        evaluacion.__nota = doc.get('nota')
+        evaluacion._tiempo = doc.get('tiempo_evaluacion')
+        return evaluacion
+
 # ==========================================
 # PLACEHOLDERS (Para mantener la estructura)
 # ==========================================
@@ -121,9 +236,13 @@ class Carrera: pass
 # SECCIÓN: EXÁMENES (Nueva funcionalidad)
 # ==========================================
 
-class Examen:
+class Examen(Modelo):
     """Representa un examen con fecha, hora y criterios."""
-    def __init__(self, id_examen: str, periodo: str, carrera: str, jornada: str, 
+    __slots__ = ('id', 'periodo', 'carrera', 'jornada', 'fecha', 'hora_inicio', 'hora_fin', 'estado')
+
+    ESTADOS = ('Activo', 'Completado', 'Cancelado')
+
+    def __init__(self, id_examen: str, periodo: str, carrera: str, jornada: str,
                  fecha: str, hora_inicio: str, hora_fin: str):
         self.id = id_examen
         self.periodo = periodo
@@ -132,24 +251,33 @@ class Examen:
         self.fecha = fecha
         self.hora_inicio = hora_inicio
         self.hora_fin = hora_fin
-        self.estado = 'Activo'  # Activo, Completado, Cancelado
+        self.estado = 'Activo'
 
-    @property
-    def hora_inicio(self): return self._hora_inicio
-    
-    @hora_inicio.setter
-    def hora_inicio(self, valor):
-        self._hora_inicio = valor
+    @classmethod
+    def desde_documento(cls, doc: dict) -> 'Examen':
+        examen = cls.__new__(cls)
+        get = doc.get
+        examen.id = get('id')
+        examen.periodo = get('periodo')
+        examen.carrera = get('carrera')
+        examen.jornada = get('jornada')
+        examen.fecha = get('fecha')
+        examen.hora_inicio = get('hora_inicio')
+        examen.hora_fin = get('hora_fin')
+        examen.estado = get('estado') or 'Activo'
+        return examen
 
-    @property
-    def hora_fin(self): return self._hora_fin
-    
-    @hora_fin.setter
-    def hora_fin(self, valor):
-        self._hora_fin = valor
+    def validar(self):
+        if self.estado not in self.ESTADOS:
+            raise ValueError(f"Estado no válido. Use: {list(self.ESTADOS)}")
 
-class AsignacionExamen:
+class AsignacionExamen(Modelo):
     """Asigna un aspirante a un laboratorio y computadora específicos para un examen."""
+    __slots__ = ('id', 'examen_id', 'aspirante_correo', 'lab_id', 'num_computadora', 'sede',
+                 'estado', 'nota', 'observaciones', 'fecha_evaluacion')
+
+    ESTADOS = ('Pendiente', 'Presentado', 'No presentado', 'Calificado')
+
     def __init__(self, id_asignacion: str, examen_id: str, aspirante_correo: str,
                  lab_id: str, num_computadora: int, sede: str):
         self.id = id_asignacion
@@ -158,57 +286,52 @@ class AsignacionExamen:
         self.lab_id = lab_id
         self.num_computadora = num_computadora
         self.sede = sede
-        self.estado = 'Pendiente'  # Pendiente, Presentado, No presentado
+        self.estado = 'Pendiente'
         self.nota = None  # 1-1000
         self.observaciones = ""
         self.fecha_evaluacion = None
 
-    @property
-    def estado(self): return self._estado
-    
-    @estado.setter
-    def estado(self, nuevo_estado):
-        validos = ['Pendiente', 'Presentado', 'No presentado']
-        if nuevo_estado in validos:
-            self._estado = nuevo_estado
-        else:
-            raise ValueError(f"Estado no válido. Use: {validos}")
-    
-    @property
-    def nota(self): return self._nota
-    
-    @nota.setter
-    def nota(self, valor):
-        if valor is not None and (valor < 1 or valor > 1000):
+    @classmethod
+    def desde_documento(cls, doc: dict) -> 'AsignacionExamen':
+        asignacion = cls.__new__(cls)
+        get = doc.get
+        asignacion.id = get('id')
+        asignacion.examen_id = get('examen_id')
+        asignacion.aspirante_correo = get('aspirante_correo')
+        asignacion.lab_id = get('lab_id')
+        asignacion.num_computadora = get('num_computadora')
+        asignacion.sede = get('sede')
+        asignacion.estado = get('estado') or 'Pendiente'
+        asignacion.nota = get('nota')
+        asignacion.observaciones = get('observaciones') or ""
+        asignacion.fecha_evaluacion = get('fecha_evaluacion')
+        return asignacion
+
+    def validar(self):
+        if self.estado not in self.ESTADOS:
+            raise ValueError(f"Estado no válido. Use: {list(self.ESTADOS)}")
+        if self.nota is not None and (self.nota < 1 or self.nota > 1000):
             raise ValueError("La nota debe estar entre 1 y 1000")
-        self._nota = valor
-    
-    @property
-    def observaciones(self): return self._observaciones
-    
-    @observaciones.setter
-    def observaciones(self, valor):
-        self._observaciones = valor if valor else ""
-    
-    @property
-    def fecha_evaluacion(self): return self._fecha_evaluacion
-    
-    @fecha_evaluacion.setter
-    def fecha_evaluacion(self, valor):
-        self._fecha_evaluacion = valor
-    @estado.setter
-    def estado(self, nuevo_estado):
-        validos = ['Pendiente', 'Presentado', 'No presentado', 'Calificado']
-        if nuevo_estado in validos:
-            self._estado = nuevo_estado
-        else:
-            raise ValueError(f"Estado no válido. Use: {validos}")
 
-class Laboratorio:
+class Laboratorio(Modelo):
     """Representa un laboratorio con su capacidad."""
+    __slots__ = ('id', 'nombre', 'sede', 'capacidad')
+
     def __init__(self, id_lab: str, nombre: str, sede: str, capacidad: int):
         self.id = id_lab
         self.nombre = nombre
         self.sede = sede
         self.capacidad = capacidad
-        self.descripcion = f"{nombre} - {capacidad} computadoras"
\ No newline at end of file
+
+    @property
+    def descripcion(self):
+        return f"{self.nombre} - {self.capacidad} computadoras"
+
+    @classmethod
+    def desde_documento(cls, doc: dict) -> 'Laboratorio':
+        laboratorio = cls.__new__(cls)
+        laboratorio.id = doc.get('id')
+        laboratorio.nombre = doc.get('nombre')
+        laboratorio.sede = doc.get('sede')
+        laboratorio.capacidad = doc.get('capacidad', 0)
+        return laboratorio
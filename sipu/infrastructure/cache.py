@@ -0,0 +1,64 @@
+# sipu/infrastructure/cache.py
+import os
+import threading
+import time
+
+
+class CatalogoCache:
+    """
+    Patrón Creacional: Singleton.
+    Caché de proceso para los catálogos (periodos, carreras, sedes).
+    Guarda la lista cruda y el mapa id -> nombre ya construido, con expiración por TTL.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instancia = super(CatalogoCache, cls).__new__(cls)
+                    instancia.ttl = float(os.environ.get('CATALOGO_CACHE_TTL', 300))
+                    instancia._entradas = {}
+                    instancia._lock_entradas = threading.Lock()
+                    cls._instance = instancia
+        return cls._instance
+
+    def configurar(self, ttl: float):
+        """Cambia el TTL (en segundos) y descarta lo guardado."""
+        self.ttl = float(ttl)
+        self.invalidar()
+
+    def obtener(self, nombre: str, cargar):
+        """
+        Retorna la entrada {'lista', 'mapa'} del catálogo `nombre`.
+        Si no existe o expiró, la vuelve a construir llamando a `cargar()`.
+        """
+        ahora = time.monotonic()
+        entrada = self._entradas.get(nombre)
+        if entrada and entrada['expira'] > ahora:
+            return entrada
+
+        with self._lock_entradas:
+            # Otro hilo pudo haberla cargado mientras esperábamos
+            entrada = self._entradas.get(nombre)
+            if entrada and entrada['expira'] > ahora:
+                return entrada
+
+            lista = list(cargar())
+            entrada = {
+                'lista': lista,
+                'mapa': {item.get('id'): item.get('nombre') for item in lista},
+                'expira': ahora + self.ttl
+            }
+            if self.ttl > 0:
+                self._entradas[nombre] = entrada
+            return entrada
+
+    def invalidar(self, nombre: str = None):
+        """Descarta un catálogo (o todos si no se indica cuál)."""
+        with self._lock_entradas:
+            if nombre is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(nombre, None)
@@ -0,0 +1,41 @@
+# sipu/infrastructure/cache_http.py
+"""
+Caché HTTP condicional (ETag / If-None-Match) para las páginas y PDFs del aspirante.
+El ETag se calcula de los sellos de versión del servicio (una lectura mínima): si el navegador
+ya tiene esa versión se responde 304 sin consultar los datos, renderizar ni generar el PDF.
+"""
+import hashlib
+
+from flask import current_app, make_response, request, session
+
+# Súbala al cambiar las plantillas de estas páginas (invalida los ETag ya entregados)
+VERSION_PAGINAS = 1
+
+
+def calcular_etag(*partes) -> str:
+    """ETag fuerte: el mismo contenido da el mismo ETag en cualquier proceso."""
+    return hashlib.sha256(repr((VERSION_PAGINAS,) + partes).encode('utf-8')).hexdigest()[:32]
+
+
+def respuesta_condicional(sello, generar):
+    """
+    Responde 304 si el cliente envió el ETag de `sello`; si no, llama a `generar()` y agrega el ETag.
+    Sin sello, o con mensajes flash pendientes (deben mostrarse), responde normalmente.
+    """
+    if sello is None or session.get('_flashes'):
+        return generar()
+
+    # Las páginas dependen de quién inició sesión
+    etag = calcular_etag(session.get('user_email'), session.get('user'), *sello)
+    if request.if_none_match.contains_weak(etag):
+        respuesta = current_app.response_class(status=304)
+    else:
+        respuesta = make_response(generar())
+        if respuesta.status_code != 200:
+            return respuesta
+
+    respuesta.set_etag(etag)
+    # Solo el navegador del aspirante la guarda, y siempre la revalida
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    respuesta.vary.add('Cookie')
+    return respuesta
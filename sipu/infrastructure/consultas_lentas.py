@@ -0,0 +1,246 @@
+# sipu/infrastructure/consultas_lentas.py
+"""
+Registro de consultas lentas de MongoDB.
+Cada comando que supera el umbral se escribe (una línea JSON) en un log rotativo con su colección,
+filtro, el método del repositorio que lo originó y un resumen de explain() en executionStats.
+El explain se ejecuta en un hilo aparte para no sumar latencia a la petición.
+"""
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import RotatingFileHandler
+
+from .indices import etapas_del_plan
+
+# Comandos que MongoDB sabe explicar
+EXPLICABLES = frozenset({'find', 'aggregate', 'count', 'distinct', 'findAndModify', 'update', 'delete'})
+
+# Campos que agrega el driver y que no forman parte de la consulta
+_CAMPOS_DRIVER = frozenset({'lsid', '$db', '$clusterTime', 'txnNumber', '$readPreference',
+                            'readConcern', 'writeConcern', 'autocommit', 'startTransaction',
+                            'apiVersion', 'apiStrict', 'apiDeprecationErrors', 'comment'})
+
+# Archivos cuyo primer marco en la pila identifica al llamador de la consulta
+_MODULOS_REPOSITORIO = ('repositories.py', 'memory_repository.py')
+
+# Se activa en el hilo que ejecuta explain() para que el listener no se vigile a sí mismo
+_local = threading.local()
+
+
+def explicando() -> bool:
+    """True si el hilo actual está ejecutando un explain del registro de consultas lentas."""
+    return getattr(_local, 'explicando', False)
+
+
+def metodo_llamador() -> str:
+    """
+    Recorre la pila del hilo actual y retorna 'Clase.metodo' del repositorio que hizo la consulta.
+    Si no pasa por el repositorio (p. ej. scripts), retorna el primer marco de código de SIPU.
+    """
+    marco = sys._getframe(1)
+    primero_sipu = None
+    while marco is not None:
+        archivo = marco.f_code.co_filename
+        if archivo.endswith(_MODULOS_REPOSITORIO):
+            instancia = marco.f_locals.get('self')
+            clase = type(instancia).__name__ if instancia is not None else ''
+            return f"{clase}.{marco.f_code.co_name}" if clase else marco.f_code.co_name
+        if primero_sipu is None and f"{os.sep}sipu{os.sep}" in archivo \
+                and not archivo.endswith(('metricas.py', 'consultas_lentas.py')):
+            primero_sipu = f"{os.path.basename(archivo)}:{marco.f_code.co_name}"
+        marco = marco.f_back
+    return primero_sipu or 'desconocido'
+
+
+def resumir_comando(nombre: str, comando: dict) -> dict:
+    """Extrae la parte de la consulta que interesa registrar (sin documentos ni valores a escribir)."""
+    if nombre == 'find':
+        campos = ('filter', 'sort', 'projection', 'limit', 'skip', 'hint')
+    elif nombre == 'aggregate':
+        campos = ('pipeline', 'hint')
+    elif nombre == 'count':
+        campos = ('query', 'limit', 'skip', 'hint')
+    elif nombre == 'distinct':
+        campos = ('key', 'query')
+    elif nombre == 'findAndModify':
+        campos = ('query', 'sort', 'fields')
+    elif nombre in ('update', 'delete'):
+        sentencias = comando.get('updates') or comando.get('deletes') or []
+        return {'q': [s.get('q') for s in sentencias[:10]], 'sentencias': len(sentencias)}
+    elif nombre == 'getMore':
+        return {'cursor': comando.get(nombre), 'batchSize': comando.get('batchSize')}
+    elif nombre == 'insert':
+        return {'documentos': len(comando.get('documents') or [])}
+    else:
+        return {}
+    return {campo: comando[campo] for campo in campos if campo in comando}
+
+
+def resumir_explain(explicacion: dict) -> dict:
+    """Resume un explain en executionStats: etapas del plan ganador, docs y claves examinados."""
+    # En aggregate el plan puede venir dentro de la primera etapa ($cursor)
+    if 'stages' in explicacion and 'queryPlanner' not in explicacion:
+        explicacion = explicacion['stages'][0].get('$cursor', {})
+
+    planificador = explicacion.get('queryPlanner', {})
+    plan = planificador.get('winningPlan', {})
+    # Desde MongoDB 7 el plan puede venir envuelto en 'queryPlan'
+    etapas = [e for e in etapas_del_plan(plan.get('queryPlan', plan)) if e]
+    estadisticas = explicacion.get('executionStats', {})
+    return {
+        'etapas': etapas,
+        'collscan': 'COLLSCAN' in etapas,
+        'ixscan': 'IXSCAN' in etapas,
+        'indice': _nombre_indice(plan.get('queryPlan', plan)),
+        'docs_examinados': estadisticas.get('totalDocsExamined'),
+        'claves_examinadas': estadisticas.get('totalKeysExamined'),
+        'devueltos': estadisticas.get('nReturned'),
+        'ms_ejecucion': estadisticas.get('executionTimeMillis'),
+    }
+
+
+def _nombre_indice(plan: dict):
+    if plan.get('stage') == 'IXSCAN':
+        return plan.get('indexName')
+    for hijo in [plan.get('inputStage')] + list(plan.get('inputStages', [])):
+        if hijo:
+            nombre = _nombre_indice(hijo)
+            if nombre:
+                return nombre
+    return None
+
+
+class RegistroConsultasLentas:
+    """
+    Patrón Creacional: Singleton.
+    Decide qué comandos son lentos, los encola y un hilo de fondo les hace explain() y los escribe.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    # Entradas pendientes como máximo; si el hilo se atrasa se descartan en vez de acumular memoria
+    MAX_PENDIENTES = 1000
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instancia = super(RegistroConsultasLentas, cls).__new__(cls)
+                    instancia.umbral_ms = float(os.environ.get('CONSULTA_LENTA_MS', 100))
+                    instancia.ruta = os.environ.get('CONSULTAS_LENTAS_LOG',
+                                                    os.path.join('logs', 'consultas_lentas.log'))
+                    instancia.max_bytes = int(os.environ.get('CONSULTAS_LENTAS_MAX_MB', 10)) * 1024 * 1024
+                    instancia.respaldos = int(os.environ.get('CONSULTAS_LENTAS_RESPALDOS', 5))
+                    instancia._logger = None
+                    instancia._pendientes = queue.Queue(maxsize=cls.MAX_PENDIENTES)
+                    instancia._hilo = None
+                    cls._instance = instancia
+        return cls._instance
+
+    def configurar(self, umbral_ms: float = None, ruta: str = None, max_bytes: int = None, respaldos: int = None):
+        """Cambia el umbral (0 desactiva el registro) y/o el archivo de log."""
+        if umbral_ms is not None:
+            self.umbral_ms = float(umbral_ms)
+        if ruta is not None or max_bytes is not None or respaldos is not None:
+            self.ruta = ruta or self.ruta
+            self.max_bytes = max_bytes or self.max_bytes
+            self.respaldos = respaldos if respaldos is not None else self.respaldos
+            self._logger = None
+
+    @property
+    def activo(self) -> bool:
+        return self.umbral_ms > 0
+
+    def es_lenta(self, duracion_ms: float) -> bool:
+        return self.activo and duracion_ms >= self.umbral_ms
+
+    def _obtener_logger(self) -> logging.Logger:
+        if self._logger is None:
+            directorio = os.path.dirname(self.ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            logger = logging.getLogger('sipu.consultas_lentas')
+            logger.setLevel(logging.WARNING)
+            logger.propagate = False
+            for manejador in list(logger.handlers):
+                logger.removeHandler(manejador)
+                manejador.close()
+            manejador = RotatingFileHandler(self.ruta, maxBytes=self.max_bytes,
+                                            backupCount=self.respaldos, encoding='utf-8')
+            manejador.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            logger.addHandler(manejador)
+            self._logger = logger
+        return self._logger
+
+    def registrar(self, base_datos: str, coleccion: str, nombre: str, comando: dict,
+                  duracion_ms: float, endpoint: str = None):
+        """
+        Encola un comando lento. Se llama desde el listener, en el hilo de la consulta:
+        aquí solo se captura el llamador y la consulta; el explain queda para el hilo de fondo.
+        """
+        entrada = {
+            'coleccion': coleccion,
+            'comando': nombre,
+            'duracion_ms': round(duracion_ms, 2),
+            'metodo': metodo_llamador(),
+            'endpoint': endpoint,
+            'consulta': resumir_comando(nombre, comando),
+        }
+        explicable = None
+        if nombre in EXPLICABLES:
+            explicable = {k: v for k, v in comando.items() if k not in _CAMPOS_DRIVER}
+
+        try:
+            self._pendientes.put_nowait((base_datos, entrada, explicable))
+        except queue.Full:
+            return
+        self._asegurar_hilo()
+
+    def _asegurar_hilo(self):
+        if self._hilo is None or not self._hilo.is_alive():
+            with self._lock:
+                if self._hilo is None or not self._hilo.is_alive():
+                    self._hilo = threading.Thread(target=self._trabajar, name='sipu-consultas-lentas', daemon=True)
+                    self._hilo.start()
+
+    def _trabajar(self):
+        _local.explicando = True
+        while True:
+            base_datos, entrada, explicable = self._pendientes.get()
+            try:
+                if explicable is not None:
+                    entrada['explain'] = self._explicar(base_datos, explicable)
+            except Exception as e:
+                entrada['explain'] = {'error': str(e)}
+            try:
+                self._obtener_logger().warning(json.dumps(entrada, default=str, ensure_ascii=False))
+            except Exception as e:
+                print(f"Error al escribir el log de consultas lentas: {e}")
+            finally:
+                self._pendientes.task_done()
+
+    def _explicar(self, base_datos: str, comando: dict) -> dict:
+        from .database import MongoDBClient
+        db = MongoDBClient().client[base_datos]
+        explicacion = db.command({'explain': comando, 'verbosity': 'executionStats'})
+        return resumir_explain(explicacion)
+
+    def esperar(self):
+        """Bloquea hasta que se hayan escrito todas las entradas pendientes."""
+        self._pendientes.join()
+
+    @classmethod
+    def _reiniciar_tras_fork(cls):
+        # El hilo de fondo no sobrevive al fork y la cola pudo quedar con su lock tomado
+        if cls._instance is not None:
+            cls._instance._pendientes = queue.Queue(maxsize=cls.MAX_PENDIENTES)
+            cls._instance._hilo = None
+            cls._instance._logger = None
+        cls._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=RegistroConsultasLentas._reiniciar_tras_fork)
@@ -0,0 +1,142 @@
+# sipu/infrastructure/contenedor.py
+"""
+Contenedor de dependencias de la aplicación (repositorio, servicio, caché de PDFs, trabajos).
+Nada se construye al importar: cada proceso arma sus propios objetos la primera vez que los usa,
+así un servidor con pre-fork (gunicorn --preload) nunca comparte conexiones entre procesos.
+Dentro de una petición, `repo` y `sipu_service` usan el mapa de identidad de esa petición
+(ver infrastructure/mapa_identidad.py), que se descarta al final de la petición.
+"""
+import os
+import threading
+import weakref
+
+from flask import current_app, g, has_request_context
+from werkzeug.local import LocalProxy
+
+from ..application.services import SipuService
+from .pdf_cache import CachePDF
+from .trabajos import EjecutorTrabajos
+from .mapa_identidad import MapaIdentidad
+
+# Contenedores vivos, para reiniciarlos en el proceso hijo después de un fork
+_contenedores = weakref.WeakSet()
+
+
+class ContenedorSipu:
+    """
+    Inyección de Dependencias: arma el grafo de objetos a partir de la configuración de la app.
+    La construcción es perezosa, segura entre hilos y se repite si el proceso cambió (fork).
+    """
+
+    def __init__(self, config: dict, fabrica_repositorio=None):
+        self.config = config
+        # Por defecto MongoDB; las pruebas o benchmarks pueden inyectar otro ISipuRepository
+        self.fabrica_repositorio = fabrica_repositorio or self._repositorio_mongo
+        self._lock = threading.Lock()
+        self._componentes = None
+        self._pid = None
+        _contenedores.add(self)
+
+    @staticmethod
+    def _repositorio_mongo():
+        from .repositories import MongoSipuRepository
+        return MongoSipuRepository()
+
+    def _construir(self) -> dict:
+        repositorio = self.fabrica_repositorio()
+        max_mb = self.config.get('PDF_CACHE_MAX_MB')
+        cache_pdf = CachePDF(directorio=self.config.get('PDF_CACHE_DIR'),
+                             max_bytes=max_mb * 1024 * 1024 if max_mb is not None else None)
+        return {
+            'repositorio': repositorio,
+            'servicio': SipuService(repositorio, cache_pdf=cache_pdf),
+            'trabajos': EjecutorTrabajos(repositorio, hilos=self.config.get('TRABAJOS_HILOS')),
+        }
+
+    def _obtener(self, nombre: str):
+        if self._componentes is None or self._pid != os.getpid():
+            with self._lock:
+                if self._componentes is None or self._pid != os.getpid():
+                    self._componentes = self._construir()
+                    self._pid = os.getpid()
+        return self._componentes[nombre]
+
+    @property
+    def repositorio(self):
+        return self._obtener('repositorio')
+
+    @property
+    def servicio(self) -> SipuService:
+        return self._obtener('servicio')
+
+    @property
+    def trabajos(self) -> EjecutorTrabajos:
+        return self._obtener('trabajos')
+
+    def _reiniciar_tras_fork(self):
+        # El lock pudo quedar tomado por un hilo que no existe en el hijo
+        self._lock = threading.Lock()
+        self._componentes = None
+        self._pid = None
+
+
+def _reiniciar_contenedores():
+    for contenedor in list(_contenedores):
+        contenedor._reiniciar_tras_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_contenedores)
+
+
+def registrar_contenedor(app, fabrica_repositorio=None) -> ContenedorSipu:
+    """
+    Crea el contenedor de la app (sin construir nada todavía) y lo guarda en app.extensions.
+    También registra el cierre del mapa de identidad al final de cada petición.
+    """
+    contenedor = ContenedorSipu(app.config, fabrica_repositorio)
+    app.extensions['sipu'] = contenedor
+
+    @app.teardown_request
+    def cerrar_mapa_identidad(error=None):
+        g.pop('sipu_servicio', None)
+        mapa = g.pop('sipu_mapa', None)
+        if mapa is not None:
+            mapa.cerrar()
+
+    return contenedor
+
+
+def obtener_contenedor() -> ContenedorSipu:
+    """Contenedor de la aplicación en curso."""
+    return current_app.extensions['sipu']
+
+
+def mapa_identidad() -> MapaIdentidad:
+    """Mapa de identidad de la petición en curso (se crea con el primer uso)."""
+    if 'sipu_mapa' not in g:
+        g.sipu_mapa = MapaIdentidad(obtener_contenedor().repositorio)
+    return g.sipu_mapa
+
+
+def _repositorio_actual():
+    if not has_request_context():
+        return obtener_contenedor().repositorio
+    return mapa_identidad()
+
+
+def _servicio_actual() -> SipuService:
+    servicio = obtener_contenedor().servicio
+    if not has_request_context():
+        return servicio
+    # Mismo servicio (y caché de PDFs) del proceso, pero sobre el mapa de identidad de la petición
+    if 'sipu_servicio' not in g:
+        g.sipu_servicio = SipuService(mapa_identidad(), cache_pdf=servicio.cache_pdf)
+    return g.sipu_servicio
+
+
+# Accesos para las rutas: se resuelven en cada uso contra la app (y la petición) en curso.
+# Los trabajos en segundo plano deben recibir obtener_contenedor().servicio, que no depende de la petición.
+repo = LocalProxy(_repositorio_actual)
+sipu_service = LocalProxy(_servicio_actual)
+trabajos = LocalProxy(lambda: obtener_contenedor().trabajos)
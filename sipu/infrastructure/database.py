@@ -1,6 +1,50 @@
 # sipu/infrastructure/database.py
+import importlib.util
 import os
+import threading
 from pymongo import MongoClient
+from .metricas import MonitorComandos, MonitorPool
+
+# Bibliotecas opcionales que necesita cada compresor (zlib viene con Python)
+_MODULOS_COMPRESORES = {'zstd': 'zstandard', 'snappy': 'snappy', 'zlib': None}
+
+
+def compresores_disponibles(pedidos) -> list:
+    """
+    Filtra la lista de compresores pedidos (p. ej. 'zstd,snappy,zlib') dejando solo los que
+    se pueden usar en este entorno, en el mismo orden de preferencia. zlib siempre está disponible.
+    """
+    if isinstance(pedidos, str):
+        pedidos = [p.strip() for p in pedidos.split(',')]
+    disponibles = []
+    for compresor in pedidos or []:
+        if compresor not in _MODULOS_COMPRESORES or compresor in disponibles:
+            continue
+        modulo = _MODULOS_COMPRESORES[compresor]
+        if modulo is None or importlib.util.find_spec(modulo) is not None:
+            disponibles.append(compresor)
+    return disponibles
+
+
+def opciones_cliente(config: dict) -> dict:
+    """Traduce la configuración de la app (MONGO_*) a los parámetros de MongoClient."""
+    opciones = {
+        'minPoolSize': config.get('MONGO_MIN_POOL_SIZE'),
+        'maxPoolSize': config.get('MONGO_MAX_POOL_SIZE'),
+        'maxIdleTimeMS': config.get('MONGO_MAX_IDLE_TIME_MS'),
+        'waitQueueTimeoutMS': config.get('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+        'serverSelectionTimeoutMS': config.get('MONGO_SERVER_SELECTION_TIMEOUT_MS'),
+        'connectTimeoutMS': config.get('MONGO_CONNECT_TIMEOUT_MS'),
+        'socketTimeoutMS': config.get('MONGO_SOCKET_TIMEOUT_MS'),
+    }
+    compresores = compresores_disponibles(config.get('MONGO_COMPRESSORS'))
+    if compresores:
+        opciones['compressors'] = ','.join(compresores)
+        if 'zlib' in compresores and config.get('MONGO_ZLIB_LEVEL') is not None:
+            opciones['zlibCompressionLevel'] = config['MONGO_ZLIB_LEVEL']
+    # Lo que no se configuró queda con el valor por defecto de pymongo
+    return {clave: valor for clave, valor in opciones.items() if valor is not None}
+
 
 class MongoDBClient:
     """
@@ -8,21 +52,59 @@ class MongoDBClient:
     Asegura una única instancia de la conexión a la base de datos.
     """
     _instance = None
+    _lock = threading.Lock()
+
+    # Configuración que usará la conexión (ver configurar); por defecto, variables de entorno
+    _uri = None
+    _db_name = None
+    _opciones = {}
+
+    @classmethod
+    def configurar(cls, uri: str = None, db_name: str = None, opciones: dict = None):
+        """Define URI, base de datos y opciones del pool. Debe llamarse antes de la primera conexión."""
+        if cls._instance is not None:
+            print(">>> Aviso: MongoDBClient ya estaba conectado; la nueva configuración no se aplica.")
+            return
+        cls._uri = uri
+        cls._db_name = db_name
+        cls._opciones = dict(opciones or {})
 
     def __new__(cls):
-        if cls._instance is None:
-            print(">>> Inicializando conexión única a MongoDB (Singleton)...")
-            cls._instance = super(MongoDBClient, cls).__new__(cls)
-            
-            # Configuración
-            uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/')
-            db_name = "sipu_db"
-            
-            # Conexión real
-            cls._instance.client = MongoClient(uri)
-            cls._instance.db = cls._instance.client[db_name]
-            
-        return cls._instance
+        # Un MongoClient no sobrevive a un fork: cada proceso crea el suyo (pid distinto)
+        instancia = cls._instance
+        if instancia is None or instancia._pid != os.getpid():
+            with cls._lock:
+                if cls._instance is None or cls._instance._pid != os.getpid():
+                    print(">>> Inicializando conexión única a MongoDB (Singleton)...")
+                    nueva = super(MongoDBClient, cls).__new__(cls)
+                    
+                    # Configuración
+                    uri = cls._uri or os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/')
+                    db_name = cls._db_name or os.environ.get('DATABASE_NAME', 'sipu_db')
+                    
+                    # Conexión real (los listeners alimentan las métricas de /metrics)
+                    nueva.client = MongoClient(uri, event_listeners=[MonitorComandos(), MonitorPool()],
+                                               **cls._opciones)
+                    nueva.db = nueva.client[db_name]
+                    nueva._pid = os.getpid()
+                    # Se publica la instancia solo cuando está completa (otros hilos no ven una a medias)
+                    cls._instance = nueva
+                instancia = cls._instance
+        return instancia
+
+    @classmethod
+    def cerrar(cls):
+        """Cierra la conexión actual (si hay); la próxima instancia abrirá una nueva."""
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.client.close()
+                cls._instance = None
+
+    @classmethod
+    def _reiniciar_tras_fork(cls):
+        # El hijo no debe usar los sockets del padre ni un lock que quedó tomado
+        cls._lock = threading.Lock()
+        cls._instance = None
 
     @property
     def database(self):
@@ -31,4 +113,8 @@ class MongoDBClient:
 
     def close(self):
         """Cierra la conexión."""
-        self.client.close()
\ No newline at end of file
+        self.client.close()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=MongoDBClient._reiniciar_tras_fork)
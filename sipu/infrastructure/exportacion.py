@@ -0,0 +1,253 @@
+# sipu/infrastructure/exportacion.py
+"""
+Utilidades de exportación masiva: ZIP generado en flujo y renderizado en paralelo.
+Todo trabaja con generadores para que la memoria no crezca con el número de archivos.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+_procesos = 1
+_procesos_configurados = None
+_pool_lock = threading.Lock()
+
+
+def configurar_procesos(procesos: int = None):
+    """Fija cuántos procesos tendrá el pool (0 o None = uno por núcleo). Aplica al crearse el pool."""
+    global _procesos_configurados
+    _procesos_configurados = procesos
+
+
+def _reiniciar_tras_fork():
+    # Un ProcessPoolExecutor heredado del padre no funciona en el hijo: se creará otro al usarse
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def obtener_pool() -> ProcessPoolExecutor:
+    """
+    Pool de procesos compartido (se crea la primera vez que se usa).
+    Renderizar PDFs es trabajo de CPU: repartirlo entre núcleos evita el límite del GIL.
+    """
+    global _pool, _procesos
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                procesos = _procesos_configurados or int(os.environ.get('EXPORTACION_PROCESOS', 0)) \
+                    or os.cpu_count() or 1
+                metodos = multiprocessing.get_all_start_methods()
+                if 'forkserver' in metodos:
+                    # No se hace fork del servidor web (tiene hilos y conexiones abiertas);
+                    # los procesos hijos solo importan el módulo de reportes.
+                    contexto = multiprocessing.get_context('forkserver')
+                    contexto.set_forkserver_preload(['sipu.application.reportes'])
+                else:
+                    contexto = multiprocessing.get_context('spawn')
+                _procesos = procesos
+                _pool = ProcessPoolExecutor(max_workers=procesos, mp_context=contexto)
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def procesar_en_paralelo(funcion, elementos, en_vuelo: int = None):
+    """
+    Aplica `funcion` a cada elemento en el pool de procesos y entrega (elemento, resultado) en orden.
+    A diferencia de Executor.map, solo mantiene `en_vuelo` tareas pendientes a la vez,
+    así que no consume todo el iterable por adelantado.
+    """
+    pool = obtener_pool()
+    en_vuelo = en_vuelo or _procesos * 2
+    pendientes = deque()
+
+    for elemento in elementos:
+        pendientes.append((elemento, pool.submit(funcion, elemento)))
+        if len(pendientes) >= en_vuelo:
+            elemento_listo, futuro = pendientes.popleft()
+            yield elemento_listo, futuro.result()
+
+    while pendientes:
+        elemento_listo, futuro = pendientes.popleft()
+        yield elemento_listo, futuro.result()
+
+
+class _Sumidero:
+    """Destino de escritura sin seek: acumula lo que escribe zipfile hasta que se vacía."""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def zip_en_flujo(archivos):
+    """
+    Genera un ZIP por partes a partir de un iterable de (nombre, contenido_bytes).
+    Cada archivo se entrega apenas se agrega, así que los primeros bytes salen de inmediato.
+    """
+    sumidero = _Sumidero()
+    # ZIP_STORED: los PDFs ya vienen comprimidos, volver a comprimir solo gasta CPU
+    with zipfile.ZipFile(sumidero, mode='w', compression=zipfile.ZIP_STORED) as archivo_zip:
+        for nombre, contenido in archivos:
+            archivo_zip.writestr(nombre, contenido)
+            yield sumidero.vaciar()
+    # Directorio central del ZIP
+    yield sumidero.vaciar()
+
+
+def directorio_exportaciones() -> str:
+    """Carpeta donde los trabajos en segundo plano dejan los archivos exportados."""
+    import tempfile
+    directorio = os.environ.get('EXPORTACION_DIR') or os.path.join(tempfile.gettempdir(), 'sipu_exportaciones')
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def guardar_en_disco(bloques, nombre: str) -> str:
+    """
+    Escribe en la carpeta de exportaciones un archivo generado por bloques (p. ej. zip_en_flujo).
+    La escritura es atómica: el archivo final solo aparece cuando está completo. Retorna la ruta.
+    """
+    import tempfile
+    directorio = directorio_exportaciones()
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            for bloque in bloques:
+                f.write(bloque)
+        ruta = os.path.join(directorio, nombre)
+        os.replace(temporal, ruta)
+        return ruta
+    except BaseException:
+        os.remove(temporal)
+        raise
+
+
+# ========== HOJAS DE CÁLCULO (CSV / XLSX) ==========
+
+# Filas acumuladas antes de entregar un bloque al cliente
+FILAS_POR_BLOQUE = 500
+
+
+def csv_en_flujo(encabezados: list, filas):
+    """Genera un CSV (UTF-8 con BOM, para que Excel respete las tildes) bloque a bloque."""
+    import csv
+    import io
+
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write('\ufeff')
+    escritor.writerow(encabezados)
+
+    for numero, fila in enumerate(filas, 1):
+        escritor.writerow(['' if valor is None else valor for valor in fila])
+        if numero % FILAS_POR_BLOQUE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+_XLSX_TIPOS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_RELACIONES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_LIBRO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Datos" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_RELACIONES_LIBRO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _celda_xlsx(valor) -> str:
+    """Convierte un valor a una celda SpreadsheetML (números como número, el resto como texto)."""
+    import re
+    from xml.sax.saxutils import escape
+
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return f'<c><v>{valor}</v></c>'
+    # XML no admite caracteres de control
+    texto = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', str(valor))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(texto)}</t></is></c>'
+
+
+def xlsx_en_flujo(encabezados: list, filas):
+    """
+    Genera un libro XLSX mínimo (una hoja) sin cargarlo en memoria:
+    la hoja se escribe fila a fila dentro del ZIP y se entrega por bloques.
+    """
+    sumidero = _Sumidero()
+    with zipfile.ZipFile(sumidero, mode='w', compression=zipfile.ZIP_DEFLATED) as libro:
+        libro.writestr('[Content_Types].xml', _XLSX_TIPOS)
+        libro.writestr('_rels/.rels', _XLSX_RELACIONES)
+        libro.writestr('xl/workbook.xml', _XLSX_LIBRO)
+        libro.writestr('xl/_rels/workbook.xml.rels', _XLSX_RELACIONES_LIBRO)
+
+        with libro.open('xl/worksheets/sheet1.xml', mode='w') as hoja:
+            hoja.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                       b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                       b'<sheetData>')
+            hoja.write(('<row>' + ''.join(_celda_xlsx(e) for e in encabezados) + '</row>').encode('utf-8'))
+
+            for numero, fila in enumerate(filas, 1):
+                hoja.write(('<row>' + ''.join(_celda_xlsx(v) for v in fila) + '</row>').encode('utf-8'))
+                if numero % FILAS_POR_BLOQUE == 0:
+                    yield sumidero.vaciar()
+
+            hoja.write(b'</sheetData></worksheet>')
+        yield sumidero.vaciar()
+    yield sumidero.vaciar()
+
+
+# Formatos de hoja de cálculo disponibles: formato -> (generador, mimetype)
+FORMATOS_HOJA = {
+    'csv': (csv_en_flujo, 'text/csv; charset=utf-8'),
+    'xlsx': (xlsx_en_flujo, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
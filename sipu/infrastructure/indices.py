@@ -0,0 +1,197 @@
+# sipu/infrastructure/indices.py
+"""
+Declaración y creación idempotente de los índices que usa MongoSipuRepository.
+Se ejecuta al iniciar la aplicación (create_app) y desde seed_db.py.
+"""
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# Índices declarados por colección. Los nombres son explícitos para poder detectar diferencias.
+INDICES = {
+    'students': [
+        IndexModel([('correo', ASCENDING)], name='correo_unico', unique=True),
+        # El DNI solo es único cuando existe (los aspirantes creados por el admin no lo tienen)
+        IndexModel([('dni', ASCENDING)], name='dni_unico', unique=True,
+                   partialFilterExpression={'dni': {'$gt': ''}}),
+        # Selección de candidatos para la distribución de un examen
+        IndexModel([('periodo', ASCENDING), ('carrera', ASCENDING), ('jornada', ASCENDING),
+                    ('estado', ASCENDING)], name='candidatos_examen'),
+        # Listado paginado por clave: un índice (campo, _id) por cada orden permitido.
+        # El orden por correo usa correo_unico: al ser único no necesita desempate por _id.
+        IndexModel([('nombre', ASCENDING), ('_id', ASCENDING)], name='listado_nombre'),
+        IndexModel([('dni', ASCENDING), ('_id', ASCENDING)], name='listado_dni'),
+    ],
+    'asignaciones_examen': [
+        IndexModel([('id', ASCENDING)], name='id_unico', unique=True),
+        IndexModel([('examen_id', ASCENDING), ('distribucion_id', ASCENDING)], name='examen_distribucion'),
+        IndexModel([('aspirante_correo', ASCENDING)], name='aspirante_correo'),
+        IndexModel([('lab_id', ASCENDING), ('examen_id', ASCENDING)], name='lab_examen'),
+    ],
+    'examenes': [
+        IndexModel([('id', ASCENDING)], name='id_unico', unique=True),
+        IndexModel([('periodo', ASCENDING), ('carrera', ASCENDING), ('jornada', ASCENDING)],
+                   name='periodo_carrera_jornada'),
+    ],
+    'laboratories': [
+        IndexModel([('id', ASCENDING)], name='id_unico', unique=True),
+        IndexModel([('sede', ASCENDING)], name='sede'),
+    ],
+    'documents': [
+        IndexModel([('student_id', ASCENDING)], name='student_id'),
+        IndexModel([('correo', ASCENDING)], name='correo'),
+    ],
+    'periods': [IndexModel([('id', ASCENDING)], name='id_unico', unique=True)],
+    'careers': [IndexModel([('id', ASCENDING)], name='id_unico', unique=True)],
+    'sedes': [IndexModel([('id', ASCENDING)], name='id_unico', unique=True)],
+    'ocupacion_labs': [
+        IndexModel([('examen_id', ASCENDING), ('distribucion_id', ASCENDING), ('lab_id', ASCENDING)],
+                   name='examen_distribucion_lab', unique=True),
+        IndexModel([('examen_id', ASCENDING), ('distribucion_id', ASCENDING), ('sede', ASCENDING),
+                    ('libres', ASCENDING)], name='asientos_libres'),
+    ],
+    'trabajos': [
+        IndexModel([('id', ASCENDING)], name='id_unico', unique=True),
+        IndexModel([('creado', DESCENDING)], name='recientes'),
+    ],
+    # MongoDB borra cada sesión al llegar a su fecha `expira`
+    'sesiones': [IndexModel([('expira', ASCENDING)], name='expiracion', expireAfterSeconds=0)],
+}
+
+# Índices que se declararon antes y ya no se usan: asegurar_indices los elimina si existen
+INDICES_RETIRADOS = {
+    # Redundante con correo_unico (ver el orden por correo en listar_aspirantes_pagina)
+    'students': ['listado_correo'],
+}
+
+# Opciones que, si cambian, hacen que un índice existente ya no coincida con su declaración
+_OPCIONES_COMPARADAS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds')
+
+# Consultas representativas del repositorio: (descripción, colección, filtro[, orden])
+CONSULTAS_REPOSITORIO = [
+    ('obtener_aspirante_por_correo', 'students', {'correo': 'x'}),
+    ('obtener_aspirante_por_dni', 'students', {'dni': 'x'}),
+    ('iterar_candidatos_examen', 'students',
+     {'periodo': 'x', 'carrera': 'y', 'jornada': 'z', 'estado': 'Inscrito', 'rol': 'aspirante'}),
+    ('obtener_examen_por_id', 'examenes', {'id': 'x'}),
+    ('obtener_examenes_por_ids', 'examenes', {'id': {'$in': ['x', 'y']}}),
+    ('obtener_examenes_por_periodo_carrera_jornada', 'examenes',
+     {'periodo': 'x', 'carrera': 'y', 'jornada': 'z'}),
+    ('obtener_asignaciones_por_examen', 'asignaciones_examen', {'examen_id': 'x', 'distribucion_id': 'y'}),
+    ('obtener_asignaciones_por_aspirante', 'asignaciones_examen', {'aspirante_correo': 'x'}),
+    ('contar_asignaciones_por_lab', 'asignaciones_examen',
+     {'lab_id': 'x', 'examen_id': 'y', 'distribucion_id': 'z'}),
+    ('guardar_calificacion', 'asignaciones_examen', {'id': 'x'}),
+    ('obtener_laboratorios_por_sede', 'laboratories', {'sede': 'x'}),
+    ('listar_documentos', 'documents', {'student_id': 'x'}),
+    ('reservar_asiento', 'ocupacion_labs',
+     {'examen_id': 'x', 'distribucion_id': 'y', 'sede': 'z', 'libres': {'$gt': 0}}),
+    ('obtener_trabajo', 'trabajos', {'id': 'x'}),
+    # Primera página del listado con cada orden permitido (el índice evita ordenar en memoria)
+    ('listar_aspirantes_pagina (nombre)', 'students', {'rol': {'$ne': 'admin'}},
+     [('nombre', ASCENDING), ('_id', ASCENDING)]),
+    ('listar_aspirantes_pagina (correo)', 'students', {'rol': {'$ne': 'admin'}}, [('correo', ASCENDING)]),
+    ('listar_aspirantes_pagina (dni)', 'students', {'rol': {'$ne': 'admin'}},
+     [('dni', ASCENDING), ('_id', ASCENDING)]),
+]
+
+
+def _especificacion(documento: dict) -> dict:
+    """Normaliza un índice (declarado o existente) a {'key': [...], opciones...}."""
+    claves = documento['key']
+    # index_information() entrega una lista de tuplas; IndexModel un SON (diccionario ordenado)
+    pares = claves.items() if hasattr(claves, 'items') else claves
+    spec = {'key': [(campo, int(direccion)) for campo, direccion in pares]}
+    for opcion in _OPCIONES_COMPARADAS:
+        if documento.get(opcion) is not None:
+            spec[opcion] = documento[opcion]
+    return spec
+
+
+def asegurar_indices(db, reparar: bool = False) -> dict:
+    """
+    Crea los índices que falten (idempotente) y reporta las diferencias con lo declarado.
+    Con reparar=True, los índices que existen con otra definición se eliminan y se recrean.
+    Los índices de INDICES_RETIRADOS se eliminan.
+    Retorna {'creados': [...], 'eliminados': [...], 'diferencias': [...], 'errores': [...]}.
+    """
+    reporte = {'creados': [], 'eliminados': [], 'diferencias': [], 'errores': []}
+
+    for coleccion, modelos in INDICES.items():
+        existentes = db[coleccion].index_information()
+        declarados = set()
+
+        for nombre in INDICES_RETIRADOS.get(coleccion, []):
+            if nombre in existentes:
+                db[coleccion].drop_index(nombre)
+                del existentes[nombre]
+                reporte['eliminados'].append(f"{coleccion}.{nombre}")
+
+        for modelo in modelos:
+            nombre = modelo.document['name']
+            declarados.add(nombre)
+            etiqueta = f"{coleccion}.{nombre}"
+            deseado = _especificacion(modelo.document)
+
+            if nombre in existentes:
+                actual = _especificacion(existentes[nombre])
+                if actual == deseado:
+                    continue
+                reporte['diferencias'].append(f"{etiqueta}: existe como {actual}, se declara {deseado}")
+                if not reparar:
+                    continue
+                db[coleccion].drop_index(nombre)
+
+            try:
+                db[coleccion].create_indexes([modelo])
+                reporte['creados'].append(etiqueta)
+            except OperationFailure as e:
+                # Por ejemplo: datos duplicados que impiden un índice único
+                reporte['errores'].append(f"{etiqueta}: {e}")
+
+        for nombre in existentes:
+            if nombre != '_id_' and nombre not in declarados:
+                reporte['diferencias'].append(f"{coleccion}.{nombre}: índice no declarado")
+
+    return reporte
+
+
+def etapas_del_plan(plan: dict):
+    """Recorre el árbol de un plan de ejecución y retorna los nombres de sus etapas."""
+    etapas = [plan.get('stage')]
+    if 'inputStage' in plan:
+        etapas += etapas_del_plan(plan['inputStage'])
+    for hijo in plan.get('inputStages', []):
+        etapas += etapas_del_plan(hijo)
+    return etapas
+
+
+def verificar_planes(db) -> list:
+    """
+    Ejecuta explain() sobre cada consulta del repositorio.
+    Retorna [(descripción, usa_indice: bool, etapas)] para detectar COLLSCAN.
+    """
+    resultados = []
+    for descripcion, coleccion, filtro, *orden in CONSULTAS_REPOSITORIO:
+        comando = {'find': coleccion, 'filter': filtro}
+        if orden:
+            comando['sort'] = dict(orden[0])
+        explicacion = db.command('explain', comando, verbosity='queryPlanner')
+        plan = explicacion['queryPlanner']['winningPlan']
+        # Desde MongoDB 7 el plan puede venir envuelto en 'queryPlan'
+        etapas = etapas_del_plan(plan.get('queryPlan', plan))
+        # Con orden, además, no debe haber un SORT en memoria
+        usa_indice = 'IXSCAN' in etapas and 'COLLSCAN' not in etapas and not (orden and 'SORT' in etapas)
+        resultados.append((descripcion, usa_indice, etapas))
+    return resultados
+
+
+def imprimir_reporte(reporte: dict):
+    """Imprime el resultado de asegurar_indices en el mismo formato que el resto del sistema."""
+    for etiqueta in reporte['creados']:
+        print(f">>> Índice creado: {etiqueta}")
+    for etiqueta in reporte['eliminados']:
+        print(f">>> Índice retirado eliminado: {etiqueta}")
+    for diferencia in reporte['diferencias']:
+        print(f">>> Diferencia de índices: {diferencia}")
+    for error in reporte['errores']:
+        print(f">>> Error al crear índice {error}")
@@ -0,0 +1,122 @@
+# sipu/infrastructure/mapa_identidad.py
+"""
+Mapa de identidad de una petición.
+Una misma petición suele leer varias veces al mismo aspirante (la ruta y luego el servicio):
+con el mapa de identidad solo la primera lectura va a la base de datos. Las escrituras van
+directo al repositorio (así un error, p. ej. un DNI repetido, se conoce en el momento).
+"""
+from typing import List, Optional
+
+from ..domain.interfaces import ISipuRepository
+from ..domain.models import Aspirante
+
+
+class MapaIdentidad:
+    """
+    Envuelve al repositorio durante una petición (Patrón Proxy):
+    cada aspirante se lee una sola vez por correo o DNI y las lecturas repetidas retornan
+    el mismo objeto (un "no existe" también se recuerda). Al guardar, el mapa se queda con
+    lo escrito; si la escritura falla, olvida al aspirante (el objeto pudo quedar modificado).
+    Los demás métodos pasan directo al repositorio. Cerrado el mapa, todo pasa directo.
+    """
+
+    def __init__(self, repositorio: ISipuRepository):
+        self._repositorio = repositorio
+        self._crudos = {}       # correo -> documento completo (None si no existe)
+        self._aspirantes = {}   # correo -> Aspirante (None si no existe)
+        self._por_dni = {}      # dni -> correo (None si no existe)
+        self._abierto = True
+
+    def __getattr__(self, nombre):
+        # Solo se llama para lo que esta clase no define: el resto del repositorio
+        return getattr(self._repositorio, nombre)
+
+    # ---------- Mapa de identidad ----------
+
+    def _olvidar(self, correo: str):
+        """Saca a un aspirante del mapa: la próxima lectura vuelve a la base de datos."""
+        self._crudos.pop(correo, None)
+        self._aspirantes.pop(correo, None)
+        for dni in [dni for dni, dueno in self._por_dni.items() if dueno == correo]:
+            del self._por_dni[dni]
+
+    def _registrar(self, correo: str, aspirante: Optional[Aspirante]) -> Optional[Aspirante]:
+        self._aspirantes[correo] = aspirante
+        if aspirante is not None and aspirante.dni:
+            self._por_dni[aspirante.dni] = correo
+        return aspirante
+
+    def obtener_aspirante_crudo_por_correo(self, correo: str) -> Optional[dict]:
+        if not self._abierto:
+            return self._repositorio.obtener_aspirante_crudo_por_correo(correo)
+        if correo not in self._crudos:
+            self._crudos[correo] = self._repositorio.obtener_aspirante_crudo_por_correo(correo)
+        doc = self._crudos[correo]
+        # Copia: quien lo recibe puede agregarle campos (p. ej. los nombres de los catálogos)
+        return dict(doc) if doc is not None else None
+
+    def obtener_aspirante_por_correo(self, correo: str) -> Optional[Aspirante]:
+        if not self._abierto:
+            return self._repositorio.obtener_aspirante_por_correo(correo)
+        if correo in self._aspirantes:
+            return self._aspirantes[correo]
+        if correo in self._crudos:
+            # Ya se leyó el documento completo: se rehidrata sin volver a consultar
+            doc = self._crudos[correo]
+            return self._registrar(correo, Aspirante.desde_documento(doc) if doc else None)
+        return self._registrar(correo, self._repositorio.obtener_aspirante_por_correo(correo))
+
+    def obtener_aspirante_por_dni(self, dni: str) -> Optional[Aspirante]:
+        if not self._abierto:
+            return self._repositorio.obtener_aspirante_por_dni(dni)
+        if dni in self._por_dni:
+            correo = self._por_dni[dni]
+            return self._aspirantes.get(correo) if correo is not None else None
+        aspirante = self._repositorio.obtener_aspirante_por_dni(dni)
+        if aspirante is None:
+            self._por_dni[dni] = None
+            return None
+        # Si ya estaba en el mapa (leído por correo) se retorna ese mismo objeto
+        return self._aspirantes.get(aspirante.correo) or self._registrar(aspirante.correo, aspirante)
+
+    # ---------- Escrituras ----------
+
+    def guardar_aspirante(self, aspirante: Aspirante) -> bool:
+        if not self._abierto:
+            return self._repositorio.guardar_aspirante(aspirante)
+        guardado = self._repositorio.guardar_aspirante(aspirante)
+        self._actualizar([aspirante], guardado)
+        return guardado
+
+    def guardar_aspirantes(self, aspirantes: List[Aspirante]) -> bool:
+        if not self._abierto:
+            return self._repositorio.guardar_aspirantes(aspirantes)
+        guardados = self._repositorio.guardar_aspirantes(aspirantes)
+        self._actualizar(aspirantes, guardados)
+        return guardados
+
+    def _actualizar(self, aspirantes: List[Aspirante], guardados: bool):
+        for aspirante in aspirantes:
+            # El documento crudo y los DNIs anteriores ya no corresponden a lo guardado
+            self._olvidar(aspirante.correo)
+            if guardados:
+                self._registrar(aspirante.correo, aspirante)
+
+    def crear_usuario(self, usuario_doc: dict) -> bool:
+        creado = self._repositorio.crear_usuario(usuario_doc)
+        if creado and self._abierto:
+            correo = usuario_doc.get('correo')
+            self._crudos[correo] = dict(usuario_doc)
+            self._aspirantes.pop(correo, None)
+        return creado
+
+    def cerrar(self):
+        """Vacía el mapa; desde aquí todo pasa directo al repositorio."""
+        self._abierto = False
+        self._crudos.clear()
+        self._aspirantes.clear()
+        self._por_dni.clear()
+
+
+# Cumple la interfaz del repositorio (los métodos que no define los delega)
+ISipuRepository.register(MapaIdentidad)
@@ -0,0 +1,514 @@
+# sipu/infrastructure/memory_repository.py
+import threading
+from datetime import datetime
+from typing import List, Optional
+from bson import ObjectId
+
+from ..domain.interfaces import ISipuRepository
+from ..domain.models import Aspirante, Documento
+from ..domain.lecturas import FilaAspirante, FilaAsignacion, FilaExamen
+
+
+class InMemorySipuRepository(ISipuRepository):
+    """
+    Implementación en memoria de ISipuRepository (Polimorfismo: mismo contrato, otro almacenamiento).
+    Sirve para pruebas rápidas y para medir la capa de servicios sin el ruido de la base de datos.
+    Los documentos se guardan en diccionarios con índices secundarios por correo, dni y examen_id.
+    Igual que MongoDB, cada lectura retorna copias: modificar el resultado no altera lo guardado.
+    """
+
+    CATALOGOS = ('periods', 'careers', 'sedes')
+    CAMPOS_LISTADO = ('nombre', 'correo', 'dni', 'periodo', 'carrera', 'jornada', 'sede', 'estado')
+    CAMPOS_ASIGNACION = ('id', 'examen_id', 'aspirante_correo', 'aspirante_nombre', 'sede', 'lab_nombre',
+                         'num_computadora', 'estado', 'nota', 'observaciones', 'fecha_evaluacion')
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+        # Usuarios: _id -> documento, con índices únicos por correo y dni
+        self._estudiantes = {}
+        self._por_correo = {}
+        self._por_dni = {}
+
+        # Documentos adjuntos, indexados por correo y por student_id
+        self._documentos_por_correo = {}
+        self._documentos_por_propietario = {}
+
+        self._catalogos = {nombre: [] for nombre in self.CATALOGOS}
+        self._mapas = {nombre: {} for nombre in self.CATALOGOS}
+        self._laboratorios = []
+
+        self._examenes = {}
+        # Asignaciones: id -> documento, con índices por examen y por aspirante (conservan el orden de inserción)
+        self._asignaciones = {}
+        self._asig_por_examen = {}
+        self._asig_por_correo = {}
+        # Contadores de ocupación: (examen_id, distribucion_id) -> {lab_id: contador}
+        self._ocupacion = {}
+        # Trabajos en segundo plano: id -> documento
+        self._trabajos = {}
+
+    # ---------- Utilidades internas ----------
+
+    @staticmethod
+    def _copia(doc: dict, campos=None) -> dict:
+        if campos is None:
+            return dict(doc)
+        return {campo: doc[campo] for campo in campos if campo in doc}
+
+    def _indexar_dni(self, doc: dict, dni_anterior=None):
+        if dni_anterior and self._por_dni.get(dni_anterior) == doc['_id']:
+            del self._por_dni[dni_anterior]
+        if doc.get('dni'):
+            self._por_dni[doc['dni']] = doc['_id']
+
+    def _distribucion_activa(self, examen_id: str):
+        examen = self._examenes.get(examen_id)
+        return examen.get('distribucion_id') if examen else None
+
+    def _publicada(self, asignacion: dict) -> bool:
+        return asignacion.get('distribucion_id') == self._distribucion_activa(asignacion.get('examen_id'))
+
+    def _agregar_asignacion(self, asignacion: dict):
+        if asignacion['id'] in self._asignaciones:
+            raise ValueError(f"Asignación duplicada: {asignacion['id']}")
+        doc = dict(asignacion)
+        doc.setdefault('_id', ObjectId())
+        self._asignaciones[doc['id']] = doc
+        self._asig_por_examen.setdefault(doc['examen_id'], {})[doc['id']] = None
+        self._asig_por_correo.setdefault(doc['aspirante_correo'], {})[doc['id']] = None
+
+    def _quitar_asignacion(self, asignacion_id: str):
+        doc = self._asignaciones.pop(asignacion_id)
+        self._asig_por_examen.get(doc['examen_id'], {}).pop(asignacion_id, None)
+        self._asig_por_correo.get(doc['aspirante_correo'], {}).pop(asignacion_id, None)
+
+    # ---------- Carga de datos (equivalente a seed_db) ----------
+
+    def agregar_laboratorios(self, laboratorios: list):
+        with self._lock:
+            self._laboratorios.extend(dict(lab) for lab in laboratorios)
+
+    def agregar_documentos(self, documentos: list):
+        with self._lock:
+            for documento in documentos:
+                doc = dict(documento)
+                if doc.get('correo'):
+                    self._documentos_por_correo.setdefault(doc['correo'], []).append(doc)
+                if doc.get('student_id'):
+                    self._documentos_por_propietario.setdefault(doc['student_id'], []).append(doc)
+
+    # ---------- Catálogos ----------
+
+    def obtener_periodos(self):
+        return [dict(p) for p in self._catalogos['periods']]
+
+    def obtener_carreras(self):
+        return [dict(c) for c in self._catalogos['careers']]
+
+    def obtener_sedes(self):
+        return [dict(s) for s in self._catalogos['sedes']]
+
+    def obtener_mapa_periodos(self) -> dict:
+        return self._mapas['periods']
+
+    def obtener_mapa_carreras(self) -> dict:
+        return self._mapas['careers']
+
+    def obtener_mapa_sedes(self) -> dict:
+        return self._mapas['sedes']
+
+    def invalidar_catalogos(self, coleccion: str = None):
+        # Los mapas se reconstruyen en cada escritura: no hay caché que descartar
+        pass
+
+    def reemplazar_catalogo(self, coleccion: str, items: list) -> bool:
+        with self._lock:
+            self._catalogos[coleccion] = [dict(item) for item in items]
+            self._mapas[coleccion] = {item.get('id'): item.get('nombre') for item in items}
+        return True
+
+    # ---------- Aspirantes y usuarios ----------
+
+    def guardar_aspirante(self, aspirante: Aspirante) -> bool:
+        try:
+            aspirante.validar()
+        except ValueError as e:
+            print(f"Error al guardar aspirante: {e}")
+            return False
+        cambios = aspirante.a_documento()
+        with self._lock:
+            # Mismo índice único que en MongoDB
+            dueño_dni = self._por_dni.get(aspirante.dni) if aspirante.dni else None
+            _id = self._por_correo.get(aspirante.correo)
+            if dueño_dni is not None and dueño_dni != _id:
+                return False
+
+            if _id is None:
+                doc = dict(cambios, _id=ObjectId(), version=1)
+                self._estudiantes[doc['_id']] = doc
+                self._por_correo[doc['correo']] = doc['_id']
+                self._indexar_dni(doc)
+            else:
+                doc = self._estudiantes[_id]
+                dni_anterior = doc.get('dni')
+                doc.update(cambios)
+                doc['version'] = doc.get('version', 0) + 1
+                self._indexar_dni(doc, dni_anterior)
+        return True
+
+    def guardar_aspirantes(self, aspirantes: List[Aspirante]) -> bool:
+        return all([self.guardar_aspirante(aspirante) for aspirante in aspirantes])
+
+    def obtener_aspirante_por_correo(self, correo: str) -> Optional[Aspirante]:
+        _id = self._por_correo.get(correo)
+        return Aspirante.desde_documento(self._estudiantes[_id]) if _id is not None else None
+
+    def obtener_aspirante_por_dni(self, dni: str) -> Optional[Aspirante]:
+        _id = self._por_dni.get(dni)
+        return Aspirante.desde_documento(self._estudiantes[_id]) if _id is not None else None
+
+    def obtener_aspirante_crudo_por_correo(self, correo: str):
+        _id = self._por_correo.get(correo)
+        return dict(self._estudiantes[_id]) if _id is not None else None
+
+    def buscar_aspirantes_existentes(self, correos: list, dnis: list) -> tuple:
+        return ({c for c in correos if c in self._por_correo},
+                {d for d in dnis if d in self._por_dni})
+
+    def importar_aspirantes(self, docs: list) -> dict:
+        resultado = {'insertados': 0, 'errores': {}}
+        for doc in docs:
+            # Misma semántica que el upsert con $setOnInsert: el correo existente no se modifica
+            if doc['correo'] in self._por_correo:
+                resultado['errores'][doc['correo']] = "El correo ya está registrado"
+            elif not self.crear_usuario(dict(doc)):
+                resultado['errores'][doc['correo']] = "El DNI ya está registrado"
+            else:
+                resultado['insertados'] += 1
+        return resultado
+
+    def crear_usuario(self, usuario_doc: dict) -> bool:
+        with self._lock:
+            if usuario_doc.get('correo') in self._por_correo:
+                return False
+            if usuario_doc.get('dni') and usuario_doc['dni'] in self._por_dni:
+                return False
+            doc = dict(usuario_doc)
+            doc.setdefault('_id', ObjectId())
+            doc.setdefault('version', 1)
+            usuario_doc['_id'] = doc['_id']  # insert_one también completa el _id del original
+            self._estudiantes[doc['_id']] = doc
+            self._por_correo[doc['correo']] = doc['_id']
+            self._indexar_dni(doc)
+        return True
+
+    def listar_estudiantes_crudos(self) -> list:
+        return [dict(doc) for doc in self._estudiantes.values()]
+
+    def listar_filas_aspirantes(self) -> List[FilaAspirante]:
+        return FilaAspirante.desde_documentos(doc for doc in list(self._estudiantes.values())
+                                              if doc.get('rol') != 'admin')
+
+    def _cumple_filtros(self, doc: dict, filtros: dict) -> bool:
+        if doc.get('rol') == 'admin':
+            return False
+        return all(doc.get(campo) == filtros[campo] for campo in self.FILTROS_LISTADO if filtros.get(campo))
+
+    def listar_aspirantes_pagina(self, filtros: dict, orden: str = 'nombre', descendente: bool = False,
+                                 limite: int = 25, despues: tuple = None) -> list:
+        if orden not in self.CAMPOS_ORDEN_LISTADO:
+            raise ValueError(f"Orden no válido. Use: {list(self.CAMPOS_ORDEN_LISTADO)}")
+
+        # Mismo orden que MongoDB: los nulos antes que cualquier texto, desempate por _id
+        def clave(doc):
+            valor = doc.get(orden)
+            return (0, '') if valor is None else (1, valor), doc['_id']
+
+        candidatos = [doc for doc in self._estudiantes.values() if self._cumple_filtros(doc, filtros)]
+        candidatos.sort(key=clave, reverse=descendente)
+
+        if despues is not None and ObjectId.is_valid(despues[1]):
+            valor, ultimo_id = despues[0], ObjectId(despues[1])
+            limite_clave = ((0, '') if valor is None else (1, valor), ultimo_id)
+            if descendente:
+                candidatos = [doc for doc in candidatos if clave(doc) < limite_clave]
+            else:
+                candidatos = [doc for doc in candidatos if clave(doc) > limite_clave]
+
+        return FilaAspirante.desde_documentos(candidatos[:limite])
+
+    def iterar_aspirantes(self, filtros: dict, correos: list = None):
+        if correos is not None:
+            ids = (self._por_correo.get(correo) for correo in correos)
+            docs = (self._estudiantes[_id] for _id in ids if _id is not None)
+        else:
+            docs = list(self._estudiantes.values())
+        for doc in docs:
+            if self._cumple_filtros(doc, filtros):
+                yield self._copia(doc, ('_id',) + self.CAMPOS_LISTADO)
+
+    def iterar_candidatos_examen(self, periodo: str, carrera: str, jornada: str):
+        for doc in list(self._estudiantes.values()):
+            if (doc.get('estado') == 'Inscrito' and doc.get('rol') == 'aspirante' and
+                    doc.get('periodo') == periodo and doc.get('carrera') == carrera and
+                    doc.get('jornada') == jornada):
+                yield self._copia(doc, ('correo', 'nombre', 'sede'))
+
+    # ---------- Documentos ----------
+
+    def listar_documentos(self, propietario_id: str) -> List[Documento]:
+        return Documento.desde_documentos(self._documentos_por_propietario.get(propietario_id, []))
+
+    def listar_documentos_crudos(self, correo: str) -> list:
+        return [self._copia(doc, ('tipo', 'nombre_archivo', 'estado', 'obs'))
+                for doc in self._documentos_por_correo.get(correo, [])]
+
+    # ---------- Laboratorios ----------
+
+    def obtener_laboratorios(self):
+        return [dict(lab) for lab in self._laboratorios]
+
+    def obtener_laboratorios_por_sede(self, sede: str):
+        return [dict(lab) for lab in self._laboratorios if lab.get('sede') == sede]
+
+    # ---------- Exámenes ----------
+
+    def crear_examen(self, examen_dict: dict) -> bool:
+        with self._lock:
+            if examen_dict.get('id') in self._examenes:
+                return False
+            self._examenes[examen_dict['id']] = dict(examen_dict)
+            self._examenes[examen_dict['id']].setdefault('version', 1)
+        return True
+
+    def obtener_examenes(self) -> List[FilaExamen]:
+        return FilaExamen.desde_documentos(list(self._examenes.values()))
+
+    def obtener_examenes_por_periodo_carrera_jornada(self, periodo: str, carrera: str, jornada: str):
+        return [dict(e) for e in self._examenes.values()
+                if e.get('periodo') == periodo and e.get('carrera') == carrera and e.get('jornada') == jornada]
+
+    def obtener_examen_por_id(self, examen_id: str):
+        examen = self._examenes.get(examen_id)
+        return dict(examen) if examen else None
+
+    def obtener_examenes_por_ids(self, examen_ids) -> dict:
+        return {e: dict(self._examenes[e]) for e in set(examen_ids) if e in self._examenes}
+
+    # ---------- Asignaciones y calificaciones ----------
+
+    def crear_asignacion_examen(self, asignacion_dict: dict) -> bool:
+        with self._lock:
+            try:
+                asignacion_dict.setdefault('version', 1)
+                self._agregar_asignacion(asignacion_dict)
+                return True
+            except ValueError as e:
+                print(f"Error al crear asignación: {e}")
+                return False
+
+    def obtener_asignaciones_por_examen(self, examen_id: str) -> List[FilaAsignacion]:
+        activa = self._distribucion_activa(examen_id)
+        ids = list(self._asig_por_examen.get(examen_id, ()))
+        return FilaAsignacion.desde_documentos(self._asignaciones[i] for i in ids
+                                               if self._asignaciones[i].get('distribucion_id') == activa)
+
+    def obtener_asignaciones_por_aspirante(self, correo: str):
+        ids = list(self._asig_por_correo.get(correo, ()))
+        return [dict(self._asignaciones[i]) for i in ids if self._publicada(self._asignaciones[i])]
+
+    def contar_asignaciones_por_lab(self, lab_id: str, examen_id: str) -> int:
+        activa = self._distribucion_activa(examen_id)
+        contador = self._ocupacion.get((examen_id, activa), {}).get(lab_id)
+        if contador is not None:
+            return contador['ocupados']
+        return sum(1 for i in list(self._asig_por_examen.get(examen_id, ()))
+                   if self._asignaciones[i].get('lab_id') == lab_id and
+                   self._asignaciones[i].get('distribucion_id') == activa)
+
+    def registrar_ocupacion(self, examen_id: str, distribucion_id: str, ocupacion: list) -> bool:
+        with self._lock:
+            contadores = self._ocupacion.setdefault((examen_id, distribucion_id), {})
+            for lab in ocupacion:
+                if lab['lab_id'] not in contadores:
+                    contadores[lab['lab_id']] = {
+                        'examen_id': examen_id, 'distribucion_id': distribucion_id,
+                        'lab_id': lab['lab_id'], 'lab_nombre': lab['lab_nombre'], 'sede': lab['sede'],
+                        'capacidad': lab['capacidad'], 'ocupados': lab['ocupados'],
+                        'libres': lab['capacidad'] - lab['ocupados']
+                    }
+            # Igual que el sort por lab_id de MongoDB
+            self._ocupacion[(examen_id, distribucion_id)] = dict(sorted(contadores.items()))
+        return True
+
+    def obtener_ocupacion(self, examen_id: str) -> list:
+        contadores = self._ocupacion.get((examen_id, self._distribucion_activa(examen_id)), {})
+        return [dict(c) for c in contadores.values()]
+
+    def reservar_asiento(self, examen_id: str, sede: str):
+        with self._lock:
+            distribucion_id = self._distribucion_activa(examen_id)
+            for contador in self._ocupacion.get((examen_id, distribucion_id), {}).values():
+                if contador['sede'] == sede and contador['libres'] > 0:
+                    contador['ocupados'] += 1
+                    contador['libres'] -= 1
+                    return {
+                        'distribucion_id': distribucion_id,
+                        'lab_id': contador['lab_id'],
+                        'lab_nombre': contador['lab_nombre'],
+                        'sede': contador['sede'],
+                        'num_computadora': contador['ocupados']
+                    }
+        return None
+
+    def liberar_asiento(self, examen_id: str, asiento: dict) -> bool:
+        with self._lock:
+            contador = self._ocupacion.get((examen_id, asiento['distribucion_id']), {}).get(asiento['lab_id'])
+            if contador is None or contador['ocupados'] != asiento['num_computadora']:
+                return False
+            contador['ocupados'] -= 1
+            contador['libres'] += 1
+        return True
+
+    def eliminar_asignaciones_examen(self, examen_id: str) -> bool:
+        with self._lock:
+            for asignacion_id in list(self._asig_por_examen.get(examen_id, ())):
+                self._quitar_asignacion(asignacion_id)
+        return True
+
+    def publicar_distribucion(self, examen_id: str, distribucion_id: str, asignaciones: list,
+                              ocupacion: list = None) -> bool:
+        with self._lock:
+            insertadas = []
+            try:
+                for asignacion in asignaciones:
+                    self._agregar_asignacion(asignacion)
+                    insertadas.append(asignacion['id'])
+            except ValueError as e:
+                print(f"Error al insertar asignaciones: {e}")
+                for asignacion_id in insertadas:
+                    self._quitar_asignacion(asignacion_id)
+                return False
+            if ocupacion:
+                self.registrar_ocupacion(examen_id, distribucion_id, ocupacion)
+
+            anterior = None
+            if examen_id in self._examenes:
+                examen = self._examenes[examen_id]
+                anterior = examen.get('distribucion_id')
+                examen['distribucion_anterior'] = anterior
+                examen['distribucion_id'] = distribucion_id
+                examen['version'] = examen.get('version', 0) + 1
+            # Igual que en MongoDB: la distribución anterior se conserva hasta la próxima publicación
+            conservar = (distribucion_id, anterior)
+            for asignacion_id in list(self._asig_por_examen.get(examen_id, ())):
+                if self._asignaciones[asignacion_id].get('distribucion_id') not in conservar:
+                    self._quitar_asignacion(asignacion_id)
+            for clave in [c for c in self._ocupacion if c[0] == examen_id and c[1] not in conservar]:
+                del self._ocupacion[clave]
+        return True
+
+    def iterar_asignaciones(self, examen_id: str = None, solo_evaluadas: bool = False):
+        if examen_id:
+            ids = list(self._asig_por_examen.get(examen_id, ()))
+        else:
+            ids = list(self._asignaciones)
+        for asignacion_id in ids:
+            doc = self._asignaciones.get(asignacion_id)
+            if doc is None or not self._publicada(doc):
+                continue
+            if solo_evaluadas and doc.get('estado') == 'Pendiente':
+                continue
+            yield self._copia(doc, self.CAMPOS_ASIGNACION)
+
+    def _calificar(self, doc: dict, presentó: bool, nota, observaciones: str, fecha: str):
+        doc.update({
+            'estado': 'Presentado' if presentó else 'No presentado',
+            'nota': nota if presentó else None,
+            'observaciones': observaciones,
+            'fecha_evaluacion': fecha if presentó else None
+        })
+        doc['version'] = doc.get('version', 0) + 1
+
+    def guardar_calificacion(self, asignacion_id: str, presentó: bool, nota: int, observaciones: str) -> bool:
+        with self._lock:
+            doc = self._asignaciones.get(asignacion_id)
+            if doc is None:
+                return False
+            self._calificar(doc, presentó, nota, observaciones, datetime.now().isoformat())
+        return True
+
+    def guardar_calificaciones_lote(self, examen_id: str, calificaciones: list) -> dict:
+        fecha = datetime.now().isoformat()
+        resultados = {}
+        with self._lock:
+            for asignacion_id, presentó, nota, observaciones in calificaciones:
+                doc = self._asignaciones.get(asignacion_id)
+                # Igual que el filtro {'id', 'examen_id'} en MongoDB: si no coincide, no se guardó
+                resultados[asignacion_id] = doc is not None and doc.get('examen_id') == examen_id
+                if resultados[asignacion_id]:
+                    self._calificar(doc, presentó, nota, observaciones, fecha)
+        return resultados
+
+    def obtener_calificaciones_aspirante(self, correo: str):
+        return self.obtener_asignaciones_por_aspirante(correo)
+
+    # ---------- Versiones (caché HTTP condicional) ----------
+
+    def obtener_version_aspirante(self, correo: str = None, dni: str = None) -> Optional[int]:
+        _id = self._por_correo.get(correo) if correo is not None else self._por_dni.get(dni)
+        return self._estudiantes[_id].get('version', 0) if _id is not None else None
+
+    def obtener_versiones_examenes_aspirante(self, correo: str) -> list:
+        versiones = []
+        for i in list(self._asig_por_correo.get(correo, ())):
+            asignacion = self._asignaciones[i]
+            if self._publicada(asignacion):
+                examen = self._examenes.get(asignacion['examen_id'], {})
+                versiones.append((asignacion['id'], asignacion.get('version', 0), asignacion['examen_id'],
+                                  examen.get('version', 0)))
+        return versiones
+
+    # ---------- Trabajos en segundo plano ----------
+
+    def crear_trabajo(self, trabajo: dict) -> bool:
+        with self._lock:
+            if trabajo['id'] in self._trabajos:
+                return False
+            self._trabajos[trabajo['id']] = dict(trabajo)
+        return True
+
+    def actualizar_trabajo(self, trabajo_id: str, cambios: dict) -> bool:
+        with self._lock:
+            doc = self._trabajos.get(trabajo_id)
+            if doc is None:
+                return False
+            doc.update(cambios)
+        return True
+
+    def obtener_trabajo(self, trabajo_id: str):
+        with self._lock:
+            doc = self._trabajos.get(trabajo_id)
+            return dict(doc) if doc is not None else None
+
+    def listar_trabajos(self, limite: int = 20) -> list:
+        with self._lock:
+            recientes = sorted(self._trabajos.values(), key=lambda t: t.get('creado') or '', reverse=True)
+            return [dict(t) for t in recientes[:limite]]
+
+    def registrar_latido_trabajos(self, trabajo_ids: list, momento: str) -> bool:
+        with self._lock:
+            for trabajo_id in trabajo_ids:
+                if trabajo_id in self._trabajos:
+                    self._trabajos[trabajo_id]['latido'] = momento
+        return True
+
+    def marcar_trabajos_huerfanos(self, estados: list, latido_limite: str, cambios: dict) -> int:
+        marcados = 0
+        with self._lock:
+            for doc in self._trabajos.values():
+                if doc.get('estado') in estados and (doc.get('latido') or '') < latido_limite:
+                    doc.update(cambios)
+                    marcados += 1
+        return marcados
@@ -0,0 +1,537 @@
+# sipu/infrastructure/metricas.py
+"""
+Instrumentación de la aplicación en formato de texto de Prometheus (sin dependencias extra):
+- latencia por endpoint (histograma),
+- comandos de MongoDB, documentos devueltos y tiempo por colección, atribuidos a la petición que los hizo,
+- espera por conexiones del pool de MongoDB y conexiones abiertas/en uso.
+
+Con varios procesos (gunicorn con pre-fork) cada worker tiene sus propios contadores y /metrics
+responde con los de quien atienda el scrape, que saltan hacia atrás entre un scrape y otro.
+Con SIPU_METRICAS_DIR (gunicorn.conf.py la configura) cada worker guarda una instantánea de
+sus métricas en esa carpeta y /metrics responde con la suma de todos los procesos.
+"""
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+
+from pymongo import monitoring
+
+from .consultas_lentas import RegistroConsultasLentas, explicando
+
+# Límites (en segundos) de los buckets del histograma de latencia
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Límites de los buckets de comandos de MongoDB por petición
+BUCKETS_COMANDOS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+# Límites (en segundos) de la espera por una conexión libre del pool de MongoDB
+BUCKETS_ESPERA_POOL = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Etiqueta de los comandos que no ocurren dentro de una petición (arranque, scripts, hilos)
+FUERA_DE_PETICION = 'fuera_de_peticion'
+
+# Cada cuántos segundos, como máximo, un proceso reescribe su instantánea en la carpeta compartida
+INTERVALO_INSTANTANEA = 1.0
+
+# Petición en curso en este contexto: {'endpoint': str, 'comandos': int}
+_peticion_actual = ContextVar('sipu_peticion_actual', default=None)
+
+
+class _Histograma:
+    """Histograma acumulado al estilo Prometheus (cada bucket cuenta las observaciones <= límite)."""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.conteos = [0] * len(limites)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.conteos[i] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class Metricas:
+    """
+    Patrón Creacional: Singleton.
+    Registro de métricas del proceso; lo alimentan los hooks de Flask y el listener de pymongo.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instancia = super(Metricas, cls).__new__(cls)
+                    instancia._lock_datos = threading.Lock()
+                    instancia._lock_escritura = threading.Lock()
+                    instancia._directorio = None
+                    instancia._ultima_escritura = 0.0
+                    instancia._temporizador = None
+                    instancia.reiniciar()
+                    cls._instance = instancia
+        return cls._instance
+
+    def reiniciar(self):
+        """Descarta todas las métricas acumuladas."""
+        with self._lock_datos:
+            # (endpoint, método, estado) -> _Histograma de segundos
+            self._latencias = {}
+            # endpoint -> _Histograma de comandos de MongoDB por petición
+            self._comandos_por_peticion = {}
+            # (endpoint, colección, comando) -> [comandos, documentos, segundos, errores]
+            self._mongo = {}
+            # servidor -> _Histograma de la espera por una conexión del pool
+            self._espera_pool = {}
+            # servidor -> {'max': int, 'abiertas': int, 'en_uso': int}
+            self._pool = {}
+            # (servidor, motivo) -> esperas que terminaron sin conexión
+            self._pool_fallidas = {}
+
+    def observar_peticion(self, endpoint: str, metodo: str, estado: int, segundos: float, comandos: int):
+        with self._lock_datos:
+            clave = (endpoint, metodo, str(estado))
+            if clave not in self._latencias:
+                self._latencias[clave] = _Histograma(BUCKETS_LATENCIA)
+            self._latencias[clave].observar(segundos)
+
+            if endpoint not in self._comandos_por_peticion:
+                self._comandos_por_peticion[endpoint] = _Histograma(BUCKETS_COMANDOS)
+            self._comandos_por_peticion[endpoint].observar(comandos)
+
+    def observar_comando(self, endpoint: str, coleccion: str, comando: str, documentos: int,
+                         segundos: float, error: bool = False):
+        with self._lock_datos:
+            clave = (endpoint, coleccion, comando)
+            acumulado = self._mongo.setdefault(clave, [0, 0, 0.0, 0])
+            acumulado[0] += 1
+            acumulado[1] += documentos
+            acumulado[2] += segundos
+            acumulado[3] += int(error)
+
+    def observar_espera_pool(self, servidor: str, segundos: float):
+        with self._lock_datos:
+            if servidor not in self._espera_pool:
+                self._espera_pool[servidor] = _Histograma(BUCKETS_ESPERA_POOL)
+            self._espera_pool[servidor].observar(segundos)
+
+    def observar_fallo_pool(self, servidor: str, motivo: str):
+        with self._lock_datos:
+            clave = (servidor, motivo)
+            self._pool_fallidas[clave] = self._pool_fallidas.get(clave, 0) + 1
+
+    def ajustar_pool(self, servidor: str, **cambios):
+        """Actualiza el estado del pool de un servidor: max=valor, abiertas=+1/-1, en_uso=+1/-1."""
+        with self._lock_datos:
+            estado = self._pool.setdefault(servidor, {'max': 0, 'abiertas': 0, 'en_uso': 0})
+            for campo, valor in cambios.items():
+                if campo == 'max':
+                    estado['max'] = valor
+                else:
+                    estado[campo] = max(0, estado[campo] + valor)
+
+    # ---------- Varios procesos ----------
+
+    def configurar_directorio(self, directorio):
+        """Activa (o con None desactiva) las instantáneas por proceso en `directorio`."""
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._directorio = directorio
+
+    def _reiniciar_tras_fork(self):
+        """El hijo empieza de cero: lo heredado del padre ya está en la instantánea del padre."""
+        self._lock_datos = threading.Lock()
+        self._lock_escritura = threading.Lock()
+        self._ultima_escritura = 0.0
+        self._temporizador = None
+        self.reiniciar()
+
+    def _estado(self) -> dict:
+        """Copia serializable (JSON) de las métricas del proceso."""
+        with self._lock_datos:
+            return {
+                'latencias': [[list(k), h.conteos, h.suma, h.total] for k, h in self._latencias.items()],
+                'comandos_por_peticion': [[[k], h.conteos, h.suma, h.total]
+                                          for k, h in self._comandos_por_peticion.items()],
+                'mongo': [[list(k), list(v)] for k, v in self._mongo.items()],
+                'espera_pool': [[[k], h.conteos, h.suma, h.total] for k, h in self._espera_pool.items()],
+                'pool': [[[k], dict(v)] for k, v in self._pool.items()],
+                'pool_fallidas': [[list(k), v] for k, v in self._pool_fallidas.items()],
+            }
+
+    def escribir_instantanea(self):
+        """Guarda las métricas de este proceso en la carpeta compartida (reemplazo atómico)."""
+        if not self._directorio:
+            return
+        with self._lock_escritura:
+            self._temporizador = None
+            self._ultima_escritura = time.monotonic()
+            archivo = os.path.join(self._directorio, f"sipu_{os.getpid()}.json")
+            temporal = f"{archivo}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(temporal, 'w', encoding='utf-8') as f:
+                    json.dump(self._estado(), f)
+                os.replace(temporal, archivo)
+            except OSError as e:
+                print(f"Error al guardar las métricas del proceso: {e}")
+
+    def programar_instantanea(self):
+        """Escribe la instantánea si pasó el intervalo; si no, la deja programada para cuando pase."""
+        if not self._directorio:
+            return
+        with self._lock_escritura:
+            espera = self._ultima_escritura + INTERVALO_INSTANTANEA - time.monotonic()
+            if espera > 0:
+                if self._temporizador is None:
+                    self._temporizador = threading.Timer(espera, self.escribir_instantanea)
+                    self._temporizador.daemon = True
+                    self._temporizador.start()
+                return
+        self.escribir_instantanea()
+
+    def _estado_de_todos(self) -> dict:
+        """Suma las instantáneas de todos los procesos (vivos y terminados) de la carpeta."""
+        self.escribir_instantanea()
+        total = {'latencias': {}, 'comandos_por_peticion': {}, 'mongo': {}, 'espera_pool': {},
+                 'pool': {}, 'pool_fallidas': {}}
+        limites = {'latencias': BUCKETS_LATENCIA, 'comandos_por_peticion': BUCKETS_COMANDOS,
+                   'espera_pool': BUCKETS_ESPERA_POOL}
+        for archivo in glob.glob(os.path.join(self._directorio, 'sipu_*.json')):
+            try:
+                with open(archivo, encoding='utf-8') as f:
+                    estado = json.load(f)
+            except (OSError, ValueError):
+                continue  # Otro proceso la está reemplazando o ya no existe
+            for campo, buckets in limites.items():
+                for clave, conteos, suma, cantidad in estado.get(campo, []):
+                    histograma = total[campo].setdefault(tuple(clave), _Histograma(buckets))
+                    histograma.conteos = [a + b for a, b in zip(histograma.conteos, conteos)]
+                    histograma.suma += suma
+                    histograma.total += cantidad
+            for clave, valores in estado.get('mongo', []):
+                acumulado = total['mongo'].setdefault(tuple(clave), [0, 0, 0.0, 0])
+                for i, valor in enumerate(valores):
+                    acumulado[i] += valor
+            for (servidor,), valores in estado.get('pool', []):
+                acumulado = total['pool'].setdefault(servidor, {'max': 0, 'abiertas': 0, 'en_uso': 0})
+                for campo, valor in valores.items():
+                    acumulado[campo] += valor
+            for clave, valor in estado.get('pool_fallidas', []):
+                total['pool_fallidas'][tuple(clave)] = total['pool_fallidas'].get(tuple(clave), 0) + valor
+        total['comandos_por_peticion'] = {k[0]: v for k, v in total['comandos_por_peticion'].items()}
+        total['espera_pool'] = {k[0]: v for k, v in total['espera_pool'].items()}
+        return total
+
+    # ---------- Exportación ----------
+
+    def exportar(self) -> str:
+        """
+        Retorna todas las métricas en el formato de texto de Prometheus (versión 0.0.4):
+        las de este proceso o, con carpeta compartida, la suma de todos los procesos.
+        """
+        if self._directorio:
+            return _exportar(**self._estado_de_todos())
+        with self._lock_datos:
+            return _exportar(self._latencias, self._comandos_por_peticion, self._mongo,
+                             self._espera_pool, self._pool, self._pool_fallidas)
+
+
+def _exportar(latencias, comandos_por_peticion, mongo, espera_pool, pool, pool_fallidas) -> str:
+    """Métricas en el formato de texto de Prometheus."""
+    lineas = []
+    lineas += _histogramas('sipu_http_request_duration_seconds',
+                           'Latencia de las peticiones HTTP por endpoint.',
+                           ('endpoint', 'metodo', 'estado'), latencias)
+    lineas += _histogramas('sipu_mongo_comandos_por_peticion',
+                           'Comandos de MongoDB ejecutados en cada petición HTTP.',
+                           ('endpoint',), {(k,): v for k, v in comandos_por_peticion.items()})
+
+    series = (
+        ('sipu_mongo_comandos_total', 'counter', 'Comandos de MongoDB ejecutados.', 0),
+        ('sipu_mongo_documentos_devueltos_total', 'counter', 'Documentos devueltos por MongoDB.', 1),
+        ('sipu_mongo_segundos_total', 'counter', 'Tiempo total en comandos de MongoDB.', 2),
+        ('sipu_mongo_errores_total', 'counter', 'Comandos de MongoDB que fallaron.', 3),
+    )
+    for nombre, tipo, ayuda, posicion in series:
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for (endpoint, coleccion, comando), valores in sorted(mongo.items()):
+            etiquetas = _etiquetas(endpoint=endpoint, coleccion=coleccion, comando=comando)
+            lineas.append(f"{nombre}{{{etiquetas}}} {_numero(valores[posicion])}")
+
+    lineas += _histogramas('sipu_mongo_pool_espera_segundos',
+                           'Espera por una conexión libre del pool de MongoDB.',
+                           ('servidor',), {(k,): v for k, v in espera_pool.items()})
+    medidores = (
+        ('sipu_mongo_pool_max_conexiones', 'Tamaño máximo configurado del pool.', 'max'),
+        ('sipu_mongo_pool_conexiones_abiertas', 'Conexiones abiertas en el pool.', 'abiertas'),
+        ('sipu_mongo_pool_conexiones_en_uso', 'Conexiones prestadas a un hilo en este momento.', 'en_uso'),
+    )
+    for nombre, ayuda, campo in medidores:
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} gauge")
+        for servidor, estado in sorted(pool.items()):
+            lineas.append(f"{nombre}{{{_etiquetas(servidor=servidor)}}} {estado[campo]}")
+    lineas.append("# HELP sipu_mongo_pool_esperas_fallidas_total "
+                  "Esperas por conexión que fallaron (p. ej. timeout).")
+    lineas.append("# TYPE sipu_mongo_pool_esperas_fallidas_total counter")
+    for (servidor, motivo), total in sorted(pool_fallidas.items()):
+        etiquetas = _etiquetas(servidor=servidor, motivo=motivo)
+        lineas.append(f"sipu_mongo_pool_esperas_fallidas_total{{{etiquetas}}} {total}")
+    return '\n'.join(lineas) + '\n'
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _etiquetas(**pares) -> str:
+    return ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in pares.items())
+
+
+def _numero(valor) -> str:
+    return repr(round(valor, 6)) if isinstance(valor, float) else str(valor)
+
+
+def _histogramas(nombre: str, ayuda: str, nombres_etiquetas: tuple, histogramas: dict) -> list:
+    lineas = [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} histogram"]
+    for valores_etiquetas, histograma in sorted(histogramas.items()):
+        base = _etiquetas(**dict(zip(nombres_etiquetas, valores_etiquetas)))
+        for limite, conteo in zip(histograma.limites, histograma.conteos):
+            lineas.append(f'{nombre}_bucket{{{base},le="{limite}"}} {conteo}')
+        lineas.append(f'{nombre}_bucket{{{base},le="+Inf"}} {histograma.total}')
+        lineas.append(f"{nombre}_sum{{{base}}} {_numero(histograma.suma)}")
+        lineas.append(f"{nombre}_count{{{base}}} {histograma.total}")
+    return lineas
+
+
+# ========== MONGODB ==========
+
+def _coleccion_de(comando_nombre: str, comando: dict) -> str:
+    """Colección sobre la que actúa un comando (getMore la trae en 'collection')."""
+    if comando_nombre == 'getMore':
+        return str(comando.get('collection', ''))
+    valor = comando.get(comando_nombre)
+    return valor if isinstance(valor, str) else ''
+
+
+def _documentos_devueltos(respuesta: dict) -> int:
+    """Cuenta los documentos de una respuesta (lotes de cursor, findAndModify, count, distinct)."""
+    cursor = respuesta.get('cursor')
+    if isinstance(cursor, dict):
+        return len(cursor.get('firstBatch') or cursor.get('nextBatch') or [])
+    if 'value' in respuesta:
+        return 1 if respuesta.get('value') else 0
+    if 'values' in respuesta:
+        return len(respuesta['values'])
+    return 0
+
+
+class MonitorComandos(monitoring.CommandListener):
+    """
+    Listener de pymongo: atribuye cada comando a la petición HTTP en curso (por contextvar)
+    y acumula comandos, documentos devueltos y tiempo por colección.
+    Los comandos que superan el umbral se pasan al registro de consultas lentas.
+    """
+    # Comandos internos del driver que no interesan (handshake, monitoreo, sesiones)
+    IGNORADOS = frozenset({'hello', 'ismaster', 'isMaster', 'ping', 'saslStart', 'saslContinue',
+                           'endSessions', 'buildInfo', 'getnonce', 'killCursors'})
+
+    def __init__(self):
+        self.metricas = Metricas()
+        self.consultas_lentas = RegistroConsultasLentas()
+        # (connection_id, request_id) -> (colección, base de datos, comando), entre started y succeeded/failed
+        self._en_curso = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        # Los explain del registro de consultas lentas no se miden (evita la recursión)
+        if event.command_name in self.IGNORADOS or explicando():
+            return
+        with self._lock:
+            self._en_curso[(event.connection_id, event.request_id)] = \
+                (_coleccion_de(event.command_name, event.command), event.database_name, event.command)
+
+    def _terminar(self, event, documentos: int, error: bool):
+        with self._lock:
+            en_curso = self._en_curso.pop((event.connection_id, event.request_id), None)
+        if en_curso is None:
+            return
+        coleccion, base_datos, comando = en_curso
+        peticion = _peticion_actual.get()
+        if peticion is not None:
+            peticion['comandos'] += 1
+        endpoint = peticion['endpoint'] if peticion is not None else FUERA_DE_PETICION
+        self.metricas.observar_comando(endpoint, coleccion, event.command_name, documentos,
+                                       event.duration_micros / 1_000_000, error)
+
+        duracion_ms = event.duration_micros / 1000
+        if self.consultas_lentas.es_lenta(duracion_ms):
+            self.consultas_lentas.registrar(base_datos, coleccion, event.command_name, comando,
+                                            duracion_ms, endpoint)
+
+    def succeeded(self, event):
+        if event.command_name in self.IGNORADOS:
+            return
+        self._terminar(event, _documentos_devueltos(event.reply), error=False)
+
+    def failed(self, event):
+        if event.command_name in self.IGNORADOS:
+            return
+        self._terminar(event, 0, error=True)
+
+
+def _servidor(direccion) -> str:
+    host, puerto = direccion
+    return f"{host}:{puerto}"
+
+
+class MonitorPool(monitoring.ConnectionPoolListener):
+    """
+    Listener del pool de conexiones de pymongo: mide cuánto espera cada hilo por una conexión
+    y cuántas hay abiertas y en uso, para ajustar maxPoolSize con datos de contención reales.
+    """
+
+    def __init__(self):
+        self.metricas = Metricas()
+        # La espera ocurre en el hilo que pide la conexión: el inicio se guarda por hilo
+        self._local = threading.local()
+
+    def pool_created(self, event):
+        # options solo trae lo que difiere del valor por defecto (maxPoolSize=100)
+        self.metricas.ajustar_pool(_servidor(event.address), max=event.options.get('maxPoolSize', 100))
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.metricas.ajustar_pool(_servidor(event.address), abiertas=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.metricas.ajustar_pool(_servidor(event.address), abiertas=-1)
+
+    def connection_check_out_started(self, event):
+        self._local.inicio = time.perf_counter()
+
+    def _espera(self) -> float:
+        inicio = getattr(self._local, 'inicio', None)
+        self._local.inicio = None
+        return time.perf_counter() - inicio if inicio is not None else 0.0
+
+    def connection_checked_out(self, event):
+        servidor = _servidor(event.address)
+        self.metricas.observar_espera_pool(servidor, self._espera())
+        self.metricas.ajustar_pool(servidor, en_uso=1)
+
+    def connection_check_out_failed(self, event):
+        servidor = _servidor(event.address)
+        self.metricas.observar_espera_pool(servidor, self._espera())
+        self.metricas.observar_fallo_pool(servidor, str(event.reason))
+
+    def connection_checked_in(self, event):
+        self.metricas.ajustar_pool(_servidor(event.address), en_uso=-1)
+
+
+# ========== VARIOS PROCESOS ==========
+
+def _reiniciar_metricas():
+    if Metricas._instance is not None:
+        Metricas._instance._reiniciar_tras_fork()
+
+
+def _instantanea_antes_de_fork():
+    # Lo que midió el padre (p. ej. la creación de índices al arrancar) queda en su propia instantánea
+    if Metricas._instance is not None:
+        Metricas._instance.escribir_instantanea()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_instantanea_antes_de_fork, after_in_child=_reiniciar_metricas)
+
+
+def limpiar_directorio_metricas(directorio: str):
+    """Borra las instantáneas de una ejecución anterior (al arrancar el servidor)."""
+    for archivo in glob.glob(os.path.join(directorio, 'sipu_*.json*')):
+        try:
+            os.remove(archivo)
+        except OSError:
+            pass
+
+
+def retirar_proceso_metricas(directorio: str, pid: int):
+    """
+    Un worker terminó: sus contadores se conservan (para que la suma no retroceda), pero sus
+    conexiones ya no existen. Se renombra la instantánea para que un nuevo proceso con el
+    mismo pid no la sobreescriba.
+    """
+    archivo = os.path.join(directorio, f"sipu_{pid}.json")
+    try:
+        with open(archivo, encoding='utf-8') as f:
+            estado = json.load(f)
+        estado['pool'] = []
+        with open(os.path.join(directorio, f"sipu_{pid}_{uuid.uuid4().hex}.json"), 'w', encoding='utf-8') as f:
+            json.dump(estado, f)
+        os.remove(archivo)
+    except (OSError, ValueError) as e:
+        print(f"Error al retirar las métricas del proceso {pid}: {e}")
+
+
+# ========== FLASK ==========
+
+def registrar_metricas(app, ruta: str = '/metrics'):
+    """
+    Instala los hooks de medición en la aplicación y expone las métricas en `ruta`.
+    Debe llamarse antes de registrar_contenedor: Flask ejecuta los teardown en orden inverso y así
+    lo que haga el contenedor al cerrar la petición todavía se cuenta en su endpoint.
+    """
+    import atexit
+
+    from flask import Response, g, request
+
+    metricas = Metricas()
+    metricas.configurar_directorio(app.config.get('METRICAS_DIR'))
+    atexit.register(metricas.escribir_instantanea)
+
+    @app.before_request
+    def _iniciar_medicion():
+        # La regla (p. ej. /aspirante/pdf/<dni>) mantiene acotado el número de series
+        endpoint = request.url_rule.rule if request.url_rule else 'sin_ruta'
+        g._metricas = (time.perf_counter(), _peticion_actual.set({'endpoint': endpoint, 'comandos': 0}))
+
+    @app.after_request
+    def _registrar_estado(response):
+        g._metricas_estado = response.status_code
+        return response
+
+    @app.teardown_request
+    def _terminar_medicion(error=None):
+        inicio_token = g.pop('_metricas', None)
+        if inicio_token is None:
+            return
+        inicio, token = inicio_token
+        peticion = _peticion_actual.get()
+        _peticion_actual.reset(token)
+        metricas.observar_peticion(peticion['endpoint'], request.method,
+                                   g.pop('_metricas_estado', 500),
+                                   time.perf_counter() - inicio, peticion['comandos'])
+        metricas.programar_instantanea()
+
+    def exportar_metricas():
+        return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    app.add_url_rule(ruta, 'metricas', exportar_metricas)
@@ -0,0 +1,134 @@
+# sipu/infrastructure/pdf_cache.py
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+
+
+class CachePDF:
+    """
+    Caché en disco de PDFs generados, direccionada por contenido.
+    La clave es un hash de todos los datos que afectan al documento, así que
+    cualquier cambio del aspirante (o de los catálogos) produce una clave nueva.
+    Se limita por tamaño total y desaloja los archivos menos usados (LRU).
+    El directorio es la única fuente de verdad (lo comparten todos los workers): el uso se
+    anota en la fecha de modificación de cada archivo y el tamaño se mide del directorio
+    al desalojar, así el límite es uno solo para todos los procesos.
+    """
+
+    def __init__(self, directorio: str = None, max_bytes: int = None):
+        self.directorio = directorio or os.environ.get(
+            'PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'sipu_pdf_cache')
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(os.environ.get('PDF_CACHE_MAX_MB', 256)) * 1024 * 1024
+        os.makedirs(self.directorio, exist_ok=True)
+        # Solo evita que dos hilos del mismo proceso desalojen a la vez
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(*partes) -> str:
+        """Hash SHA-256 estable de las entradas del documento."""
+        crudo = json.dumps(partes, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(crudo.encode('utf-8')).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.pdf")
+
+    def obtener_o_generar(self, clave: str, generar):
+        """
+        Retorna el PDF abierto en modo binario para servirlo desde disco.
+        Si no está en caché, llama a `generar()` (que retorna bytes) y lo guarda.
+        """
+        ruta = self._ruta(clave)
+        try:
+            archivo = open(ruta, 'rb')
+        except FileNotFoundError:
+            archivo = None
+        if archivo is not None:
+            try:
+                self._marcar_uso(ruta)
+            except Exception:
+                archivo.close()
+                raise
+            return archivo
+
+        contenido = generar()
+        try:
+            self._guardar(ruta, contenido)
+            return open(ruta, 'rb')
+        except OSError as e:
+            # Disco lleno, o lo desalojó otro worker antes de abrirlo: se sirve desde memoria
+            print(f"Error al usar la caché de PDFs: {e}")
+            return io.BytesIO(contenido)
+
+    @staticmethod
+    def _marcar_uso(ruta: str):
+        # La fecha de modificación es el orden LRU que comparten todos los procesos
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+
+    def _guardar(self, ruta: str, contenido: bytes):
+        # Escritura atómica: nunca se sirve un archivo a medio escribir
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(contenido)
+            os.replace(temporal, ruta)
+        except OSError:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            raise
+        self._desalojar(conservar=ruta)
+
+    def _archivos(self) -> list:
+        """(fecha de uso, tamaño, ruta) de cada PDF del directorio, del menos al más usado."""
+        archivos = []
+        with os.scandir(self.directorio) as entradas:
+            for entrada in entradas:
+                if not entrada.name.endswith('.pdf'):
+                    continue
+                try:
+                    estado = entrada.stat()
+                except OSError:
+                    continue  # Lo desalojó otro proceso mientras se recorría
+                archivos.append((estado.st_mtime, estado.st_size, entrada.path))
+        archivos.sort()
+        return archivos
+
+    def tamano_total(self) -> int:
+        """Bytes que ocupa la caché en disco (de todos los procesos)."""
+        return sum(tamano for _, tamano, _ in self._archivos())
+
+    def _desalojar(self, conservar: str):
+        """Elimina los archivos menos usados hasta volver al límite de tamaño."""
+        with self._lock:
+            archivos = self._archivos()
+            total = sum(tamano for _, tamano, _ in archivos)
+            for _, tamano, ruta in archivos:
+                if total <= self.max_bytes:
+                    break
+                if ruta == conservar:
+                    continue
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass  # Otro proceso ya lo desalojó: igual deja de contar
+                except OSError:
+                    continue
+                total -= tamano
+
+    def limpiar(self):
+        """Elimina todos los PDFs de la caché."""
+        with self._lock:
+            for _, _, ruta in self._archivos():
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
@@ -1,14 +1,23 @@
 import os
 from typing import List, Optional
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from bson import ObjectId
 
 # Importamos la interfaz y los modelos para cumplir con la Unidad 2 (DIP)
 from ..domain.interfaces import ISipuRepository
 from ..domain.models import Aspirante, Documento
+from ..domain.lecturas import FilaAspirante, FilaAsignacion, FilaExamen
 from .database import MongoDBClient # Importamos el Singleton
+from .cache import CatalogoCache
+
+# Tamaño de cada lote en las escrituras masivas
+TAMANO_LOTE = 1000
 
 class MongoSipuRepository(ISipuRepository):
+    # Campos del listado con índice único (correo_unico): se ordenan sin desempate por _id
+    CAMPOS_UNICOS_LISTADO = ('correo',)
+
     def __init__(self):
         # En lugar de crear un cliente nuevo, pedimos la instancia Singleton
         self.mongo_manager = MongoDBClient()
@@ -18,97 +27,271 @@ class MongoSipuRepository(ISipuRepository):
         self.students = self.db.students
         self.documents = self.db.documents
 
-    # --- Implementación de la Interfaz ---
+        # Caché compartida de catálogos (Singleton de proceso)
+        self.catalogos = CatalogoCache()
+
+    # --- Catálogos (servidos desde la caché) ---
+    def _catalogo(self, coleccion: str):
+        return self.catalogos.obtener(coleccion, lambda: self.db[coleccion].find())
+
     def obtener_periodos(self):
         """Retorna todos los periodos disponibles."""
-        return list(self.db.periods.find())
+        return list(self._catalogo('periods')['lista'])
 
     def obtener_carreras(self):
         """Retorna todas las carreras disponibles."""
-        return list(self.db.careers.find())
+        return list(self._catalogo('careers')['lista'])
     
     def obtener_sedes(self):
         """Retorna todas las sedes disponibles."""
-        return list(self.db.sedes.find())
+        return list(self._catalogo('sedes')['lista'])
+
+    def obtener_mapa_periodos(self) -> dict:
+        """Retorna el mapa id -> nombre de los periodos."""
+        return self._catalogo('periods')['mapa']
+
+    def obtener_mapa_carreras(self) -> dict:
+        """Retorna el mapa id -> nombre de las carreras."""
+        return self._catalogo('careers')['mapa']
+
+    def obtener_mapa_sedes(self) -> dict:
+        """Retorna el mapa id -> nombre de las sedes."""
+        return self._catalogo('sedes')['mapa']
+
+    def invalidar_catalogos(self, coleccion: str = None):
+        """Descarta la caché de catálogos tras una escritura sobre ellos."""
+        self.catalogos.invalidar(coleccion)
+
+    def reemplazar_catalogo(self, coleccion: str, items: list) -> bool:
+        """Reemplaza por completo un catálogo y descarta su caché."""
+        try:
+            self.db[coleccion].delete_many({})
+            if items:
+                self.db[coleccion].insert_many(items)
+            return True
+        except Exception as e:
+            print(f"Error al reemplazar catálogo {coleccion}: {e}")
+            return False
+        finally:
+            self.invalidar_catalogos(coleccion)
     
     def listar_estudiantes_crudos(self) -> list:
         """Retorna la lista de diccionarios directamente de Mongo para validaciones."""
         return list(self.students.find())
+
+    def listar_filas_aspirantes(self) -> List[FilaAspirante]:
+        """Todos los aspirantes (sin admins) como filas de listado: solo los campos que se muestran."""
+        cursor = self.students.find({'rol': {'$ne': 'admin'}}, FilaAspirante.proyeccion())
+        return FilaAspirante.desde_documentos(cursor.batch_size(1000))
+
+    # CAMPOS_ORDEN_LISTADO y FILTROS_LISTADO vienen de la interfaz (cada orden tiene su índice (campo, _id))
+    PROYECCION_LISTADO = {'nombre': 1, 'correo': 1, 'dni': 1, 'periodo': 1, 'carrera': 1,
+                          'jornada': 1, 'sede': 1, 'estado': 1}
+
+    def listar_aspirantes_pagina(self, filtros: dict, orden: str = 'nombre', descendente: bool = False,
+                                 limite: int = 25, despues: tuple = None) -> list:
+        """
+        Retorna una página de aspirantes usando paginación por clave (keyset).
+        `despues` es (valor_orden, _id) del último aspirante de la página anterior.
+        El orden es (orden, _id); los valores nulos van primero en orden ascendente.
+        """
+        if orden not in self.CAMPOS_ORDEN_LISTADO:
+            raise ValueError(f"Orden no válido. Use: {list(self.CAMPOS_ORDEN_LISTADO)}")
+
+        consulta = {'rol': {'$ne': 'admin'}}
+        for campo in self.FILTROS_LISTADO:
+            if filtros.get(campo):
+                consulta[campo] = filtros[campo]
+
+        # Un campo único no necesita desempate por _id (así le basta su índice único)
+        unico = orden in self.CAMPOS_UNICOS_LISTADO
+
+        if despues is not None and (not ObjectId.is_valid(despues[1])
+                                    or not isinstance(despues[0], (str, int, float, type(None)))):
+            despues = None  # Token alterado: volvemos a la primera página
+        if despues is not None:
+            valor, ultimo_id = despues[0], ObjectId(despues[1])
+            op = '$lt' if descendente else '$gt'
+            if unico and valor is not None:
+                condiciones = [{orden: {op: valor}}]
+                if descendente:
+                    condiciones.append({orden: None})
+            elif valor is None:
+                # Los nulos ordenan antes que cualquier texto
+                condiciones = [{orden: None, '_id': {op: ultimo_id}}]
+                if not descendente:
+                    condiciones.append({orden: {'$ne': None}})
+            else:
+                condiciones = [{orden: {op: valor}}, {orden: valor, '_id': {op: ultimo_id}}]
+                if descendente:
+                    condiciones.append({orden: None})
+            consulta['$or'] = condiciones
+
+        direccion = -1 if descendente else 1
+        claves = [(orden, direccion)] if unico else [(orden, direccion), ('_id', direccion)]
+        cursor = self.students.find(consulta, FilaAspirante.proyeccion())
+        return FilaAspirante.desde_documentos(cursor.sort(claves).limit(limite))
+
+    def iterar_aspirantes(self, filtros: dict, correos: list = None):
+        """
+        Retorna un cursor con los aspirantes que cumplen los filtros (estado, periodo, carrera, sede).
+        Si se indican `correos`, se limita a esos aspirantes. Excluye la contraseña.
+        """
+        consulta = {'rol': {'$ne': 'admin'}}
+        for campo in self.FILTROS_LISTADO:
+            if filtros.get(campo):
+                consulta[campo] = filtros[campo]
+        if correos is not None:
+            consulta['correo'] = {'$in': list(correos)}
+        return self.students.find(consulta, self.PROYECCION_LISTADO).batch_size(500)
+
+    def iterar_candidatos_examen(self, periodo: str, carrera: str, jornada: str):
+        """
+        Retorna un cursor con los aspirantes inscritos para un examen.
+        El filtro y la proyección (correo, nombre, sede) se resuelven en MongoDB.
+        """
+        return self.students.find(
+            {
+                'periodo': periodo,
+                'carrera': carrera,
+                'jornada': jornada,
+                'estado': 'Inscrito',
+                'rol': 'aspirante'
+            },
+            {'_id': 0, 'correo': 1, 'nombre': 1, 'sede': 1}
+        )
+    # Proyección para rehidratar un Aspirante (sin contraseña ni campos que el modelo no usa)
+    PROYECCION_ASPIRANTE = dict({campo: 1 for campo in Aspirante.CAMPOS}, _id=0)
+
     def obtener_aspirante_por_correo(self, correo: str) -> Optional[Aspirante]:
-        doc = self.students.find_one({'correo': correo})
-        if doc:
-            # IMPORTANTE: Rehidratamos el objeto con TODOS los campos de la DB
-            return Aspirante(
-                nombre=doc.get('nombre'),
-                correo=doc.get('correo'),
-                dni=doc.get('dni'),
-                periodo=doc.get('periodo'),
-                carrera=doc.get('carrera'),
-                jornada=doc.get('jornada'),
-                sede=doc.get('sede')
-            )
-        return None
+        doc = self.students.find_one({'correo': correo}, self.PROYECCION_ASPIRANTE)
+        return Aspirante.desde_documento(doc) if doc else None
 
     # 2. El que usaremos para el "Camino Directo" del PDF
     def obtener_aspirante_crudo_por_correo(self, correo: str):
         """Retorna el diccionario directo de MongoDB sin validaciones de clase."""
         return self.students.find_one({'correo': correo})
+
+    def buscar_aspirantes_existentes(self, correos: list, dnis: list) -> tuple:
+        """Una sola consulta ($or de dos $in, cada uno con su índice único) para todo un lote."""
+        condiciones = []
+        if correos:
+            condiciones.append({'correo': {'$in': list(correos)}})
+        if dnis:
+            # La condición $gt '' permite usar el índice parcial dni_unico
+            condiciones.append({'dni': {'$in': list(dnis), '$gt': ''}})
+        if not condiciones:
+            return set(), set()
+
+        pedidos_correo, pedidos_dni = set(correos), set(dnis)
+        correos_existentes, dnis_existentes = set(), set()
+        for doc in self.students.find({'$or': condiciones}, {'_id': 0, 'correo': 1, 'dni': 1}):
+            if doc.get('correo') in pedidos_correo:
+                correos_existentes.add(doc['correo'])
+            if doc.get('dni') in pedidos_dni:
+                dnis_existentes.add(doc['dni'])
+        return correos_existentes, dnis_existentes
+
+    def importar_aspirantes(self, docs: list) -> dict:
+        """
+        Upsert por correo con $setOnInsert en bulk_writes no ordenados (un error no detiene el resto).
+        Un correo que ya existía no se toca; un DNI duplicado falla solo en su fila.
+        """
+        resultado = {'insertados': 0, 'errores': {}}
+        for inicio in range(0, len(docs), TAMANO_LOTE):
+            lote = docs[inicio:inicio + TAMANO_LOTE]
+            operaciones = [UpdateOne({'correo': doc['correo']}, {'$setOnInsert': dict(doc, version=1)},
+                                     upsert=True)
+                           for doc in lote]
+            insertados, fallidos = set(), {}
+            try:
+                respuesta = self.students.bulk_write(operaciones, ordered=False)
+                insertados = set(respuesta.upserted_ids)
+            except BulkWriteError as e:
+                insertados = {u['index'] for u in e.details.get('upserted', [])}
+                for error in e.details.get('writeErrors', []):
+                    if error.get('code') != 11000:
+                        fallidos[error['index']] = f"Error: {error.get('errmsg')}"
+                    elif 'dni' in str(error.get('keyPattern') or error.get('errmsg')):
+                        fallidos[error['index']] = "El DNI ya está registrado"
+                    else:
+                        fallidos[error['index']] = "El correo ya está registrado"
+            except Exception as e:
+                print(f"Error al importar aspirantes: {e}")
+                fallidos = {i: f"Error: {e}" for i in range(len(lote))}
+
+            for i, doc in enumerate(lote):
+                if i in insertados:
+                    resultado['insertados'] += 1
+                else:
+                    # Sin upsert ni error: el correo ya existía (lo creó otro proceso después de la búsqueda)
+                    resultado['errores'][doc['correo']] = fallidos.get(i, "El correo ya está registrado")
+        return resultado
+
+    def crear_usuario(self, usuario_doc: dict) -> bool:
+        """Inserta un usuario nuevo. Retorna False si el correo ya existe."""
+        try:
+            usuario_doc.setdefault('version', 1)
+            self.students.insert_one(usuario_doc)
+            return True
+        except DuplicateKeyError:
+            return False
     # Tu método guardar_aspirante ya estaba bien, 
     # pero asegúrate de que use las variables del objeto:
     def guardar_aspirante(self, aspirante: Aspirante) -> bool:
-        student_doc = {
-            'nombre': aspirante.nombre,  # Lee de la property
-            'correo': aspirante.correo,  # Lee de la property
-            'dni': aspirante.dni,
-            'periodo': aspirante.periodo,
-            'carrera': aspirante.carrera,
-            'jornada': aspirante.jornada,
-            'sede': aspirante.sede,
-            'rol': 'aspirante',
-            'estado': aspirante.estado
-        }
-        result = self.students.update_one(
-            {'correo': aspirante.correo},
-            {'$set': student_doc},
-            upsert=True
-        )
+        # La validación del modelo se hace aquí, al escribir (no al leer)
+        try:
+            aspirante.validar()
+        except ValueError as e:
+            print(f"Error al guardar aspirante: {e}")
+            return False
+        student_doc = aspirante.a_documento()
+        try:
+            result = self.students.update_one(
+                {'correo': aspirante.correo},
+                {'$set': student_doc, '$inc': {'version': 1}},
+                upsert=True
+            )
+        except DuplicateKeyError as e:
+            # Mismo contrato que el repositorio en memoria: un DNI ya registrado no lanza, retorna False
+            print(f"Error al guardar aspirante: {e}")
+            return False
         return result.acknowledged
+
+    def guardar_aspirantes(self, aspirantes: List[Aspirante]) -> bool:
+        """Un solo bulk_write (sin orden) con un UpdateOne por aspirante."""
+        try:
+            for aspirante in aspirantes:
+                aspirante.validar()
+        except ValueError as e:
+            print(f"Error al guardar aspirantes: {e}")
+            return False
+        if not aspirantes:
+            return True
+        operaciones = [UpdateOne({'correo': a.correo}, {'$set': a.a_documento(), '$inc': {'version': 1}},
+                                 upsert=True)
+                       for a in aspirantes]
+        try:
+            return self.students.bulk_write(operaciones, ordered=False).acknowledged
+        except BulkWriteError as e:
+            print(f"Error al guardar aspirantes: {e.details.get('writeErrors')}")
+            return False
     def listar_documentos(self, propietario_id: str) -> List[Documento]:
         """
         Devuelve una lista de objetos Documento (Unidad 1: Relaciones).
         """
-        cursor = self.documents.find({'student_id': propietario_id})
-        documentos_obj = []
-        
-        for doc in cursor:
-            # Convertimos cada registro de Mongo en un Objeto del Dominio
-            obj = Documento(
-                tipo=doc['tipo'],
-                nombre_archivo=doc.get('nombre_archivo', 'archivo_sin_nombre'),
-                propietario=propietario_id
-            )
-            obj.revisar_documento(doc.get('estado', 'Pendiente'), doc.get('obs', ''))
-            documentos_obj.append(obj)
-            
-        return documentos_obj
+        # Convertimos cada registro de Mongo en un Objeto del Dominio
+        return Documento.desde_documentos(self.documents.find({'student_id': propietario_id}))
+    def listar_documentos_crudos(self, correo: str) -> list:
+        """Retorna los documentos de un aspirante como diccionarios (solo campos del reporte)."""
+        return list(self.documents.find(
+            {'correo': correo},
+            {'_id': 0, 'tipo': 1, 'nombre_archivo': 1, 'estado': 1, 'obs': 1}
+        ))
+
     def obtener_aspirante_por_dni(self, dni: str) -> Optional[Aspirante]:
-        # 1. Buscamos el documento en MongoDB
-        doc = self.students.find_one({'dni': dni})
-        
-        if doc:
-            # 2. REHIDRATACIÓN: Creamos el objeto con TODOS los campos
-            aspirante = Aspirante(
-                nombre=doc.get('nombre'),
-                correo=doc.get('correo'),
-                dni=doc.get('dni'),
-                periodo=doc.get('periodo'),
-                carrera=doc.get('carrera'),
-                jornada=doc.get('jornada'),
-                sede=doc.get('sede')
-            )
-            aspirante.estado = doc.get('estado', 'Pendiente')
-            return aspirante
-        return None
+        doc = self.students.find_one({'dni': dni}, self.PROYECCION_ASPIRANTE)
+        return Aspirante.desde_documento(doc) if doc else None
 
     def close(self):
         self.client.close()
@@ -126,15 +309,16 @@ class MongoSipuRepository(ISipuRepository):
     def crear_examen(self, examen_dict: dict) -> bool:
         """Crea un nuevo examen."""
         try:
+            examen_dict.setdefault('version', 1)
             self.db.examenes.insert_one(examen_dict)
             return True
         except Exception as e:
             print(f"Error al crear examen: {e}")
             return False
     
-    def obtener_examenes(self):
-        """Retorna todos los exámenes."""
-        return list(self.db.examenes.find())
+    def obtener_examenes(self) -> List[FilaExamen]:
+        """Retorna todos los exámenes (solo los campos de la tarjeta del examen)."""
+        return FilaExamen.desde_documentos(self.db.examenes.find({}, FilaExamen.proyeccion()))
     
     def obtener_examenes_por_periodo_carrera_jornada(self, periodo: str, carrera: str, jornada: str):
         """Obtiene exámenes para una combinación específica."""
@@ -147,30 +331,176 @@ class MongoSipuRepository(ISipuRepository):
     def obtener_examen_por_id(self, examen_id: str):
         """Obtiene un examen específico por su ID."""
         return self.db.examenes.find_one({'id': examen_id})
+
+    def obtener_examenes_por_ids(self, examen_ids) -> dict:
+        """Obtiene varios exámenes en una sola consulta. Retorna {id: examen}."""
+        ids = list({e for e in examen_ids if e})
+        if not ids:
+            return {}
+        return {e['id']: e for e in self.db.examenes.find({'id': {'$in': ids}})}
     
     def crear_asignacion_examen(self, asignacion_dict: dict) -> bool:
         """Crea una asignación de aspirante a examen."""
         try:
+            asignacion_dict.setdefault('version', 1)
             self.db.asignaciones_examen.insert_one(asignacion_dict)
             return True
         except Exception as e:
             print(f"Error al crear asignación: {e}")
             return False
     
-    def obtener_asignaciones_por_examen(self, examen_id: str):
-        """Obtiene todas las asignaciones para un examen."""
-        return list(self.db.asignaciones_examen.find({'examen_id': examen_id}))
+    def _distribucion_activa(self, examen_id: str):
+        """Retorna el distribucion_id publicado en el examen (None en datos anteriores)."""
+        examen = self.db.examenes.find_one({'id': examen_id}, {'_id': 0, 'distribucion_id': 1})
+        return examen.get('distribucion_id') if examen else None
+
+    def obtener_asignaciones_por_examen(self, examen_id: str) -> List[FilaAsignacion]:
+        """Obtiene todas las asignaciones de la distribución publicada de un examen (proyectadas)."""
+        cursor = self.db.asignaciones_examen.find({
+            'examen_id': examen_id,
+            'distribucion_id': self._distribucion_activa(examen_id)
+        }, FilaAsignacion.proyeccion())
+        return FilaAsignacion.desde_documentos(cursor.batch_size(1000))
     
     def obtener_asignaciones_por_aspirante(self, correo: str):
-        """Obtiene los exámenes asignados a un aspirante."""
-        return list(self.db.asignaciones_examen.find({'aspirante_correo': correo}))
+        """Obtiene los exámenes asignados a un aspirante (solo distribuciones publicadas)."""
+        return list(self.db.asignaciones_examen.aggregate([
+            {'$match': {'aspirante_correo': correo}},
+            {'$lookup': {
+                'from': 'examenes',
+                'localField': 'examen_id',
+                'foreignField': 'id',
+                'as': '_examen'
+            }},
+            # Descarta asignaciones de una distribución en preparación o ya reemplazada
+            {'$match': {'$expr': {'$eq': [
+                {'$ifNull': ['$distribucion_id', None]},
+                {'$ifNull': [{'$arrayElemAt': ['$_examen.distribucion_id', 0]}, None]}
+            ]}}},
+            {'$project': {'_examen': 0}}
+        ]))
     
     def contar_asignaciones_por_lab(self, lab_id: str, examen_id: str) -> int:
-        """Cuenta cuántas personas están asignadas a un laboratorio en un examen."""
+        """
+        Cuenta cuántas personas están asignadas a un laboratorio en un examen.
+        Lee el contador de ocupación; solo cuenta asignaciones en distribuciones anteriores a los contadores.
+        """
+        distribucion_id = self._distribucion_activa(examen_id)
+        contador = self.db.ocupacion_labs.find_one(
+            {'examen_id': examen_id, 'distribucion_id': distribucion_id, 'lab_id': lab_id},
+            {'_id': 0, 'ocupados': 1}
+        )
+        if contador is not None:
+            return contador['ocupados']
         return self.db.asignaciones_examen.count_documents({
             'lab_id': lab_id,
-            'examen_id': examen_id
+            'examen_id': examen_id,
+            'distribucion_id': distribucion_id
         })
+
+    def registrar_ocupacion(self, examen_id: str, distribucion_id: str, ocupacion: list) -> bool:
+        """
+        Crea los contadores de ocupación (uno por laboratorio) de una distribución.
+        Es idempotente: si un contador ya existe, se conserva tal como está.
+        """
+        if not ocupacion:
+            return True
+        try:
+            self.db.ocupacion_labs.bulk_write([
+                UpdateOne(
+                    {'examen_id': examen_id, 'distribucion_id': distribucion_id, 'lab_id': lab['lab_id']},
+                    {'$setOnInsert': {
+                        'lab_nombre': lab['lab_nombre'],
+                        'sede': lab['sede'],
+                        'capacidad': lab['capacidad'],
+                        'ocupados': lab['ocupados'],
+                        'libres': lab['capacidad'] - lab['ocupados']
+                    }},
+                    upsert=True
+                ) for lab in ocupacion
+            ], ordered=False)
+            return True
+        except Exception as e:
+            print(f"Error al registrar ocupación: {e}")
+            return False
+
+    def obtener_ocupacion(self, examen_id: str) -> list:
+        """Retorna los contadores de ocupación de la distribución publicada de un examen."""
+        return list(self.db.ocupacion_labs.find(
+            {'examen_id': examen_id, 'distribucion_id': self._distribucion_activa(examen_id)},
+            {'_id': 0}
+        ).sort('lab_id', 1))
+
+    def reservar_asiento(self, examen_id: str, sede: str):
+        """
+        Toma el siguiente asiento libre de la sede en la distribución publicada, de forma atómica
+        (find_one_and_update con $inc). Retorna {distribucion_id, lab_id, lab_nombre, sede, num_computadora}
+        o None si la sede no tiene asientos libres.
+        """
+        distribucion_id = self._distribucion_activa(examen_id)
+        contador = self.db.ocupacion_labs.find_one_and_update(
+            {'examen_id': examen_id, 'distribucion_id': distribucion_id, 'sede': sede, 'libres': {'$gt': 0}},
+            {'$inc': {'ocupados': 1, 'libres': -1}},
+            sort=[('lab_id', 1)],
+            projection={'_id': 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if contador is None:
+            return None
+        return {
+            'distribucion_id': distribucion_id,
+            'lab_id': contador['lab_id'],
+            'lab_nombre': contador['lab_nombre'],
+            'sede': contador['sede'],
+            'num_computadora': contador['ocupados']
+        }
+
+    def liberar_asiento(self, examen_id: str, asiento: dict) -> bool:
+        """Deshace un reservar_asiento si nadie tomó otro asiento del laboratorio después."""
+        try:
+            result = self.db.ocupacion_labs.update_one(
+                {'examen_id': examen_id, 'distribucion_id': asiento['distribucion_id'],
+                 'lab_id': asiento['lab_id'], 'ocupados': asiento['num_computadora']},
+                {'$inc': {'ocupados': -1, 'libres': 1}}
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            print(f"Error al liberar asiento: {e}")
+            return False
+    
+    PROYECCION_ASIGNACION = {'_id': 0, 'id': 1, 'examen_id': 1, 'aspirante_correo': 1, 'aspirante_nombre': 1,
+                             'sede': 1, 'lab_nombre': 1, 'num_computadora': 1, 'estado': 1, 'nota': 1,
+                             'observaciones': 1, 'fecha_evaluacion': 1}
+
+    def iterar_asignaciones(self, examen_id: str = None, solo_evaluadas: bool = False):
+        """
+        Retorna un cursor (proyectado) con las asignaciones publicadas.
+        De un examen si se indica `examen_id`, o de todos los exámenes si no.
+        Con solo_evaluadas=True omite las que siguen en estado 'Pendiente'.
+        """
+        filtro = {'estado': {'$ne': 'Pendiente'}} if solo_evaluadas else {}
+
+        if examen_id:
+            filtro.update(examen_id=examen_id, distribucion_id=self._distribucion_activa(examen_id))
+            return self.db.asignaciones_examen.find(filtro, self.PROYECCION_ASIGNACION).batch_size(1000)
+
+        # Todos los exámenes: se descartan distribuciones no publicadas con un $lookup
+        proyeccion = dict(self.PROYECCION_ASIGNACION)
+        proyeccion.pop('_id')
+        return self.db.asignaciones_examen.aggregate([
+            {'$match': filtro},
+            {'$lookup': {
+                'from': 'examenes',
+                'localField': 'examen_id',
+                'foreignField': 'id',
+                'as': '_examen'
+            }},
+            {'$match': {'$expr': {'$eq': [
+                {'$ifNull': ['$distribucion_id', None]},
+                {'$ifNull': [{'$arrayElemAt': ['$_examen.distribucion_id', 0]}, None]}
+            ]}}},
+            {'$project': {'_id': 0, **proyeccion}}
+        ], batchSize=1000)
     
     def eliminar_asignaciones_examen(self, examen_id: str) -> bool:
         """Elimina todas las asignaciones de un examen (para regenerar)."""
@@ -180,6 +510,48 @@ class MongoSipuRepository(ISipuRepository):
         except Exception as e:
             print(f"Error al eliminar asignaciones: {e}")
             return False
+
+    def publicar_distribucion(self, examen_id: str, distribucion_id: str, asignaciones: list,
+                              ocupacion: list = None) -> bool:
+        """
+        Reemplaza la distribución de un examen sin exponer resultados parciales.
+        1. Inserta las nuevas asignaciones en lotes (insert_many sin orden) y sus contadores de ocupación.
+        2. Publica distribucion_id en el examen y guarda la que reemplaza en distribucion_anterior
+           (escritura atómica de un documento).
+        3. Elimina las asignaciones y contadores de las distribuciones previas a esas dos.
+        Los lectores filtran por la distribución publicada, así que ven la anterior o la nueva completa.
+        La anterior se conserva hasta la próxima publicación: un lector que leyó su id justo antes
+        del cambio todavía encuentra su lista completa.
+        """
+        filtro_nueva = {'examen_id': examen_id, 'distribucion_id': distribucion_id}
+        try:
+            for inicio in range(0, len(asignaciones), TAMANO_LOTE):
+                self.db.asignaciones_examen.insert_many(
+                    asignaciones[inicio:inicio + TAMANO_LOTE], ordered=False
+                )
+            if ocupacion and not self.registrar_ocupacion(examen_id, distribucion_id, ocupacion):
+                raise RuntimeError("no se pudieron crear los contadores de ocupación")
+        except Exception as e:
+            print(f"Error al insertar asignaciones: {e}")
+            # La distribución nunca se publicó: descartamos lo insertado
+            self.db.asignaciones_examen.delete_many(filtro_nueva)
+            self.db.ocupacion_labs.delete_many(filtro_nueva)
+            return False
+
+        # Actualización con pipeline: distribucion_anterior toma el valor previo en la misma escritura
+        examen = self.db.examenes.find_one_and_update(
+            {'id': examen_id},
+            [{'$set': {'distribucion_anterior': '$distribucion_id',
+                       'distribucion_id': distribucion_id,
+                       'version': {'$add': [{'$ifNull': ['$version', 0]}, 1]}}}],
+            projection={'_id': 0, 'distribucion_anterior': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        anterior = examen.get('distribucion_anterior') if examen else None
+        anteriores = {'examen_id': examen_id, 'distribucion_id': {'$nin': [distribucion_id, anterior]}}
+        self.db.asignaciones_examen.delete_many(anteriores)
+        self.db.ocupacion_labs.delete_many(anteriores)
+        return True
     
     def guardar_calificacion(self, asignacion_id: str, presentó: bool, nota: int, observaciones: str) -> bool:
         """Guarda la calificación de un aspirante."""
@@ -197,13 +569,133 @@ class MongoSipuRepository(ISipuRepository):
             
             result = self.db.asignaciones_examen.update_one(
                 {'id': asignacion_id},
-                {'$set': actualizar}
+                {'$set': actualizar, '$inc': {'version': 1}}
             )
-            return result.acknowledged
+            # Un id inexistente no es una calificación guardada
+            return result.matched_count > 0
         except Exception as e:
             print(f"Error al guardar calificación: {e}")
             return False
     
+    def guardar_calificaciones_lote(self, examen_id: str, calificaciones: list) -> dict:
+        """
+        Guarda varias calificaciones de un examen en un solo bulk_write.
+        `calificaciones` es una lista de (asignacion_id, presentó, nota, observaciones).
+        Retorna {asignacion_id: bool} con el resultado de cada fila (False si no existe en el examen).
+        """
+        from datetime import datetime
+
+        if not calificaciones:
+            return {}
+
+        # Una consulta ($in por id_unico) para saber cuáles existen: el resto no se cuenta como guardado
+        resultados = {asignacion_id: False for asignacion_id, *_ in calificaciones}
+        existentes = {a['id'] for a in self.db.asignaciones_examen.find(
+            {'id': {'$in': list(resultados)}, 'examen_id': examen_id}, {'_id': 0, 'id': 1})}
+        calificaciones = [c for c in calificaciones if c[0] in existentes]
+        if not calificaciones:
+            return resultados
+
+        fecha = datetime.now().isoformat()
+        operaciones = []
+        for asignacion_id, presentó, nota, observaciones in calificaciones:
+            operaciones.append(UpdateOne(
+                {'id': asignacion_id, 'examen_id': examen_id},
+                {'$set': {
+                    'estado': 'Presentado' if presentó else 'No presentado',
+                    'nota': nota if presentó else None,
+                    'observaciones': observaciones,
+                    'fecha_evaluacion': fecha if presentó else None
+                }, '$inc': {'version': 1}}
+            ))
+
+        resultados.update({asignacion_id: True for asignacion_id, *_ in calificaciones})
+        try:
+            self.db.asignaciones_examen.bulk_write(operaciones, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                resultados[calificaciones[error['index']][0]] = False
+        except Exception as e:
+            print(f"Error al guardar calificaciones: {e}")
+            return {asignacion_id: False for asignacion_id in resultados}
+        return resultados
+    
     def obtener_calificaciones_aspirante(self, correo: str):
         """Obtiene todas las calificaciones de un aspirante."""
-        return list(self.db.asignaciones_examen.find({'aspirante_correo': correo}))
\ No newline at end of file
+        return self.obtener_asignaciones_por_aspirante(correo)
+
+    # ========== VERSIONES (CACHÉ HTTP CONDICIONAL) ==========
+
+    def obtener_version_aspirante(self, correo: str = None, dni: str = None) -> Optional[int]:
+        """Solo el campo version, por el índice único de correo o de DNI."""
+        filtro = {'correo': correo} if correo is not None else {'dni': dni}
+        doc = self.students.find_one(filtro, {'_id': 0, 'version': 1})
+        return doc.get('version', 0) if doc else None
+
+    def obtener_versiones_examenes_aspirante(self, correo: str) -> list:
+        """Mismo filtro de distribución publicada que obtener_asignaciones_por_aspirante, pero proyectado."""
+        cursor = self.db.asignaciones_examen.aggregate([
+            {'$match': {'aspirante_correo': correo}},
+            {'$project': {'_id': 0, 'id': 1, 'version': 1, 'examen_id': 1, 'distribucion_id': 1}},
+            {'$lookup': {
+                'from': 'examenes',
+                'localField': 'examen_id',
+                'foreignField': 'id',
+                'as': '_examen'
+            }},
+            {'$match': {'$expr': {'$eq': [
+                {'$ifNull': ['$distribucion_id', None]},
+                {'$ifNull': [{'$arrayElemAt': ['$_examen.distribucion_id', 0]}, None]}
+            ]}}},
+            {'$project': {'id': 1, 'version': 1, 'examen_id': 1,
+                          'examen_version': {'$arrayElemAt': ['$_examen.version', 0]}}}
+        ])
+        return [(d.get('id'), d.get('version', 0), d.get('examen_id'), d.get('examen_version', 0)) for d in cursor]
+
+    # ========== TRABAJOS EN SEGUNDO PLANO ==========
+
+    def crear_trabajo(self, trabajo: dict) -> bool:
+        """Registra un trabajo nuevo."""
+        try:
+            self.db.trabajos.insert_one(dict(trabajo))
+            return True
+        except Exception as e:
+            print(f"Error al crear trabajo: {e}")
+            return False
+
+    def actualizar_trabajo(self, trabajo_id: str, cambios: dict) -> bool:
+        """Actualiza los campos indicados de un trabajo."""
+        try:
+            return self.db.trabajos.update_one({'id': trabajo_id}, {'$set': cambios}).matched_count > 0
+        except Exception as e:
+            print(f"Error al actualizar trabajo: {e}")
+            return False
+
+    def obtener_trabajo(self, trabajo_id: str):
+        """Obtiene un trabajo por su ID."""
+        return self.db.trabajos.find_one({'id': trabajo_id}, {'_id': 0})
+
+    def listar_trabajos(self, limite: int = 20) -> list:
+        """Retorna los trabajos más recientes primero."""
+        return list(self.db.trabajos.find({}, {'_id': 0}).sort('creado', -1).limit(limite))
+
+    def registrar_latido_trabajos(self, trabajo_ids: list, momento: str) -> bool:
+        """Actualiza el latido de los trabajos indicados en una sola escritura."""
+        try:
+            self.db.trabajos.update_many({'id': {'$in': list(trabajo_ids)}}, {'$set': {'latido': momento}})
+            return True
+        except Exception as e:
+            print(f"Error al registrar latido de trabajos: {e}")
+            return False
+
+    def marcar_trabajos_huerfanos(self, estados: list, latido_limite: str, cambios: dict) -> int:
+        """Marca los trabajos sin terminar cuyo proceso dejó de dar latidos."""
+        try:
+            # $not también incluye los trabajos sin latido (creados antes de existir el campo)
+            return self.db.trabajos.update_many(
+                {'estado': {'$in': list(estados)}, 'latido': {'$not': {'$gte': latido_limite}}},
+                {'$set': cambios}
+            ).modified_count
+        except Exception as e:
+            print(f"Error al marcar trabajos huérfanos: {e}")
+            return 0
@@ -1,14 +1,11 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from ...application.services import SipuService
-from ..repositories import MongoSipuRepository
 
 # Configuración del Blueprint
 bp = Blueprint('auth', __name__)
 
 # Inyección de dependencias (Unidad 2)
-# Nota: Usamos la misma instancia del repositorio que en sipu_routes
-repo = MongoSipuRepository()
-sipu_service = SipuService(repo)
+# Nota: Usamos la misma instancia del repositorio y del servicio que en sipu_routes (contenedor de la app)
+from ..contenedor import sipu_service
 
 @bp.route('/', methods=['GET', 'POST'])
 def login():
@@ -22,6 +19,9 @@ def login():
         usuario = sipu_service.autenticar_usuario(correo, contrasena)
         
         if usuario:
+            # Nuevo identificador de sesión al autenticarse (evita la fijación de sesión)
+            if hasattr(session, 'regenerar'):
+                session.regenerar()
             # Guardamos datos mínimos en la sesión (Encapsulamiento)
             session['user'] = usuario.nombre
             session['user_email'] = correo
@@ -45,5 +45,7 @@ def login():
 def logout():
     """Cierra la sesión del usuario."""
     session.clear()
+    if hasattr(session, 'regenerar'):
+        session.regenerar()
     flash('Has cerrado sesión correctamente', 'info')
     return redirect(url_for('auth.login'))
\ No newline at end of file
@@ -1,33 +1,40 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, send_file
-from ...application.services import SipuService
-from ..repositories import MongoSipuRepository
+import os
+import uuid
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, session, send_file,
+                   Response, stream_with_context, jsonify, abort)
+from ...application.reportes import construir_pdf_inscripcion
+from ...application.importacion import ENCABEZADOS_ERRORES
+from ..exportacion import (procesar_en_paralelo, zip_en_flujo, guardar_en_disco, directorio_exportaciones,
+                           csv_en_flujo, FORMATOS_HOJA)
+from ..trabajos import TERMINADOS
 
-# Inicializamos el repositorio y el servicio (Unidad 2: Inyección de Dependencias)
-# En un entorno profesional, esto se haría en un 'App Factory'
-repo = MongoSipuRepository()
-sipu_service = SipuService(repo)
+# Repositorio, servicio y trabajos (Unidad 2: Inyección de Dependencias).
+# Los construye el App Factory (ver infrastructure/contenedor.py) la primera vez que se usan en cada proceso.
+from ..contenedor import repo, sipu_service, trabajos, obtener_contenedor
+from ..cache_http import respuesta_condicional
 
 bp = Blueprint('main', __name__)
 
 @bp.route('/aspirante/pdf/<dni>')
 def descargar_pdf(dni):
     """Acción de infraestructura para servir el archivo PDF."""
-    from flask import send_file
-    import io
+    def archivo():
+        # Pedimos al servicio que genere el archivo por DNI
+        pdf_buffer = sipu_service.generar_reporte_pdf_por_dni(dni)
+        
+        if not pdf_buffer:
+            flash("No se pudo generar el PDF", "danger")
+            return redirect(url_for('main.lista_aspirantes'))
 
-    # Pedimos al servicio que genere el archivo por DNI
-    pdf_buffer = sipu_service.generar_reporte_pdf_por_dni(dni)
-    
-    if not pdf_buffer:
-        flash("No se pudo generar el PDF", "danger")
-        return redirect(url_for('main.lista_aspirantes'))
+        return send_file(
+            pdf_buffer,
+            as_attachment=True,
+            download_name=f"reporte_{dni}.pdf",
+            mimetype='application/pdf'
+        )
 
-    return send_file(
-        pdf_buffer,
-        as_attachment=True,
-        download_name=f"reporte_{dni}.pdf",
-        mimetype='application/pdf'
-    )
+    # Si el navegador ya tiene esta versión del reporte: 304 sin generar el PDF
+    return respuesta_condicional(sipu_service.sello_reporte_pdf_por_dni(dni), archivo)
 
 @bp.route('/aspirante/inscripcion', methods=['GET', 'POST'])
 def inscripcion():
@@ -41,7 +48,7 @@ def inscripcion():
         return redirect(url_for('auth.login'))
     
     # Verificar si ya completó inscripción
-    aspirante_actual = repo.students.find_one({'correo': correo_usuario})
+    aspirante_actual = repo.obtener_aspirante_crudo_por_correo(correo_usuario)
     if aspirante_actual and aspirante_actual.get('estado') == 'Inscrito':
         flash('Ya has completado tu inscripción', 'info')
         return redirect(url_for('main.aspirante_dashboard'))
@@ -57,27 +64,56 @@ def inscripcion():
         else:
             flash(mensaje, 'danger')
             # Si hay error, mostramos el formulario nuevamente
-            periods = list(repo.db.periods.find()) 
-            careers = list(repo.db.careers.find())
-            sedes = list(repo.db.sedes.find())
+            periods = repo.obtener_periodos()
+            careers = repo.obtener_carreras()
+            sedes = repo.obtener_sedes()
             return render_template('inscripcion.html', periods=periods, careers=careers, sedes=sedes)
 
     # GET: Mostrar el formulario
     # Obtener catálogos para el formulario
-    periods = list(repo.db.periods.find()) 
-    careers = list(repo.db.careers.find())
-    sedes = list(repo.db.sedes.find())
+    periods = repo.obtener_periodos()
+    careers = repo.obtener_carreras()
+    sedes = repo.obtener_sedes()
     
     return render_template('inscripcion.html', periods=periods, careers=careers, sedes=sedes)
 
+def _pagina_aspirantes():
+    """Lee filtros, orden y posición de la URL y retorna el contexto de la página del listado."""
+    filtros = {campo: request.args.get(campo, '').strip() for campo in repo.FILTROS_LISTADO}
+    orden = request.args.get('orden', 'nombre')
+    if orden not in repo.CAMPOS_ORDEN_LISTADO:
+        orden = 'nombre'
+    descendente = request.args.get('dir') == 'desc'
+    limite = request.args.get('limite', type=int)
+    
+    students, siguiente = sipu_service.obtener_pagina_aspirantes(
+        filtros, orden=orden, descendente=descendente, limite=limite, token=request.args.get('despues')
+    )
+    
+    # Parámetros que se conservan al pasar de página
+    parametros = {k: v for k, v in filtros.items() if v}
+    parametros.update(orden=orden, dir='desc' if descendente else 'asc')
+    if limite:
+        parametros['limite'] = limite
+    
+    return {
+        'students': students,
+        'siguiente': siguiente,
+        'filtros': filtros,
+        'parametros': parametros,
+        'ordenes': repo.CAMPOS_ORDEN_LISTADO,
+        'periods': repo.obtener_periodos(),
+        'careers': repo.obtener_carreras(),
+        'sedes': repo.obtener_sedes()
+    }
+
 @bp.route('/aspirante/list')
 def lista_aspirantes():
     if 'user' not in session:
         return redirect(url_for('main.login'))
     
-    # El servicio devuelve objetos de dominio, no crudos de Mongo
-    students = sipu_service.obtener_lista_aspirantes()
-    return render_template('lista.html', students=students)
+    # El servicio devuelve solo la página pedida y el token de la siguiente
+    return render_template('lista.html', endpoint='main.lista_aspirantes', **_pagina_aspirantes())
 
 # refactorizacion/sipu/infrastructure/routes/sipu_routes.py
 
@@ -105,8 +141,8 @@ def admin_dashboard():
     if 'user' not in session or session.get('rol') != 'admin':
         return redirect(url_for('auth.login'))
     
-    students = sipu_service.obtener_lista_aspirantes()
-    return render_template('admin_dashboard.html', user=session.get('user'), students=students)
+    return render_template('admin_dashboard.html', user=session.get('user'),
+                         endpoint='main.admin_dashboard', **_pagina_aspirantes())
 
 @bp.route('/admin/crear-aspirante', methods=['GET', 'POST'])
 def crear_aspirante():
@@ -123,11 +159,6 @@ def crear_aspirante():
             flash('Todos los campos son obligatorios', 'danger')
             return redirect(url_for('main.crear_aspirante'))
         
-        # Verificar que no exista
-        if repo.students.find_one({'correo': correo}):
-            flash('El correo ya está registrado', 'danger')
-            return redirect(url_for('main.crear_aspirante'))
-        
         # Crear aspirante vacío (sin período, carrera, jornada, sede)
         nuevo_aspirante = {
             'nombre': nombre,
@@ -142,34 +173,89 @@ def crear_aspirante():
             'sede': None
         }
         
-        repo.students.insert_one(nuevo_aspirante)
+        # El índice único de correo rechaza los repetidos (sin consultar antes)
+        if not repo.crear_usuario(nuevo_aspirante):
+            flash('El correo ya está registrado', 'danger')
+            return redirect(url_for('main.crear_aspirante'))
         flash(f'Aspirante {nombre} creado correctamente. Correo: {correo}', 'success')
         return redirect(url_for('main.admin_dashboard'))
     
     return render_template('crear_aspirante.html')
 
+def _importar_aspirantes_desde_disco(servicio, ruta: str, nombre_reporte: str, progreso):
+    """Trabajo en segundo plano: importa el CSV subido y deja el reporte de errores para descargar."""
+    try:
+        with open(ruta, encoding='utf-8-sig', newline='') as archivo:
+            resumen = servicio.importar_aspirantes(archivo, progreso=progreso)
+    finally:
+        os.remove(ruta)
+
+    errores = resumen['errores']
+    mensaje = (f"{resumen['creados']} aspirantes creados de {resumen['leidas']} filas, "
+               f"{resumen['con_errores']} con errores")
+    if resumen['asientos']:
+        mensaje += f", {resumen['asientos']} asientos asignados en exámenes ya distribuidos"
+    if resumen['con_errores'] > len(errores):
+        mensaje += f" (el reporte incluye las primeras {len(errores)})"
+    if not errores:
+        return True, mensaje
+    reporte = guardar_en_disco(csv_en_flujo(ENCABEZADOS_ERRORES, errores), nombre_reporte)
+    return True, mensaje, {'archivo': reporte, 'nombre': nombre_reporte}
+
+@bp.route('/admin/importar/aspirantes', methods=['POST'])
+def importar_aspirantes():
+    """
+    Crea aspirantes en lote desde un CSV (columnas: nombre, correo, contrasena y,
+    opcionales, dni, periodo, carrera, jornada, sede). Se procesa en un trabajo en segundo plano.
+    """
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+
+    archivo = request.files.get('archivo')
+    if not archivo or not archivo.filename:
+        flash('Seleccione un archivo CSV', 'danger')
+        return redirect(url_for('main.crear_aspirante'))
+
+    # El archivo se guarda en disco: el trabajo lo lee en flujo, sin cargarlo entero en memoria
+    identificador = uuid.uuid4().hex
+    ruta = os.path.join(directorio_exportaciones(), f"importacion_{identificador}.csv")
+    archivo.save(ruta)
+
+    servicio = obtener_contenedor().servicio
+    trabajo_id = trabajos.encolar('importacion', f'Importación de aspirantes ({archivo.filename})',
+                                  _importar_aspirantes_desde_disco, servicio, ruta,
+                                  f"errores_importacion_{identificador[:8]}.csv",
+                                  usuario=session.get('user_email'))
+    if not trabajo_id:
+        os.remove(ruta)
+        flash('No se pudo iniciar la importación', 'danger')
+        return redirect(url_for('main.crear_aspirante'))
+    return redirect(url_for('main.ver_trabajo', trabajo_id=trabajo_id), code=303)
+
 @bp.route('/aspirante/dashboard')
 def aspirante_dashboard():
     """Dashboard del aspirante."""
     if 'user' not in session or session.get('rol') != 'postulante':
         return redirect(url_for('auth.login'))
     
-    # Obtener información del aspirante
     correo_usuario = session.get('user_email')
-    aspirante = repo.students.find_one({'correo': correo_usuario}) if correo_usuario else None
+    if not correo_usuario:
+        return _pagina_dashboard_aspirante(None)
+    return respuesta_condicional(sipu_service.sello_dashboard_aspirante(correo_usuario),
+                                 lambda: _pagina_dashboard_aspirante(correo_usuario))
+
+def _pagina_dashboard_aspirante(correo_usuario):
+    # Obtener información del aspirante
+    aspirante = repo.obtener_aspirante_crudo_por_correo(correo_usuario) if correo_usuario else None
     
     # Determinar estado de inscripción
     inscripcion_completada = aspirante and aspirante.get('estado') == 'Inscrito'
     
     # Mapear IDs a nombres completos para mostrar en dashboard
     if aspirante and inscripcion_completada:
-        periodos = list(repo.db.periods.find())
-        carreras = list(repo.db.careers.find())
-        sedes = list(repo.db.sedes.find())
-        
-        per_map = {p.get('id'): p.get('nombre') for p in periodos}
-        car_map = {c.get('id'): c.get('nombre') for c in carreras}
-        sed_map = {s.get('id'): s.get('nombre') for s in sedes}
+        per_map = repo.obtener_mapa_periodos()
+        car_map = repo.obtener_mapa_carreras()
+        sed_map = repo.obtener_mapa_sedes()
         
         aspirante['periodo_nombre'] = per_map.get(aspirante.get('periodo'), aspirante.get('periodo', 'N/A'))
         aspirante['carrera_nombre'] = car_map.get(aspirante.get('carrera'), aspirante.get('carrera', 'N/A'))
@@ -186,129 +272,126 @@ def descargar_documentos(correo):
     if 'user' not in session:
         return redirect(url_for('main.login'))
     
-    # Obtener información del aspirante
-    aspirante_doc = repo.students.find_one({'correo': correo})
+    # El servicio arma el PDF (o lo sirve desde la caché si nada cambió)
+    resultado = sipu_service.generar_reporte_documentos(correo)
     
-    if not aspirante_doc:
+    if not resultado:
         flash('Aspirante no encontrado', 'danger')
         return redirect(url_for('main.lista_aspirantes'))
     
-    # Crear mapas de períodos, carreras y sedes
-    periodos = list(repo.db.periods.find())
-    carreras = list(repo.db.careers.find())
-    sedes = list(repo.db.sedes.find())
-    per_map = {p.get('id'): p.get('nombre') for p in periodos}
-    car_map = {c.get('id'): c.get('nombre') for c in carreras}
-    sed_map = {s.get('id'): s.get('nombre') for s in sedes}
-    
-    # Obtener nombres mapeados
-    periodo_nombre = per_map.get(aspirante_doc.get('periodo'), 'No asignado')
-    carrera_nombre = car_map.get(aspirante_doc.get('carrera'), 'No asignada')
-    sede_nombre = sed_map.get(aspirante_doc.get('sede'), 'No asignada')
-    
-    # Crear PDF en memoria
-    import io
-    from reportlab.lib.pagesizes import letter
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib import colors
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    
-    # Contenedor de elementos
-    elementos = []
-    styles = getSampleStyleSheet()
-    
-    # Título
-    titulo_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=30,
-        alignment=1  # Centrado
-    )
-    elementos.append(Paragraph("DOCUMENTOS DEL ASPIRANTE", titulo_style))
-    elementos.append(Spacer(1, 0.3*inch))
-    
-    # Información del aspirante en tabla
-    datos_aspirante = [
-        ['Nombre:', aspirante_doc.get('nombre', 'N/A')],
-        ['Correo:', aspirante_doc.get('correo', 'N/A')],
-        ['DNI:', aspirante_doc.get('dni', 'N/A')],
-        ['Período:', periodo_nombre],
-        ['Carrera:', carrera_nombre],
-        ['Jornada:', aspirante_doc.get('jornada', 'N/A')],
-        ['Sede:', sede_nombre],
-        ['Estado:', aspirante_doc.get('estado', 'Pendiente')]
-    ]
-    
-    tabla_info = Table(datos_aspirante, colWidths=[1.5*inch, 4*inch])
-    tabla_info.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-    ]))
-    
-    elementos.append(tabla_info)
-    elementos.append(Spacer(1, 0.4*inch))
-    
-    # Sección de documentos adjuntos
-    elementos.append(Paragraph("DOCUMENTOS ADJUNTOS", styles['Heading2']))
-    elementos.append(Spacer(1, 0.2*inch))
-    
-    # Buscar documentos asociados
-    documentos = list(repo.db.documents.find({'correo': correo}))
-    
-    if documentos:
-        datos_docs = [['#', 'Tipo', 'Archivo', 'Estado', 'Observaciones']]
-        for idx, doc in enumerate(documentos, 1):
-            datos_docs.append([
-                str(idx),
-                doc.get('tipo', 'Documento'),
-                doc.get('nombre_archivo', 'sin_nombre.pdf'),
-                doc.get('estado', 'Pendiente'),
-                doc.get('obs', 'Sin observaciones')
-            ])
-        
-        tabla_docs = Table(datos_docs, colWidths=[0.4*inch, 1.5*inch, 1.8*inch, 1*inch, 1.8*inch])
-        tabla_docs.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
-        ]))
-        elementos.append(tabla_docs)
-    else:
-        elementos.append(Paragraph("No hay documentos registrados para este aspirante.", styles['Normal']))
-    
-    # Construir PDF
-    doc.build(elementos)
-    buffer.seek(0)
-    
-    nombre_archivo = f"documentos_{aspirante_doc.get('nombre', 'aspirante').replace(' ', '_')}.pdf"
-    
+    archivo, nombre_archivo = resultado
     return send_file(
-        buffer,
+        archivo,
         mimetype='application/pdf',
         as_attachment=True,
         download_name=nombre_archivo
     )
 
+@bp.route('/admin/exportar/reportes.zip')
+def exportar_reportes_zip():
+    """
+    Descarga en un ZIP los reportes de inscripción de varios aspirantes.
+    Filtros opcionales en la URL: periodo, carrera, sede, estado, examen_id.
+    Los PDFs se generan en paralelo (pool de procesos) y el ZIP se envía a medida que se arma.
+    """
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    
+    filtros = {campo: request.args.get(campo, '').strip()
+               for campo in repo.FILTROS_LISTADO + ('examen_id',)}
+    
+    datos = sipu_service.iterar_datos_reportes(filtros)
+    pdfs = procesar_en_paralelo(construir_pdf_inscripcion, datos)
+    archivos = ((f"reporte_{d.get('dni') or d.get('correo')}.pdf", pdf) for d, pdf in pdfs)
+    
+    sufijo = '_'.join(v for v in filtros.values() if v) or 'todos'
+    return Response(
+        stream_with_context(zip_en_flujo(archivos)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="reportes_{sufijo}.zip"'}
+    )
+
+def _exportar_reportes_a_disco(servicio, filtros: dict, nombre: str, progreso):
+    """Trabajo en segundo plano: arma el ZIP de reportes en disco y reporta cuántos PDFs lleva."""
+    def archivos():
+        datos = servicio.iterar_datos_reportes(filtros)
+        for numero, (d, pdf) in enumerate(procesar_en_paralelo(construir_pdf_inscripcion, datos), 1):
+            if numero % 50 == 0:
+                progreso(None, f"{numero} reportes generados")
+            yield f"reporte_{d.get('dni') or d.get('correo')}.pdf", pdf
+
+    ruta = guardar_en_disco(zip_en_flujo(archivos()), nombre)
+    return True, "Exportación lista para descargar", {'archivo': ruta, 'nombre': nombre}
+
+@bp.route('/admin/exportar/reportes-en-segundo-plano', methods=['POST'])
+def exportar_reportes_trabajo():
+    """Igual que exportar_reportes_zip, pero el ZIP se genera en un trabajo y se descarga al terminar."""
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    
+    filtros = {campo: request.form.get(campo, '').strip()
+               for campo in repo.FILTROS_LISTADO + ('examen_id',)}
+    sufijo = '_'.join(v for v in filtros.values() if v) or 'todos'
+    nombre = f"reportes_{sufijo}.zip"
+    
+    # El trabajo corre fuera de la petición: se le pasa el servicio del proceso, no el de la petición
+    servicio = obtener_contenedor().servicio
+    trabajo_id = trabajos.encolar('exportacion', f'Exportación de reportes ({sufijo})',
+                                  _exportar_reportes_a_disco, servicio, filtros, nombre,
+                                  usuario=session.get('user_email'))
+    if not trabajo_id:
+        flash('No se pudo iniciar la exportación', 'danger')
+        return redirect(url_for('main.admin_dashboard'))
+    return redirect(url_for('main.ver_trabajo', trabajo_id=trabajo_id), code=303)
+
+def _respuesta_hoja(nombre: str, formato: str, encabezados: list, filas):
+    """Envía filas como CSV o XLSX en flujo (la memoria no depende del número de filas)."""
+    generador, mimetype = FORMATOS_HOJA[formato]
+    return Response(
+        stream_with_context(generador(encabezados, filas)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{nombre}.{formato}"'}
+    )
+
+@bp.route('/admin/exportar/aspirantes.<formato>')
+def exportar_aspirantes(formato):
+    """Exporta los aspirantes (filtros opcionales: estado, periodo, carrera, sede)."""
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    if formato not in FORMATOS_HOJA:
+        flash('Formato de exportación no válido', 'danger')
+        return redirect(url_for('main.admin_dashboard'))
+    
+    filtros = {campo: request.args.get(campo, '').strip() for campo in repo.FILTROS_LISTADO}
+    return _respuesta_hoja('aspirantes', formato, sipu_service.ENCABEZADOS_ASPIRANTES,
+                           sipu_service.iterar_filas_aspirantes(filtros))
+
+@bp.route('/admin/exportar/asignaciones/<examen_id>.<formato>')
+def exportar_asignaciones(examen_id, formato):
+    """Exporta las asignaciones de un examen."""
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    if formato not in FORMATOS_HOJA:
+        flash('Formato de exportación no válido', 'danger')
+        return redirect(url_for('main.ver_asignaciones_examen', examen_id=examen_id))
+    
+    return _respuesta_hoja(f'asignaciones_{examen_id}', formato, sipu_service.ENCABEZADOS_ASIGNACIONES,
+                           sipu_service.iterar_filas_asignaciones(examen_id))
+
+@bp.route('/admin/exportar/calificaciones.<formato>')
+def exportar_calificaciones(formato):
+    """Exporta las calificaciones registradas (de todos los exámenes o de ?examen_id=...)."""
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    if formato not in FORMATOS_HOJA:
+        flash('Formato de exportación no válido', 'danger')
+        return redirect(url_for('main.admin_examenes'))
+    
+    examen_id = request.args.get('examen_id', '').strip() or None
+    nombre = f'calificaciones_{examen_id}' if examen_id else 'calificaciones'
+    return _respuesta_hoja(nombre, formato, sipu_service.ENCABEZADOS_CALIFICACIONES,
+                           sipu_service.iterar_filas_calificaciones(examen_id))
+
 # ========== RUTAS PARA EXÁMENES ==========
 
 @bp.route('/admin/examenes', methods=['GET', 'POST'])
@@ -357,14 +440,15 @@ def distribuir_examen(examen_id):
     if 'user' not in session or session.get('rol') != 'admin':
         return redirect(url_for('auth.login'))
     
-    exito, mensaje = sipu_service.distribuir_aspirantes_en_examenes(examen_id)
-    
-    if exito:
-        flash(mensaje, 'success')
-    else:
-        flash(f'❌ {mensaje}', 'danger')
+    # Se ejecuta en segundo plano: la petición responde de inmediato con el ID del trabajo
+    trabajo_id = trabajos.encolar('distribucion', f'Distribución del examen {examen_id}',
+                                  obtener_contenedor().servicio.distribuir_aspirantes_en_examenes, examen_id,
+                                  usuario=session.get('user_email'))
+    if not trabajo_id:
+        flash('❌ No se pudo iniciar la distribución', 'danger')
+        return redirect(url_for('main.admin_examenes'))
     
-    return redirect(url_for('main.admin_examenes'))
+    return redirect(url_for('main.ver_trabajo', trabajo_id=trabajo_id), code=303)
 
 @bp.route('/admin/examenes/<examen_id>')
 def ver_asignaciones_examen(examen_id):
@@ -376,8 +460,8 @@ def ver_asignaciones_examen(examen_id):
     asignaciones = sipu_service.repository.obtener_asignaciones_por_examen(examen_id)
     
     # Mapear nombres completos
-    periodos = {p['id']: p['nombre'] for p in sipu_service.repository.obtener_periodos()}
-    carreras = {c['id']: c['nombre'] for c in sipu_service.repository.obtener_carreras()}
+    periodos = sipu_service.repository.obtener_mapa_periodos()
+    carreras = sipu_service.repository.obtener_mapa_carreras()
     
     if examen:
         examen['periodo_nombre'] = periodos.get(examen.get('periodo'), 'N/A')
@@ -395,11 +479,29 @@ def mis_examenes():
         return redirect(url_for('auth.login'))
     
     correo_usuario = session.get('user_email')
-    examen_asignado = sipu_service.obtener_examen_aspirante(correo_usuario) if correo_usuario else None
+    def pagina():
+        examen_asignado = sipu_service.obtener_examen_aspirante(correo_usuario) if correo_usuario else None
+        
+        return render_template('mis_examenes.html',
+                             user=session.get('user'),
+                             examen=examen_asignado)
+
+    # Si el navegador ya tiene esta versión de la página: 304 sin consultar las asignaciones
+    sello = sipu_service.sello_examenes_aspirante(correo_usuario) if correo_usuario else None
+    return respuesta_condicional(sello, pagina)
+
+@bp.route('/aspirante/mis-calificaciones')
+def mis_calificaciones():
+    """Muestra las calificaciones del aspirante en todos sus exámenes."""
+    if 'user' not in session or session.get('rol') != 'postulante':
+        return redirect(url_for('auth.login'))
+    
+    correo_usuario = session.get('user_email')
+    calificaciones = sipu_service.obtener_calificaciones_aspirante(correo_usuario) if correo_usuario else []
     
-    return render_template('mis_examenes.html',
+    return render_template('mis_calificaciones.html',
                          user=session.get('user'),
-                         examen=examen_asignado)
+                         calificaciones=calificaciones)
 
 @bp.route('/admin/evaluar-examen/<examen_id>', methods=['GET', 'POST'])
 def evaluar_examen(examen_id):
@@ -408,32 +510,27 @@ def evaluar_examen(examen_id):
         return redirect(url_for('auth.login'))
     
     if request.method == 'POST':
-        # Procesar calificaciones
-        asignaciones = sipu_service.repository.obtener_asignaciones_por_examen(examen_id)
+        # Procesar calificaciones: las filas vienen completas en el formulario
+        filas = []
+        for asignacion_id in request.form.getlist('asignacion_id'):
+            filas.append({
+                'asignacion_id': asignacion_id,
+                'nombre': request.form.get(f'nombre_{asignacion_id}', ''),
+                'presentó': request.form.get(f'presentó_{asignacion_id}') == 'on',
+                'nota': request.form.get(f'nota_{asignacion_id}', ''),
+                'observaciones': request.form.get(f'observaciones_{asignacion_id}', '')
+            })
         
-        for asignacion in asignaciones:
-            asignacion_id = asignacion['id']
-            
-            # Obtener datos del formulario
-            presentó = request.form.get(f'presentó_{asignacion_id}') == 'on'
-            nota = request.form.get(f'nota_{asignacion_id}', '')
-            observaciones = request.form.get(f'observaciones_{asignacion_id}', '')
-            
-            # Validar y guardar
-            nota_int = None
-            if presentó and nota:
-                try:
-                    nota_int = int(nota)
-                    if not (1 <= nota_int <= 1000):
-                        flash(f"Nota inválida para {asignacion['aspirante_nombre']}: debe estar entre 1-1000", 'danger')
-                        continue
-                except ValueError:
-                    flash(f"Nota inválida para {asignacion['aspirante_nombre']}", 'danger')
-                    continue
-            
-            sipu_service.guardar_calificacion_aspirante(asignacion_id, presentó, nota_int, observaciones)
+        # Validar y guardar todo en una sola escritura
+        resultados = sipu_service.guardar_calificaciones_examen(examen_id, filas)
+        guardadas = 0
+        for _, exito, mensaje in resultados:
+            if exito:
+                guardadas += 1
+            else:
+                flash(mensaje, 'danger')
         
-        flash('Calificaciones guardadas correctamente', 'success')
+        flash(f'{guardadas} calificaciones guardadas correctamente', 'success')
         return redirect(url_for('main.ver_asignaciones_examen', examen_id=examen_id))
     
     # GET: Mostrar formulario de evaluación
@@ -441,8 +538,8 @@ def evaluar_examen(examen_id):
     asignaciones = sipu_service.repository.obtener_asignaciones_por_examen(examen_id)
     
     # Mapear nombres completos
-    periodos = {p['id']: p['nombre'] for p in sipu_service.repository.obtener_periodos()}
-    carreras = {c['id']: c['nombre'] for c in sipu_service.repository.obtener_carreras()}
+    periodos = sipu_service.repository.obtener_mapa_periodos()
+    carreras = sipu_service.repository.obtener_mapa_carreras()
     
     if examen:
         examen['periodo_nombre'] = periodos.get(examen.get('periodo'), 'N/A')
@@ -452,3 +549,51 @@ def evaluar_examen(examen_id):
                          user=session.get('user'),
                          examen=examen,
                          asignaciones=asignaciones)
+
+# ========== TRABAJOS EN SEGUNDO PLANO ==========
+
+@bp.route('/admin/trabajos')
+def listar_trabajos():
+    """Trabajos recientes (distribuciones y exportaciones)."""
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    
+    return render_template('trabajos.html', user=session.get('user'), trabajos=trabajos.recientes())
+
+@bp.route('/admin/trabajos/<trabajo_id>')
+def ver_trabajo(trabajo_id):
+    """Progreso y resultado de un trabajo. Con ?formato=json responde solo el estado (para sondeo)."""
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    
+    trabajo = trabajos.obtener(trabajo_id)
+    if not trabajo:
+        abort(404)
+    
+    finalizado = trabajo['estado'] in TERMINADOS
+    descarga = url_for('main.descargar_trabajo', trabajo_id=trabajo_id) \
+        if finalizado and (trabajo.get('resultado') or {}).get('archivo') else None
+    if request.args.get('formato') == 'json':
+        # La ruta del archivo en el servidor no se expone
+        estado = {k: v for k, v in trabajo.items() if k != 'resultado'}
+        estado.update(finalizado=finalizado, descarga=descarga)
+        return jsonify(estado)
+    
+    return render_template('trabajo.html', user=session.get('user'), trabajo=trabajo,
+                           finalizado=finalizado, descarga=descarga)
+
+@bp.route('/admin/trabajos/<trabajo_id>/descarga')
+def descargar_trabajo(trabajo_id):
+    """Descarga el archivo generado por un trabajo de exportación."""
+    if 'user' not in session or session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    
+    trabajo = trabajos.obtener(trabajo_id)
+    resultado = (trabajo or {}).get('resultado') or {}
+    if not resultado.get('archivo'):
+        abort(404)
+    try:
+        return send_file(resultado['archivo'], as_attachment=True, download_name=resultado.get('nombre'))
+    except FileNotFoundError:
+        flash('El archivo de la exportación ya no está disponible', 'danger')
+        return redirect(url_for('main.ver_trabajo', trabajo_id=trabajo_id))
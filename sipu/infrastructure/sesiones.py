@@ -0,0 +1,260 @@
+# sipu/infrastructure/sesiones.py
+"""
+Sesiones del lado del servidor.
+La cookie solo lleva un identificador firmado; los datos (user, user_email, rol, mensajes flash)
+se guardan en un almacén compartido, así cualquier worker o nodo atiende al mismo usuario.
+Almacenes: MongoDB (colección con índice TTL) o SQLite (archivo local, para un solo nodo).
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+COLECCION_SESIONES = 'sesiones'
+
+
+class SesionServidor(CallbackDict, SessionMixin):
+    """Diccionario de sesión que recuerda si cambió y con qué identificador se guarda."""
+
+    def __init__(self, datos: dict = None, sid: str = None, expira: float = None, nueva: bool = False):
+        def al_modificar(_):
+            self.modified = True
+
+        super().__init__(datos or {}, al_modificar)
+        self.sid = sid or secrets.token_urlsafe(32)
+        self.expira = expira
+        self.new = nueva
+        self.modified = False
+        self.sid_anterior = None
+
+    def regenerar(self):
+        """Cambia el identificador conservando los datos (al iniciar sesión, contra fijación de sesión)."""
+        if not self.new:
+            self.sid_anterior = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class IAlmacenSesiones(ABC):
+    """Interfaz de un almacén de sesiones: datos por identificador con fecha de expiración (epoch)."""
+
+    @abstractmethod
+    def cargar(self, sid: str) -> Optional[tuple]:
+        """Retorna (datos, expira) si la sesión existe y no ha expirado."""
+        pass
+
+    @abstractmethod
+    def guardar(self, sid: str, datos: dict, expira: float) -> bool:
+        pass
+
+    @abstractmethod
+    def eliminar(self, sid: str) -> bool:
+        pass
+
+
+class AlmacenSesionesMongo(IAlmacenSesiones):
+    """
+    Sesiones en la colección `sesiones`. El índice TTL sobre `expira` (ver indices.py)
+    hace que MongoDB borre solo las vencidas; como ese borrado corre cada ~60 s,
+    al cargar también se filtra por fecha.
+    """
+
+    def _coleccion(self):
+        # Se resuelve en cada uso: MongoDBClient ya se encarga de reconectar tras un fork
+        from .database import MongoDBClient
+        return MongoDBClient().database[COLECCION_SESIONES]
+
+    def cargar(self, sid: str) -> Optional[tuple]:
+        try:
+            ahora = datetime.now(timezone.utc)
+            doc = self._coleccion().find_one({'_id': sid, 'expira': {'$gt': ahora}}, {'datos': 1, 'expira': 1})
+            if not doc:
+                return None
+            expira = doc['expira']
+            if expira.tzinfo is None:
+                expira = expira.replace(tzinfo=timezone.utc)
+            return doc.get('datos') or {}, expira.timestamp()
+        except Exception as e:
+            print(f"Error al cargar sesión: {e}")
+            return None
+
+    def guardar(self, sid: str, datos: dict, expira: float) -> bool:
+        try:
+            self._coleccion().replace_one(
+                {'_id': sid},
+                {'datos': datos, 'expira': datetime.fromtimestamp(expira, timezone.utc)},
+                upsert=True)
+            return True
+        except Exception as e:
+            print(f"Error al guardar sesión: {e}")
+            return False
+
+    def eliminar(self, sid: str) -> bool:
+        try:
+            self._coleccion().delete_one({'_id': sid})
+            return True
+        except Exception as e:
+            print(f"Error al eliminar sesión: {e}")
+            return False
+
+
+class AlmacenSesionesSQLite(IAlmacenSesiones):
+    """
+    Sesiones en un archivo SQLite: lo comparten todos los workers de un mismo nodo.
+    Cada operación abre su propia conexión (seguro entre hilos y tras un fork).
+    """
+
+    # Cada cuántas escrituras se purgan las sesiones vencidas
+    PURGAR_CADA = 500
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._escrituras = 0
+        self._lock = threading.Lock()
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with self._conectar() as conexion:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('CREATE TABLE IF NOT EXISTS sesiones '
+                             '(sid TEXT PRIMARY KEY, datos TEXT NOT NULL, expira REAL NOT NULL)')
+            conexion.execute('CREATE INDEX IF NOT EXISTS sesiones_expira ON sesiones (expira)')
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.ruta, timeout=5)
+
+    def cargar(self, sid: str) -> Optional[tuple]:
+        try:
+            with self._conectar() as conexion:
+                fila = conexion.execute('SELECT datos, expira FROM sesiones WHERE sid = ? AND expira > ?',
+                                        (sid, time.time())).fetchone()
+            if fila is None:
+                return None
+            return json.loads(fila[0]), fila[1]
+        except Exception as e:
+            print(f"Error al cargar sesión: {e}")
+            return None
+
+    def guardar(self, sid: str, datos: dict, expira: float) -> bool:
+        try:
+            with self._conectar() as conexion:
+                conexion.execute('INSERT OR REPLACE INTO sesiones (sid, datos, expira) VALUES (?, ?, ?)',
+                                 (sid, json.dumps(datos, default=str), expira))
+                with self._lock:
+                    self._escrituras += 1
+                    purgar = self._escrituras % self.PURGAR_CADA == 0
+                if purgar:
+                    conexion.execute('DELETE FROM sesiones WHERE expira <= ?', (time.time(),))
+            return True
+        except Exception as e:
+            print(f"Error al guardar sesión: {e}")
+            return False
+
+    def eliminar(self, sid: str) -> bool:
+        try:
+            with self._conectar() as conexion:
+                conexion.execute('DELETE FROM sesiones WHERE sid = ?', (sid,))
+            return True
+        except Exception as e:
+            print(f"Error al eliminar sesión: {e}")
+            return False
+
+
+class InterfazSesionServidor(SessionInterface):
+    """
+    SessionInterface de Flask sobre un IAlmacenSesiones.
+    La cookie lleva solo el identificador firmado con SECRET_KEY (unos 80 bytes).
+    Para no escribir en cada petición, una sesión sin cambios solo se renueva
+    cuando ya consumió la mitad de su vigencia.
+    """
+
+    def __init__(self, almacen: IAlmacenSesiones):
+        self.almacen = almacen
+
+    def _firmador(self, app) -> Optional[Signer]:
+        if not app.secret_key:
+            return None
+        return Signer(app.secret_key, salt='sipu-sesion')
+
+    def open_session(self, app, request):
+        firmador = self._firmador(app)
+        if firmador is None:
+            return None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = firmador.unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                guardada = self.almacen.cargar(sid)
+                if guardada is not None:
+                    datos, expira = guardada
+                    return SesionServidor(datos, sid=sid, expira=expira)
+        return SesionServidor(nueva=True)
+
+    def save_session(self, app, session: SesionServidor, response):
+        nombre = self.get_cookie_name(app)
+        dominio = self.get_cookie_domain(app)
+        ruta = self.get_cookie_path(app)
+
+        if session.sid_anterior:
+            self.almacen.eliminar(session.sid_anterior)
+            session.sid_anterior = None
+
+        # Sesión vaciada (logout): se borra del almacén y se expira la cookie
+        if not session:
+            if not session.new:
+                self.almacen.eliminar(session.sid)
+                response.delete_cookie(nombre, domain=dominio, path=ruta,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        vigencia = app.permanent_session_lifetime.total_seconds()
+        ahora = time.time()
+        por_renovar = session.expira is None or session.expira - ahora < vigencia / 2
+        if not (session.modified or por_renovar):
+            return
+
+        session.expira = ahora + vigencia
+        if not self.almacen.guardar(session.sid, dict(session), session.expira):
+            return
+        response.set_cookie(nombre, self._firmador(app).sign(session.sid).decode(),
+                            expires=self.get_expiration_time(app, session),
+                            httponly=self.get_cookie_httponly(app),
+                            domain=dominio, path=ruta,
+                            secure=self.get_cookie_secure(app),
+                            samesite=self.get_cookie_samesite(app))
+        response.vary.add('Cookie')
+
+
+def crear_almacen(config: dict) -> Optional[IAlmacenSesiones]:
+    """
+    Patrón Creacional: Factory Method.
+    Elige el almacén según SESION_ALMACEN ('mongo', 'sqlite'; 'cookie' conserva la sesión firmada de Flask).
+    """
+    tipo = (config.get('SESION_ALMACEN') or 'cookie').lower()
+    if tipo == 'mongo':
+        return AlmacenSesionesMongo()
+    if tipo == 'sqlite':
+        return AlmacenSesionesSQLite(config.get('SESION_SQLITE_RUTA') or os.path.join('data', 'sesiones.sqlite3'))
+    return None
+
+
+def registrar_sesiones(app):
+    """Instala la sesión del lado del servidor en la app (si el almacén configurado no es 'cookie')."""
+    almacen = crear_almacen(app.config)
+    if almacen is not None:
+        app.session_interface = InterfazSesionServidor(almacen)
+    return almacen
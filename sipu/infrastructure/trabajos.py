@@ -0,0 +1,180 @@
+# sipu/infrastructure/trabajos.py
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from ..domain.interfaces import ISipuRepository
+
+# Estados posibles de un trabajo
+EN_COLA = 'En cola'
+EN_EJECUCION = 'En ejecución'
+COMPLETADO = 'Completado'
+FALLIDO = 'Fallido'
+TERMINADOS = (COMPLETADO, FALLIDO)
+PENDIENTES = (EN_COLA, EN_EJECUCION)
+
+
+class EjecutorTrabajos:
+    """
+    Ejecuta operaciones pesadas (distribuciones, exportaciones) fuera de la petición HTTP.
+    Cada trabajo corre en un pool de hilos y su estado, progreso y resultado se guardan
+    con el repositorio, así cualquier proceso del servidor puede consultarlo.
+    Mientras el proceso vive, un hilo renueva el latido de sus trabajos; al crear el pool se
+    marcan como fallidos los trabajos pendientes cuyo proceso dejó de latir (se reinició o murió).
+    """
+
+    # Tiempo mínimo entre dos escrituras de progreso del mismo trabajo (segundos)...
+    INTERVALO_PROGRESO = 1.0
+    # ...salvo que el porcentaje avance al menos esto desde la última escritura
+    PASO_PROGRESO = 10
+    # Cada cuánto se renueva el latido de los trabajos del proceso (segundos)
+    INTERVALO_LATIDO = 30.0
+    # Latidos seguidos sin renovar para dar por muerto al proceso de un trabajo
+    LATIDOS_PERDIDOS = 3
+
+    def __init__(self, repository: ISipuRepository, hilos: int = None):
+        self.repository = repository
+        self.hilos = hilos or int(os.environ.get('TRABAJOS_HILOS', 2))
+        self._pool = None
+        self._lock = threading.Lock()
+        self._activos = set()  # Trabajos de este proceso en cola o en ejecución
+        self._detener_latido = None
+
+    def _obtener_pool(self) -> ThreadPoolExecutor:
+        # Se crea al primer uso (no al importar), igual que el pool de exportacion.py
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._marcar_huerfanos()
+                    self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix='sipu-trabajo')
+                    # Un evento por pool: cerrar() detiene solo el hilo de latido de ese pool
+                    self._detener_latido = threading.Event()
+                    threading.Thread(target=self._latir, args=(self._detener_latido,),
+                                     name='sipu-trabajo-latido', daemon=True).start()
+        return self._pool
+
+    def _marcar_huerfanos(self):
+        """Los trabajos pendientes sin latido reciente ya no los ejecuta ningún proceso."""
+        limite = datetime.now() - timedelta(seconds=self.INTERVALO_LATIDO * self.LATIDOS_PERDIDOS)
+        marcados = self.repository.marcar_trabajos_huerfanos(list(PENDIENTES), limite.isoformat(), {
+            'estado': FALLIDO,
+            'progreso': None,
+            'mensaje': 'Error: el proceso que lo ejecutaba se detuvo antes de terminar',
+            'terminado': datetime.now().isoformat()
+        })
+        if marcados:
+            print(f"{marcados} trabajo(s) huérfano(s) marcados como fallidos")
+
+    def _latir(self, detener: threading.Event):
+        while not detener.wait(self.INTERVALO_LATIDO):
+            with self._lock:
+                activos = list(self._activos)
+            if activos:
+                try:
+                    self.repository.registrar_latido_trabajos(activos, datetime.now().isoformat())
+                except Exception as e:
+                    print(f"Error al registrar latido de trabajos: {e}")
+
+    def encolar(self, tipo: str, descripcion: str, funcion, *args, usuario: str = None) -> Optional[str]:
+        """
+        Registra el trabajo y lo programa. Retorna su ID de inmediato (None si no se pudo registrar).
+        `funcion(*args, progreso=...)` debe retornar (éxito, mensaje) o (éxito, mensaje, resultado: dict).
+        """
+        trabajo_id = uuid.uuid4().hex
+        creado = datetime.now().isoformat()
+        trabajo = {
+            'id': trabajo_id,
+            'tipo': tipo,
+            'descripcion': descripcion,
+            'estado': EN_COLA,
+            'progreso': 0,
+            'mensaje': 'Esperando turno',
+            'resultado': None,
+            'usuario': usuario,
+            'creado': creado,
+            'latido': creado,
+            'iniciado': None,
+            'terminado': None
+        }
+        pool = self._obtener_pool()
+        if not self.repository.crear_trabajo(trabajo):
+            return None
+        with self._lock:
+            self._activos.add(trabajo_id)
+        pool.submit(self._ejecutar, trabajo_id, funcion, args)
+        return trabajo_id
+
+    def _ejecutar(self, trabajo_id: str, funcion, args: tuple):
+        # Pase lo que pase el trabajo deja de latir: si no se pudo guardar su estado final,
+        # el barrido de huérfanos lo marcará como fallido
+        try:
+            try:
+                iniciado = datetime.now().isoformat()
+                self.repository.actualizar_trabajo(trabajo_id, {
+                    'estado': EN_EJECUCION, 'mensaje': 'En ejecución', 'iniciado': iniciado, 'latido': iniciado
+                })
+                salida = funcion(*args, progreso=self._reportador(trabajo_id))
+                exito, mensaje = salida[0], salida[1]
+                resultado = salida[2] if len(salida) > 2 else None
+            except Exception as e:
+                print(f"Error en trabajo {trabajo_id}: {e}")
+                exito, mensaje, resultado = False, f"Error: {str(e)}", None
+
+            try:
+                self.repository.actualizar_trabajo(trabajo_id, {
+                    'estado': COMPLETADO if exito else FALLIDO,
+                    'progreso': 100 if exito else None,
+                    'mensaje': mensaje,
+                    'resultado': resultado,
+                    'terminado': datetime.now().isoformat()
+                })
+            except Exception as e:
+                print(f"Error al guardar el resultado del trabajo {trabajo_id}: {e}")
+        finally:
+            with self._lock:
+                self._activos.discard(trabajo_id)
+
+    def _reportador(self, trabajo_id: str):
+        """
+        Retorna el callback progreso(porcentaje, mensaje=None) que recibe la función del trabajo.
+        Limita las escrituras para que un bucle que reporta a menudo no sature la base de datos,
+        pero un avance de PASO_PROGRESO o más (o pasar a indeterminado) siempre se escribe.
+        """
+        ultimo = {'momento': 0.0, 'porcentaje': 0}
+
+        def progreso(porcentaje: Optional[int], mensaje: str = None):
+            valor = None if porcentaje is None else max(0, min(100, int(porcentaje)))
+            anterior = ultimo['porcentaje']
+            if valor is None or anterior is None:
+                salto = valor != anterior
+            else:
+                salto = abs(valor - anterior) >= self.PASO_PROGRESO
+            ahora = time.monotonic()
+            if not salto and ahora - ultimo['momento'] < self.INTERVALO_PROGRESO:
+                return
+            ultimo['momento'], ultimo['porcentaje'] = ahora, valor
+            cambios = {'progreso': valor}
+            if mensaje:
+                cambios['mensaje'] = mensaje
+            self.repository.actualizar_trabajo(trabajo_id, cambios)
+
+        return progreso
+
+    def obtener(self, trabajo_id: str) -> Optional[dict]:
+        """Estado actual de un trabajo."""
+        return self.repository.obtener_trabajo(trabajo_id)
+
+    def recientes(self, limite: int = 20) -> list:
+        """Trabajos más recientes primero."""
+        return self.repository.listar_trabajos(limite)
+
+    def cerrar(self, esperar: bool = True):
+        """Detiene el pool (espera a los trabajos en curso si `esperar`)."""
+        if self._pool is not None:
+            self._detener_latido.set()
+            self._pool.shutdown(wait=esperar)
+            self._pool = None
@@ -0,0 +1,53 @@
+# tests/conftest.py
+"""
+Fixtures compartidas. Las pruebas contra MongoDB usan una base de datos propia y temporal
+(nunca la de la aplicación) y se omiten si no hay un servidor configurado y disponible:
+    SIPU_TEST_MONGODB_URI=mongodb://localhost:27017/ python -m pytest -q
+"""
+import os
+import uuid
+
+import pytest
+
+os.environ.setdefault('SIPU_ASEGURAR_INDICES', '0')
+
+
+@pytest.fixture(scope='session')
+def mongo_uri():
+    """URI del servidor de pruebas; sin SIPU_TEST_MONGODB_URI o sin servidor, la prueba se omite."""
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    uri = os.environ.get('SIPU_TEST_MONGODB_URI')
+    if not uri:
+        pytest.skip("SIPU_TEST_MONGODB_URI no está configurada")
+    cliente = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    try:
+        cliente.admin.command('ping')
+    except PyMongoError as e:
+        pytest.skip(f"MongoDB no disponible en {uri}: {e}")
+    finally:
+        cliente.close()
+    return uri
+
+
+@pytest.fixture
+def mongo_db(mongo_uri):
+    """Base de datos temporal con los índices declarados; el Singleton apunta a ella durante la prueba."""
+    from sipu.infrastructure.cache import CatalogoCache
+    from sipu.infrastructure.database import MongoDBClient
+    from sipu.infrastructure.indices import asegurar_indices
+
+    nombre = f"sipu_test_{uuid.uuid4().hex[:8]}"
+    MongoDBClient.cerrar()
+    MongoDBClient.configurar(mongo_uri, nombre, {'serverSelectionTimeoutMS': 2000})
+    db = MongoDBClient().database
+    asegurar_indices(db)
+    CatalogoCache().invalidar()
+    try:
+        yield db
+    finally:
+        db.client.drop_database(nombre)
+        MongoDBClient.cerrar()
+        MongoDBClient.configurar(None, None, None)
+        CatalogoCache().invalidar()
@@ -0,0 +1,66 @@
+# tests/test_asignacion.py
+"""Motor de asignación: cada aspirante en su sede, capacidad por laboratorio y excedente por sede."""
+from sipu.application.asignacion import MotorAsignacion, sedes_con_excedente
+
+LABORATORIOS = [
+    {'id': 'lab_n2', 'nombre': 'Norte 2', 'sede': 'norte', 'capacidad': 1},
+    {'id': 'lab_n1', 'nombre': 'Norte 1', 'sede': 'norte', 'capacidad': 2},
+    {'id': 'lab_s1', 'nombre': 'Sur 1', 'sede': 'sur', 'capacidad': 2},
+    {'id': 'lab_s0', 'nombre': 'Sur 0', 'sede': 'sur', 'capacidad': 0},
+]
+
+
+def _candidatos(sede: str, n: int) -> list:
+    return [{'correo': f"{sede}{i}@sipu.test", 'nombre': f"{sede} {i}", 'sede': sede} for i in range(n)]
+
+
+def test_cada_aspirante_queda_en_un_laboratorio_de_su_sede():
+    motor = MotorAsignacion(LABORATORIOS)
+    candidatos = _candidatos('norte', 3) + _candidatos('sur', 2)
+    asignaciones, _ = motor.asignar('ex1', 'd1', candidatos)
+
+    sede_aspirante = {c['correo']: c['sede'] for c in candidatos}
+    sede_laboratorio = {lab['id']: lab['sede'] for lab in LABORATORIOS}
+    assert len(asignaciones) == 5
+    for asignacion in asignaciones:
+        assert sede_laboratorio[asignacion['lab_id']] == sede_aspirante[asignacion['aspirante_correo']]
+
+
+def test_respeta_la_capacidad_de_cada_laboratorio():
+    motor = MotorAsignacion(LABORATORIOS)
+    asignaciones, _ = motor.asignar('ex1', 'd1', _candidatos('norte', 10) + _candidatos('sur', 10))
+
+    ocupados = {}
+    for asignacion in asignaciones:
+        ocupados[asignacion['lab_id']] = ocupados.get(asignacion['lab_id'], 0) + 1
+    assert ocupados == {'lab_n1': 2, 'lab_n2': 1, 'lab_s1': 2}
+    # Ningún puesto se repite dentro de un laboratorio
+    puestos = [(a['lab_id'], a['num_computadora']) for a in asignaciones]
+    assert len(puestos) == len(set(puestos))
+    assert [o['ocupados'] for o in motor.ocupacion(asignaciones)] == [2, 1, 2]
+
+
+def test_excedente_por_sede_incluida_una_sede_sin_laboratorios():
+    motor = MotorAsignacion(LABORATORIOS)
+    _, resumen = motor.asignar('ex1', 'd1', _candidatos('norte', 4) + _candidatos('sur', 2)
+                               + _candidatos('este', 3))
+
+    assert resumen['norte'] == {'aspirantes': 4, 'capacidad': 3, 'asignados': 3, 'excedente': 1}
+    assert resumen['sur'] == {'aspirantes': 2, 'capacidad': 2, 'asignados': 2, 'excedente': 0}
+    assert resumen['este'] == {'aspirantes': 3, 'capacidad': 0, 'asignados': 0, 'excedente': 3}
+    assert set(sedes_con_excedente(resumen)) == {'norte', 'este'}
+
+
+def test_numeracion_de_asientos_es_determinista():
+    candidatos = _candidatos('norte', 3)
+    primera, _ = MotorAsignacion(LABORATORIOS).asignar('ex1', 'd1', candidatos)
+    # El orden de los laboratorios de entrada no cambia el resultado: se llenan por id
+    segunda, _ = MotorAsignacion(list(reversed(LABORATORIOS))).asignar('ex1', 'd1', candidatos)
+
+    assert primera == segunda
+    assert [(a['aspirante_correo'], a['lab_id'], a['num_computadora']) for a in primera] == [
+        ('norte0@sipu.test', 'lab_n1', 1),
+        ('norte1@sipu.test', 'lab_n1', 2),
+        ('norte2@sipu.test', 'lab_n2', 1),
+    ]
+    assert primera[0]['id'] == 'asig_ex1_d1_norte0@sipu.test'
@@ -0,0 +1,27 @@
+# tests/test_config.py
+"""Configuración: fuera de desarrollo no hay clave secreta ni DEBUG por defecto."""
+import pytest
+
+from config import Config, DevelopmentConfig, ProductionConfig, obtener_configuracion
+
+
+def test_solo_desarrollo_tiene_clave_y_debug_por_defecto(monkeypatch):
+    assert not Config.DEBUG and not ProductionConfig.DEBUG
+    assert DevelopmentConfig.DEBUG and DevelopmentConfig.SECRET_KEY
+    assert 'SECRET_KEY' not in ProductionConfig.__dict__
+
+
+def test_produccion_sin_clave_no_arranca():
+    from sipu import create_app
+
+    class SinClave(ProductionConfig):
+        SECRET_KEY = None
+
+    with pytest.raises(RuntimeError):
+        create_app(SinClave)
+
+
+def test_configuracion_desconocida_falla():
+    assert obtener_configuracion('production') is ProductionConfig
+    with pytest.raises(ValueError):
+        obtener_configuracion('produccion')
@@ -0,0 +1,275 @@
+# tests/test_contrato_repositorio.py
+"""
+Contrato de ISipuRepository: las mismas pruebas corren contra el repositorio en memoria (siempre)
+y contra MongoDB (cuando SIPU_TEST_MONGODB_URI apunta a un servidor disponible).
+Solo se usan métodos de la interfaz, así ambas implementaciones deben comportarse igual.
+"""
+import pytest
+
+from sipu.domain.models import Aspirante
+
+
+@pytest.fixture(params=['memoria', 'mongo'])
+def repositorio(request):
+    if request.param == 'memoria':
+        from sipu.infrastructure.memory_repository import InMemorySipuRepository
+        return InMemorySipuRepository()
+    request.getfixturevalue('mongo_db')
+    from sipu.infrastructure.repositories import MongoSipuRepository
+    return MongoSipuRepository()
+
+
+def _usuario(n: int, **campos) -> dict:
+    doc = {'nombre': f'Aspirante {n:03d}', 'correo': f'a{n:03d}@sipu.test', 'contrasena': 'clave',
+           'rol': 'aspirante', 'estado': 'Incompleto', 'dni': None, 'periodo': None, 'carrera': None,
+           'jornada': None, 'sede': None}
+    doc.update(campos)
+    return doc
+
+
+def _examen(examen_id: str = 'ex1') -> dict:
+    return {'id': examen_id, 'periodo': '2025-1', 'carrera': 'is', 'jornada': 'matutina',
+            'fecha': '2025-03-01', 'hora_inicio': '08:00', 'hora_fin': '10:00', 'estado': 'Activo'}
+
+
+def _asignaciones(distribucion_id: str, correos, examen_id: str = 'ex1') -> list:
+    return [{'id': f'asig_{examen_id}_{distribucion_id}_{correo}', 'examen_id': examen_id,
+             'distribucion_id': distribucion_id, 'aspirante_correo': correo, 'aspirante_nombre': correo,
+             'lab_id': 'lab1', 'lab_nombre': 'Laboratorio 1', 'num_computadora': i, 'sede': 'principal',
+             'estado': 'Pendiente'} for i, correo in enumerate(correos, 1)]
+
+
+# ---------- Aspirantes y usuarios ----------
+
+def test_crear_usuario_rechaza_correo_repetido(repositorio):
+    assert repositorio.crear_usuario(_usuario(1))
+    assert not repositorio.crear_usuario(_usuario(1, nombre='Otro'))
+    assert repositorio.obtener_aspirante_crudo_por_correo('a001@sipu.test')['nombre'] == 'Aspirante 001'
+    assert repositorio.obtener_aspirante_crudo_por_correo('nadie@sipu.test') is None
+
+
+def test_guardar_aspirante_crea_y_actualiza(repositorio):
+    aspirante = Aspirante('Ana', 'ana@sipu.test', dni='0102030405', periodo='2025-1', carrera='is',
+                          jornada='matutina', sede='principal')
+    assert repositorio.guardar_aspirante(aspirante)
+
+    leido = repositorio.obtener_aspirante_por_dni('0102030405')
+    assert (leido.nombre, leido.correo, leido.sede, leido.estado) == ('Ana', 'ana@sipu.test', 'principal', 'Pendiente')
+
+    leido.estado = 'Inscrito'
+    assert repositorio.guardar_aspirante(leido)
+    assert repositorio.obtener_aspirante_por_correo('ana@sipu.test').estado == 'Inscrito'
+    assert repositorio.obtener_aspirante_por_correo('nadie@sipu.test') is None
+
+
+def test_guardar_aspirante_con_dni_repetido_retorna_false(repositorio):
+    assert repositorio.crear_usuario(_usuario(1, dni='1111111111'))
+    assert repositorio.crear_usuario(_usuario(2))
+
+    otro = repositorio.obtener_aspirante_por_correo('a002@sipu.test')
+    otro.dni = '1111111111'
+    assert repositorio.guardar_aspirante(otro) is False
+    assert repositorio.obtener_aspirante_por_correo('a002@sipu.test').dni is None
+    assert repositorio.obtener_aspirante_por_dni('1111111111').correo == 'a001@sipu.test'
+
+
+def test_guardar_aspirante_invalido_retorna_false(repositorio):
+    aspirante = Aspirante('Ana', 'ana@sipu.test')
+    aspirante.estado = 'Desconocido'
+    assert repositorio.guardar_aspirante(aspirante) is False
+    assert repositorio.obtener_aspirante_por_correo('ana@sipu.test') is None
+
+
+def test_guardar_aspirantes_en_lote(repositorio):
+    aspirantes = [Aspirante(f'Nombre {i}', f'lote{i}@sipu.test', dni=f'20000000{i:02d}') for i in range(3)]
+    assert repositorio.guardar_aspirantes(aspirantes)
+    assert [repositorio.obtener_aspirante_por_dni(f'20000000{i:02d}').correo for i in range(3)] == \
+        [f'lote{i}@sipu.test' for i in range(3)]
+
+
+def test_version_aspirante_cambia_en_cada_escritura(repositorio):
+    assert repositorio.obtener_version_aspirante(correo='a001@sipu.test') is None
+    assert repositorio.crear_usuario(_usuario(1, dni='3333333333'))
+    inicial = repositorio.obtener_version_aspirante(correo='a001@sipu.test')
+
+    aspirante = repositorio.obtener_aspirante_por_correo('a001@sipu.test')
+    assert repositorio.guardar_aspirante(aspirante)
+    assert repositorio.obtener_version_aspirante(correo='a001@sipu.test') > inicial
+    assert repositorio.obtener_version_aspirante(dni='3333333333') == \
+        repositorio.obtener_version_aspirante(correo='a001@sipu.test')
+
+
+def test_importar_aspirantes_no_modifica_existentes(repositorio):
+    assert repositorio.crear_usuario(_usuario(1, dni='4444444444'))
+    assert repositorio.buscar_aspirantes_existentes(['a001@sipu.test', 'a002@sipu.test'],
+                                                    ['4444444444', '5555555555']) == \
+        ({'a001@sipu.test'}, {'4444444444'})
+
+    resultado = repositorio.importar_aspirantes([
+        _usuario(1, nombre='Cambiado'),
+        _usuario(2, dni='4444444444'),
+        _usuario(3, dni='6666666666'),
+    ])
+    assert resultado['insertados'] == 1
+    assert resultado['errores'] == {'a001@sipu.test': "El correo ya está registrado",
+                                    'a002@sipu.test': "El DNI ya está registrado"}
+    assert repositorio.obtener_aspirante_crudo_por_correo('a001@sipu.test')['nombre'] == 'Aspirante 001'
+    assert repositorio.obtener_aspirante_por_dni('6666666666').correo == 'a003@sipu.test'
+
+
+# ---------- Catálogos y listado ----------
+
+def test_reemplazar_catalogo_actualiza_los_mapas(repositorio):
+    assert repositorio.reemplazar_catalogo('sedes', [{'id': 'norte', 'nombre': 'Sede Norte'}])
+    assert repositorio.obtener_mapa_sedes() == {'norte': 'Sede Norte'}
+    assert repositorio.reemplazar_catalogo('sedes', [{'id': 'sur', 'nombre': 'Sede Sur'}])
+    assert repositorio.obtener_mapa_sedes() == {'sur': 'Sede Sur'}
+    assert [s['id'] for s in repositorio.obtener_sedes()] == ['sur']
+
+
+@pytest.mark.parametrize('orden', ['nombre', 'correo', 'dni'])
+@pytest.mark.parametrize('descendente', [False, True])
+def test_listado_paginado_recorre_todo_sin_repetir(repositorio, orden, descendente):
+    for n in range(1, 8):
+        # Nombres repetidos y DNIs faltantes: el desempate debe ser estable
+        assert repositorio.crear_usuario(_usuario(n, nombre=f'Nombre {n % 3}',
+                                                  dni=f'90000000{n:02d}' if n % 2 else None))
+    assert repositorio.crear_usuario({'nombre': 'Admin', 'correo': 'admin@sipu.test', 'rol': 'admin'})
+
+    vistos, despues = [], None
+    while True:
+        pagina = repositorio.listar_aspirantes_pagina({}, orden=orden, descendente=descendente,
+                                                      limite=3, despues=despues)
+        if not pagina:
+            break
+        vistos += [fila.correo for fila in pagina]
+        ultimo = pagina[-1]
+        despues = (getattr(ultimo, orden), str(ultimo._id))
+
+    assert sorted(vistos) == sorted(f'a{n:03d}@sipu.test' for n in range(1, 8))
+    assert len(vistos) == len(set(vistos))
+
+
+def test_listado_aplica_filtros(repositorio):
+    assert repositorio.crear_usuario(_usuario(1, estado='Inscrito', sede='norte'))
+    assert repositorio.crear_usuario(_usuario(2, estado='Inscrito', sede='sur'))
+    assert repositorio.crear_usuario(_usuario(3, estado='Incompleto', sede='norte'))
+    pagina = repositorio.listar_aspirantes_pagina({'estado': 'Inscrito', 'sede': 'norte'})
+    assert [fila.correo for fila in pagina] == ['a001@sipu.test']
+
+
+# ---------- Exámenes, distribuciones y calificaciones ----------
+
+def test_crear_examen_rechaza_id_repetido(repositorio):
+    assert repositorio.crear_examen(_examen())
+    assert not repositorio.crear_examen(_examen())
+    assert repositorio.obtener_examen_por_id('ex1')['carrera'] == 'is'
+
+
+def test_publicar_distribucion_conserva_la_anterior_hasta_la_siguiente(repositorio):
+    assert repositorio.crear_examen(_examen())
+    correos = ['a001@sipu.test', 'a002@sipu.test']
+
+    assert repositorio.publicar_distribucion('ex1', 'd1', _asignaciones('d1', correos))
+    assert repositorio.publicar_distribucion('ex1', 'd2', _asignaciones('d2', correos))
+    # Los lectores solo ven la publicada; la anterior sigue completa para quien ya leyó su id
+    assert {f.id for f in repositorio.obtener_asignaciones_por_examen('ex1')} == \
+        {a['id'] for a in _asignaciones('d2', correos)}
+    assert len(list(repositorio.iterar_asignaciones('ex1'))) == 2
+    assert repositorio.guardar_calificaciones_lote('ex1', [(_asignaciones('d1', correos)[0]['id'], False, None, '')]) == \
+        {_asignaciones('d1', correos)[0]['id']: True}
+
+    assert repositorio.publicar_distribucion('ex1', 'd3', _asignaciones('d3', correos))
+    # La de dos publicaciones atrás ya se eliminó
+    assert repositorio.guardar_calificaciones_lote('ex1', [(_asignaciones('d1', correos)[0]['id'], False, None, '')]) == \
+        {_asignaciones('d1', correos)[0]['id']: False}
+    assert [a['id'] for a in repositorio.obtener_asignaciones_por_aspirante('a001@sipu.test')] == \
+        [_asignaciones('d3', correos)[0]['id']]
+
+
+def test_calificaciones_de_ids_inexistentes_no_se_cuentan(repositorio):
+    assert repositorio.crear_examen(_examen())
+    asignacion = _asignaciones('d1', ['a001@sipu.test'])[0]
+    assert repositorio.publicar_distribucion('ex1', 'd1', [dict(asignacion)])
+
+    resultados = repositorio.guardar_calificaciones_lote('ex1', [
+        (asignacion['id'], True, 750, 'Bien'),
+        ('asig_inventada', True, 500, ''),
+    ])
+    assert resultados == {asignacion['id']: True, 'asig_inventada': False}
+    assert repositorio.guardar_calificaciones_lote('otro_examen', [(asignacion['id'], True, 1, '')]) == \
+        {asignacion['id']: False}
+    assert repositorio.guardar_calificacion('asig_inventada', True, 500, '') is False
+    assert repositorio.guardar_calificacion(asignacion['id'], False, None, 'No asistió') is True
+
+    calificada = repositorio.obtener_calificaciones_aspirante('a001@sipu.test')[0]
+    assert (calificada['estado'], calificada['nota'], calificada['observaciones']) == \
+        ('No presentado', None, 'No asistió')
+
+
+def test_reservar_asiento_respeta_la_capacidad(repositorio):
+    assert repositorio.crear_examen(_examen())
+    assert repositorio.publicar_distribucion('ex1', 'd1', [], ocupacion=[
+        {'lab_id': 'lab1', 'lab_nombre': 'Laboratorio 1', 'sede': 'principal', 'capacidad': 2, 'ocupados': 1}])
+
+    asiento = repositorio.reservar_asiento('ex1', 'principal')
+    assert (asiento['distribucion_id'], asiento['lab_id'], asiento['num_computadora']) == ('d1', 'lab1', 2)
+    assert repositorio.reservar_asiento('ex1', 'principal') is None
+    assert repositorio.reservar_asiento('ex1', 'norte') is None
+    assert repositorio.obtener_ocupacion('ex1')[0]['ocupados'] == 2
+
+
+def test_liberar_asiento_solo_el_ultimo_tomado(repositorio):
+    assert repositorio.crear_examen(_examen())
+    assert repositorio.publicar_distribucion('ex1', 'd1', [], ocupacion=[
+        {'lab_id': 'lab1', 'lab_nombre': 'Laboratorio 1', 'sede': 'principal', 'capacidad': 3, 'ocupados': 0}])
+
+    primero = repositorio.reservar_asiento('ex1', 'principal')
+    segundo = repositorio.reservar_asiento('ex1', 'principal')
+    # Devolver el primero repetiría el número del segundo en la próxima reserva
+    assert repositorio.liberar_asiento('ex1', primero) is False
+    assert repositorio.liberar_asiento('ex1', segundo) is True
+    assert repositorio.obtener_ocupacion('ex1')[0]['ocupados'] == 1
+    assert repositorio.reservar_asiento('ex1', 'principal')['num_computadora'] == 2
+
+
+def test_versiones_examenes_aspirante_cambian_al_calificar(repositorio):
+    assert repositorio.crear_examen(_examen())
+    asignacion = _asignaciones('d1', ['a001@sipu.test'])[0]
+    assert repositorio.publicar_distribucion('ex1', 'd1', [dict(asignacion)])
+
+    antes = repositorio.obtener_versiones_examenes_aspirante('a001@sipu.test')
+    assert [v[0] for v in antes] == [asignacion['id']]
+    assert repositorio.guardar_calificacion(asignacion['id'], True, 900, '')
+    assert repositorio.obtener_versiones_examenes_aspirante('a001@sipu.test') != antes
+
+
+# ---------- Trabajos ----------
+
+def test_trabajos(repositorio):
+    assert repositorio.crear_trabajo({'id': 't1', 'estado': 'En cola', 'creado': '2025-01-01T10:00:00'})
+    assert repositorio.crear_trabajo({'id': 't2', 'estado': 'En cola', 'creado': '2025-01-01T11:00:00'})
+    assert not repositorio.crear_trabajo({'id': 't1', 'estado': 'En cola', 'creado': '2025-01-01T12:00:00'})
+
+    assert repositorio.actualizar_trabajo('t1', {'estado': 'Completado', 'progreso': 100})
+    assert not repositorio.actualizar_trabajo('t9', {'estado': 'Completado'})
+    assert repositorio.obtener_trabajo('t1')['estado'] == 'Completado'
+    assert repositorio.obtener_trabajo('t9') is None
+    assert [t['id'] for t in repositorio.listar_trabajos()] == ['t2', 't1']
+
+
+def test_trabajos_huerfanos(repositorio):
+    for trabajo_id, estado, latido in (('viejo', 'En ejecución', '2025-01-01T10:00:00'),
+                                       ('vivo', 'En ejecución', '2025-01-01T12:00:00'),
+                                       ('sin_latido', 'En cola', None),
+                                       ('terminado', 'Completado', '2025-01-01T10:00:00')):
+        trabajo = {'id': trabajo_id, 'estado': estado, 'creado': '2025-01-01T09:00:00'}
+        if latido:
+            trabajo['latido'] = latido
+        assert repositorio.crear_trabajo(trabajo)
+
+    assert repositorio.registrar_latido_trabajos(['sin_latido'], '2025-01-01T12:00:00')
+    assert repositorio.marcar_trabajos_huerfanos(['En cola', 'En ejecución'], '2025-01-01T11:00:00',
+                                                 {'estado': 'Fallido'}) == 1
+    assert {t['id']: t['estado'] for t in repositorio.listar_trabajos()} == \
+        {'viejo': 'Fallido', 'vivo': 'En ejecución', 'sin_latido': 'En cola', 'terminado': 'Completado'}
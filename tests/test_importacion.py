@@ -0,0 +1,48 @@
+# tests/test_importacion.py
+"""Importación de aspirantes: los que llegan inscritos reciben asiento y el reporte de errores tiene tope."""
+import io
+
+import pytest
+
+from sipu.application.importacion import ImportadorAspirantes
+from sipu.application.services import SipuService
+from sipu.infrastructure.memory_repository import InMemorySipuRepository
+
+
+@pytest.fixture
+def repositorio():
+    repositorio = InMemorySipuRepository()
+    assert repositorio.reemplazar_catalogo('periods', [{'id': '2025-1', 'nombre': '2025 - I'}])
+    assert repositorio.reemplazar_catalogo('careers', [{'id': 'is', 'nombre': 'Software'}])
+    assert repositorio.reemplazar_catalogo('sedes', [{'id': 'principal', 'nombre': 'Principal'}])
+    assert repositorio.crear_examen({'id': 'ex1', 'periodo': '2025-1', 'carrera': 'is', 'jornada': 'matutina',
+                                     'fecha': '2025-03-01', 'estado': 'Activo'})
+    assert repositorio.publicar_distribucion('ex1', 'd1', [], ocupacion=[
+        {'lab_id': 'lab1', 'lab_nombre': 'Laboratorio 1', 'sede': 'principal', 'capacidad': 2, 'ocupados': 0}])
+    return repositorio
+
+
+def _csv(*filas) -> io.StringIO:
+    return io.StringIO('nombre,correo,contrasena,dni,periodo,carrera,jornada,sede\n' + '\n'.join(filas) + '\n')
+
+
+def test_inscritos_importados_reciben_asiento(repositorio):
+    resumen = SipuService(repositorio).importar_aspirantes(_csv(
+        'Ana,ana@sipu.test,clave,1000000001,2025-1,is,matutina,principal',
+        'Beto,beto@sipu.test,clave,,,,,',
+        'Caro,caro@sipu.test,clave,1000000003,2025-1,is,matutina,principal',
+        'Dani,dani@sipu.test,clave,1000000004,2025-1,is,matutina,principal',
+    ))
+    assert (resumen['creados'], resumen['asientos'], resumen['con_errores']) == (4, 2, 0)
+    # Capacidad 2: los dos primeros inscritos tienen asiento, el tercero entra en la próxima distribución
+    assert [a['num_computadora'] for a in repositorio.obtener_asignaciones_por_aspirante('ana@sipu.test')] == [1]
+    assert [a['num_computadora'] for a in repositorio.obtener_asignaciones_por_aspirante('caro@sipu.test')] == [2]
+    assert repositorio.obtener_asignaciones_por_aspirante('beto@sipu.test') == []
+    assert repositorio.obtener_asignaciones_por_aspirante('dani@sipu.test') == []
+
+
+def test_reporte_de_errores_tiene_tope(repositorio):
+    filas = [f'Sin correo {n},,clave,,,,,' for n in range(5)]
+    resumen = ImportadorAspirantes(repositorio, max_errores=3).importar(_csv(*filas))
+    assert resumen['con_errores'] == 5
+    assert [error[0] for error in resumen['errores']] == [2, 3, 4]
@@ -0,0 +1,32 @@
+# tests/test_indices.py
+"""Los índices declarados y los planes de las consultas del repositorio (IXSCAN, sin COLLSCAN ni SORT)."""
+from sipu.infrastructure.indices import (CONSULTAS_REPOSITORIO, INDICES, INDICES_RETIRADOS,
+                                         asegurar_indices, verificar_planes)
+
+
+def test_consultas_sobre_colecciones_con_indices():
+    for descripcion, coleccion, *_ in CONSULTAS_REPOSITORIO:
+        assert coleccion in INDICES, descripcion
+
+
+def test_indices_retirados_no_se_declaran():
+    for coleccion, nombres in INDICES_RETIRADOS.items():
+        declarados = {modelo.document['name'] for modelo in INDICES.get(coleccion, [])}
+        assert not declarados & set(nombres)
+
+
+def test_consultas_del_repositorio_usan_indice(mongo_db):
+    sin_indice = [(descripcion, etapas) for descripcion, usa_indice, etapas in verificar_planes(mongo_db)
+                  if not usa_indice]
+    assert sin_indice == []
+
+
+def test_asegurar_indices_es_idempotente_y_elimina_retirados(mongo_db):
+    mongo_db.students.create_index([('correo', 1), ('_id', 1)], name='listado_correo')
+
+    reporte = asegurar_indices(mongo_db)
+    assert reporte['eliminados'] == ['students.listado_correo']
+    assert reporte['creados'] == [] and reporte['diferencias'] == [] and reporte['errores'] == []
+
+    reporte = asegurar_indices(mongo_db)
+    assert reporte == {'creados': [], 'eliminados': [], 'diferencias': [], 'errores': []}
@@ -0,0 +1,77 @@
+# tests/test_inscripcion.py
+"""Inscripción de un aspirante: nada de asientos si no se guardó, y asientos devueltos si no se asignaron."""
+import pytest
+
+from sipu.application.services import SipuService
+from sipu.infrastructure.memory_repository import InMemorySipuRepository
+
+
+@pytest.fixture
+def repositorio():
+    repositorio = InMemorySipuRepository()
+    assert repositorio.crear_examen({'id': 'ex1', 'periodo': '2025-1', 'carrera': 'is', 'jornada': 'matutina',
+                                     'fecha': '2025-03-01', 'estado': 'Activo'})
+    assert repositorio.publicar_distribucion('ex1', 'd1', [], ocupacion=[
+        {'lab_id': 'lab1', 'lab_nombre': 'Laboratorio 1', 'sede': 'principal', 'capacidad': 5, 'ocupados': 0}])
+    for n, dni in ((1, '1111111111'), (2, None)):
+        assert repositorio.crear_usuario({'nombre': f'Aspirante {n}', 'correo': f'a{n}@sipu.test',
+                                          'contrasena': 'clave', 'rol': 'aspirante', 'estado': 'Incompleto',
+                                          'dni': dni})
+    return repositorio
+
+
+def _formulario(correo: str, dni: str) -> dict:
+    return {'correo': correo, 'dni': dni, 'periodo': '2025-1', 'carrera': 'is',
+            'jornada': 'matutina', 'sede': 'principal'}
+
+
+def test_inscripcion_asigna_el_siguiente_asiento(repositorio):
+    exito, mensaje = SipuService(repositorio).procesar_inscripcion(_formulario('a2@sipu.test', '2222222222'))
+    assert exito and 'computadora 1' in mensaje
+    assert repositorio.obtener_aspirante_por_correo('a2@sipu.test').estado == 'Inscrito'
+    assert repositorio.obtener_ocupacion('ex1')[0]['ocupados'] == 1
+
+
+def test_inscripcion_que_no_se_guarda_no_toma_asiento(repositorio):
+    exito, _ = SipuService(repositorio).procesar_inscripcion(_formulario('a2@sipu.test', '1111111111'))
+    assert not exito
+    assert repositorio.obtener_aspirante_por_correo('a2@sipu.test').estado == 'Incompleto'
+    assert repositorio.obtener_ocupacion('ex1')[0]['ocupados'] == 0
+    assert repositorio.obtener_asignaciones_por_aspirante('a2@sipu.test') == []
+
+
+def test_asiento_sin_asignacion_se_devuelve(repositorio, monkeypatch):
+    monkeypatch.setattr(repositorio, 'crear_asignacion_examen', lambda asignacion: False)
+    exito, mensaje = SipuService(repositorio).procesar_inscripcion(_formulario('a2@sipu.test', '2222222222'))
+    assert exito and 'próxima distribución' in mensaje
+    assert repositorio.obtener_ocupacion('ex1')[0]['ocupados'] == 0
+
+
+def test_con_mapa_de_identidad_el_dni_repetido_falla_antes_de_tomar_asiento(repositorio):
+    from sipu.infrastructure.mapa_identidad import MapaIdentidad
+
+    mapa = MapaIdentidad(repositorio)
+    exito, _ = SipuService(mapa).procesar_inscripcion(_formulario('a2@sipu.test', '1111111111'))
+    assert not exito
+    # El mapa ya no tiene el objeto con los cambios rechazados
+    assert mapa.obtener_aspirante_por_correo('a2@sipu.test').estado == 'Incompleto'
+    assert mapa.obtener_aspirante_por_dni('1111111111').correo == 'a1@sipu.test'
+    assert repositorio.obtener_ocupacion('ex1')[0]['ocupados'] == 0
+    assert repositorio.obtener_asignaciones_por_aspirante('a2@sipu.test') == []
+
+
+def test_mapa_de_identidad_olvida_al_aspirante_invalido(repositorio):
+    from sipu.infrastructure.mapa_identidad import MapaIdentidad
+
+    mapa = MapaIdentidad(repositorio)
+    aspirante = mapa.obtener_aspirante_por_correo('a1@sipu.test')
+    aspirante.estado = 'Desconocido'
+    assert not mapa.guardar_aspirante(aspirante)
+    assert mapa.obtener_aspirante_por_correo('a1@sipu.test').estado == 'Incompleto'
+    assert mapa.obtener_aspirante_crudo_por_correo('a1@sipu.test')['estado'] == 'Incompleto'
+
+    aspirante = mapa.obtener_aspirante_por_correo('a1@sipu.test')
+    aspirante.dni = '3333333333'
+    assert mapa.guardar_aspirante(aspirante)
+    assert mapa.obtener_aspirante_por_dni('1111111111') is None
+    assert mapa.obtener_aspirante_por_dni('3333333333') is aspirante
@@ -0,0 +1,74 @@
+# tests/test_metricas.py
+"""Métricas de /metrics: suma de varios procesos y atribución de la escritura final de la petición."""
+import json
+import os
+
+import pytest
+
+from sipu.infrastructure.metricas import (Metricas, limpiar_directorio_metricas,
+                                          retirar_proceso_metricas)
+
+
+@pytest.fixture
+def metricas(tmp_path):
+    metricas = Metricas()
+    metricas.reiniciar()
+    metricas.configurar_directorio(str(tmp_path))
+    try:
+        yield metricas
+    finally:
+        metricas.configurar_directorio(None)
+        metricas.reiniciar()
+
+
+def _valor(texto: str, serie: str) -> str:
+    return next(linea.rsplit(' ', 1)[1] for linea in texto.splitlines() if linea.startswith(serie + ' '))
+
+
+def _otro_worker(metricas, directorio, pid):
+    """Simula la instantánea de otro proceso con una petición, dos comandos y una conexión en uso."""
+    metricas.reiniciar()
+    metricas.observar_peticion('/', 'GET', 200, 0.02, 2)
+    metricas.observar_comando('/', 'students', 'find', 3, 0.01)
+    metricas.observar_comando('/', 'students', 'find', 1, 0.01)
+    metricas.ajustar_pool('db:27017', max=10, abiertas=1, en_uso=1)
+    with open(os.path.join(directorio, f"sipu_{pid}.json"), 'w', encoding='utf-8') as f:
+        json.dump(metricas._estado(), f)
+    metricas.reiniciar()
+
+
+def test_exportar_suma_todos_los_procesos(metricas, tmp_path):
+    _otro_worker(metricas, str(tmp_path), 999999)
+    metricas.observar_peticion('/', 'GET', 200, 0.02, 1)
+    metricas.observar_comando('/', 'students', 'find', 2, 0.01)
+    metricas.ajustar_pool('db:27017', max=10, abiertas=1)
+
+    texto = metricas.exportar()
+    assert _valor(texto, 'sipu_http_request_duration_seconds_count{endpoint="/",metodo="GET",estado="200"}') == '2'
+    assert _valor(texto, 'sipu_mongo_comandos_total{endpoint="/",coleccion="students",comando="find"}') == '3'
+    assert _valor(texto, 'sipu_mongo_documentos_devueltos_total{endpoint="/",coleccion="students",comando="find"}') == '6'
+    assert _valor(texto, 'sipu_mongo_pool_conexiones_abiertas{servidor="db:27017"}') == '2'
+
+    # El worker terminó: sus contadores siguen sumando, sus conexiones ya no
+    retirar_proceso_metricas(str(tmp_path), 999999)
+    texto = metricas.exportar()
+    assert _valor(texto, 'sipu_mongo_comandos_total{endpoint="/",coleccion="students",comando="find"}') == '3'
+    assert _valor(texto, 'sipu_mongo_pool_conexiones_abiertas{servidor="db:27017"}') == '1'
+
+    limpiar_directorio_metricas(str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_teardown_de_metricas_corre_despues_del_cierre_de_la_peticion():
+    from config import DevelopmentConfig
+    from sipu import create_app
+    from sipu.infrastructure.memory_repository import InMemorySipuRepository
+
+    class C(DevelopmentConfig):
+        SESION_ALMACEN = 'cookie'
+        TESTING = True
+
+    app = create_app(C, fabrica_repositorio=InMemorySipuRepository)
+    nombres = [funcion.__name__ for funcion in app.teardown_request_funcs[None]]
+    # Flask los ejecuta en orden inverso al de registro
+    assert nombres.index('_terminar_medicion') < nombres.index('cerrar_mapa_identidad')
@@ -0,0 +1,26 @@
+# tests/test_modelos.py
+"""Todos los modelos del dominio se rehidratan desde documentos."""
+import inspect
+
+import pytest
+
+from sipu.domain import models
+from sipu.domain.models import Evaluacion, Modelo, Universidad
+
+
+def test_modelo_es_abstracto():
+    with pytest.raises(TypeError):
+        Modelo()
+
+
+def test_todos_los_modelos_implementan_desde_documento():
+    # Solo las bases quedan abstractas; cualquier otro modelo sin desde_documento aparecería aquí
+    abstractos = {clase for _, clase in inspect.getmembers(models, inspect.isclass)
+                  if issubclass(clase, Modelo) and inspect.isabstract(clase)}
+    assert abstractos == {Modelo, models.Usuario}
+
+
+def test_universidad_y_evaluacion_desde_documentos():
+    universidades = Universidad.desde_documentos([{'nombre': 'UNL', 'sedes': ['norte', 'sur']}])
+    assert (universidades[0].nombre, universidades[0].sedes) == ('UNL', ['norte', 'sur'])
+    assert Evaluacion.desde_documentos([{'nota': 18, 'tiempo_evaluacion': 90}])[0].nota == 18
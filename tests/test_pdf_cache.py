@@ -0,0 +1,65 @@
+# tests/test_pdf_cache.py
+"""Caché de PDFs en disco: límite de tamaño compartido por los procesos y desalojo LRU."""
+import io
+import os
+
+import pytest
+
+from sipu.infrastructure.pdf_cache import CachePDF
+
+
+def _antiguedad(cache, clave, segundos):
+    """Fecha de uso fija: el orden LRU de la prueba no depende de la resolución del reloj."""
+    ruta = cache._ruta(clave)
+    os.utime(ruta, (1_000_000 + segundos, 1_000_000 + segundos))
+
+
+def test_desaloja_los_menos_usados(tmp_path):
+    cache = CachePDF(directorio=str(tmp_path), max_bytes=250)
+    for n, clave in enumerate('abc'):
+        cache.obtener_o_generar(clave, lambda: b'x' * 100).close()
+        _antiguedad(cache, clave, n)
+    # 'c' entró con 300 bytes en total: se desalojó el menos usado
+    assert sorted(os.listdir(tmp_path)) == ['b.pdf', 'c.pdf']
+
+    # Usar 'b' lo vuelve el más reciente: el próximo desalojo se lleva a 'c'
+    cache.obtener_o_generar('b', lambda: pytest.fail('debía estar en caché')).close()
+    cache.obtener_o_generar('d', lambda: b'x' * 100).close()
+    assert sorted(os.listdir(tmp_path)) == ['b.pdf', 'd.pdf']
+    assert cache.tamano_total() == 200
+
+
+def test_el_limite_es_uno_para_todos_los_procesos(tmp_path):
+    # Dos instancias sobre el mismo directorio = dos workers
+    uno = CachePDF(directorio=str(tmp_path), max_bytes=250)
+    otro = CachePDF(directorio=str(tmp_path), max_bytes=250)
+    for n, (cache, clave) in enumerate(((uno, 'a'), (otro, 'b'), (uno, 'c'), (otro, 'd'))):
+        cache.obtener_o_generar(clave, lambda: b'x' * 100).close()
+        _antiguedad(cache, clave, n)
+    assert uno.tamano_total() <= 250
+    assert sorted(os.listdir(tmp_path)) == ['c.pdf', 'd.pdf']
+
+
+def test_sirve_desde_memoria_si_otro_proceso_lo_desaloja(tmp_path, monkeypatch):
+    cache = CachePDF(directorio=str(tmp_path), max_bytes=1000)
+    monkeypatch.setattr(cache, '_desalojar', lambda conservar: os.remove(conservar))
+    archivo = cache.obtener_o_generar('a', lambda: b'%PDF-1.4')
+    assert isinstance(archivo, io.BytesIO) and archivo.read() == b'%PDF-1.4'
+
+
+def test_cierra_el_archivo_si_falla_marcar_uso(tmp_path, monkeypatch):
+    cache = CachePDF(directorio=str(tmp_path), max_bytes=1000)
+    cache.obtener_o_generar('a', lambda: b'%PDF-1.4').close()
+    abiertos = []
+    abrir = open
+
+    def abrir_y_anotar(*args, **kwargs):
+        archivo = abrir(*args, **kwargs)
+        abiertos.append(archivo)
+        return archivo
+
+    monkeypatch.setattr('builtins.open', abrir_y_anotar)
+    monkeypatch.setattr(cache, '_marcar_uso', lambda ruta: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        cache.obtener_o_generar('a', lambda: b'')
+    assert abiertos and all(archivo.closed for archivo in abiertos)
@@ -0,0 +1,78 @@
+# tests/test_sesiones.py
+"""Sesiones del lado del servidor sobre SQLite: almacén y cookie con solo el identificador firmado."""
+import time
+
+import pytest
+
+from sipu.infrastructure.sesiones import AlmacenSesionesSQLite, crear_almacen
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenSesionesSQLite(str(tmp_path / 'sesiones.sqlite3'))
+
+
+def test_almacen_sqlite_guarda_carga_y_elimina(almacen):
+    expira = time.time() + 60
+    assert almacen.guardar('sid1', {'user': 'Ana', 'rol': 'aspirante'}, expira)
+    assert almacen.cargar('sid1') == ({'user': 'Ana', 'rol': 'aspirante'}, expira)
+
+    assert almacen.eliminar('sid1')
+    assert almacen.cargar('sid1') is None
+
+
+def test_almacen_sqlite_ignora_sesiones_vencidas(almacen):
+    almacen.guardar('vieja', {'user': 'Ana'}, time.time() - 1)
+    assert almacen.cargar('vieja') is None
+
+
+def test_almacen_sqlite_se_comparte_entre_instancias(tmp_path):
+    # Dos workers del mismo nodo abren el mismo archivo
+    ruta = str(tmp_path / 'sesiones.sqlite3')
+    AlmacenSesionesSQLite(ruta).guardar('sid1', {'user': 'Ana'}, time.time() + 60)
+    assert AlmacenSesionesSQLite(ruta).cargar('sid1')[0] == {'user': 'Ana'}
+
+
+def test_crear_almacen_segun_configuracion(tmp_path):
+    assert crear_almacen({'SESION_ALMACEN': 'cookie'}) is None
+    assert crear_almacen({}) is None
+    almacen = crear_almacen({'SESION_ALMACEN': 'SQLite', 'SESION_SQLITE_RUTA': str(tmp_path / 's.db')})
+    assert isinstance(almacen, AlmacenSesionesSQLite)
+
+
+def test_cookie_lleva_solo_el_identificador_y_el_logout_borra_la_sesion(tmp_path):
+    from config import DevelopmentConfig
+    from sipu import create_app
+    from sipu.infrastructure.memory_repository import InMemorySipuRepository
+
+    class C(DevelopmentConfig):
+        SESION_ALMACEN = 'sqlite'
+        SESION_SQLITE_RUTA = str(tmp_path / 'sesiones.sqlite3')
+        TESTING = True
+
+    app = create_app(C, fabrica_repositorio=InMemorySipuRepository)
+    almacen = app.session_interface.almacen
+
+    @app.route('/_prueba/entrar')
+    def entrar():
+        from flask import session
+        session['user'] = 'Ana'
+        session.regenerar()
+        return ''
+
+    @app.route('/_prueba/salir')
+    def salir():
+        from flask import session
+        session.clear()
+        return ''
+
+    cliente = app.test_client()
+    cliente.get('/_prueba/entrar')
+    cookie = cliente.get_cookie(app.config['SESSION_COOKIE_NAME'])
+    sid = cookie.value.rsplit('.', 1)[0]
+    assert 'Ana' not in cookie.value
+    assert almacen.cargar(sid)[0] == {'user': 'Ana'}
+
+    cliente.get('/_prueba/salir')
+    assert almacen.cargar(sid) is None
+    assert cliente.get_cookie(app.config['SESSION_COOKIE_NAME']) is None
@@ -0,0 +1,30 @@
+# tests/test_token_listado.py
+"""Token de paginación del listado: lo envía el cliente, así que solo se aceptan valores simples."""
+import base64
+import json
+
+import pytest
+
+from sipu.application.services import SipuService
+
+
+def _token(*partes) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(partes)).encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('valor', ['Ana', 3, 2.5, None])
+def test_token_valido_ida_y_vuelta(valor):
+    token = SipuService._codificar_token(valor, '65a1b2c3d4e5f60718293a4b')
+    assert SipuService._decodificar_token(token) == (valor, '65a1b2c3d4e5f60718293a4b')
+
+
+@pytest.mark.parametrize('token', [
+    _token({'$ne': None}, '65a1b2c3d4e5f60718293a4b'),
+    _token(['Ana'], '65a1b2c3d4e5f60718293a4b'),
+    _token(True, '65a1b2c3d4e5f60718293a4b'),
+    _token('Ana', {'$gt': ''}),
+    _token('Ana'),
+    'no-es-base64!',
+])
+def test_token_alterado_se_rechaza(token):
+    assert SipuService._decodificar_token(token) is None
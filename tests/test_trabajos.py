@@ -0,0 +1,76 @@
+# tests/test_trabajos.py
+"""Ejecutor de trabajos en segundo plano: escrituras de progreso y trabajos huérfanos."""
+import threading
+
+from sipu.infrastructure.memory_repository import InMemorySipuRepository
+from sipu.infrastructure.trabajos import COMPLETADO, EN_EJECUCION, FALLIDO, EjecutorTrabajos
+
+
+def test_progreso_escribe_los_avances_grandes_aunque_sean_seguidos():
+    repositorio = InMemorySipuRepository()
+    assert repositorio.crear_trabajo({'id': 't1', 'estado': EN_EJECUCION, 'progreso': 0})
+    escritos = []
+    actualizar = repositorio.actualizar_trabajo
+    repositorio.actualizar_trabajo = lambda trabajo_id, cambios: escritos.append(cambios['progreso']) or \
+        actualizar(trabajo_id, cambios)
+
+    progreso = EjecutorTrabajos(repositorio)._reportador('t1')
+    for porcentaje in (5, 10, 12, 50, 51, 100):
+        progreso(porcentaje)
+
+    # Todo ocurre dentro del mismo segundo: solo pasan la primera y los saltos de 10 o más
+    assert escritos == [5, 50, 100]
+    assert repositorio.obtener_trabajo('t1')['progreso'] == 100
+
+
+def test_al_crear_el_pool_marca_los_trabajos_huerfanos():
+    repositorio = InMemorySipuRepository()
+    assert repositorio.crear_trabajo({'id': 'huerfano', 'estado': EN_EJECUCION,
+                                      'creado': '2025-01-01T09:00:00', 'latido': '2025-01-01T09:00:00'})
+    ejecutor = EjecutorTrabajos(repositorio, hilos=1)
+    terminado = threading.Event()
+
+    def tarea(progreso):
+        terminado.wait(5)
+        return True, 'Listo'
+
+    try:
+        trabajo_id = ejecutor.encolar('prueba', 'Prueba', tarea)
+        assert repositorio.obtener_trabajo('huerfano')['estado'] == FALLIDO
+        # El trabajo recién encolado tiene latido actual: no es huérfano
+        assert ejecutor._activos == {trabajo_id}
+        ejecutor._marcar_huerfanos()
+        assert repositorio.obtener_trabajo(trabajo_id)['estado'] != FALLIDO
+    finally:
+        terminado.set()
+        ejecutor.cerrar()
+    assert repositorio.obtener_trabajo(trabajo_id)['estado'] == COMPLETADO
+    assert ejecutor._activos == set()
+
+
+def test_trabajo_deja_de_latir_aunque_falle_la_base_de_datos():
+    repositorio = InMemorySipuRepository()
+    ejecutor = EjecutorTrabajos(repositorio, hilos=1)
+    actualizar = repositorio.actualizar_trabajo
+
+    def actualizar_con_fallo(trabajo_id, cambios):
+        if cambios.get('estado') == EN_EJECUCION:
+            raise ConnectionError('MongoDB no responde')
+        return actualizar(trabajo_id, cambios)
+
+    repositorio.actualizar_trabajo = actualizar_con_fallo
+    try:
+        trabajo_id = ejecutor.encolar('prueba', 'Prueba', lambda progreso: (True, 'Listo'))
+    finally:
+        ejecutor.cerrar()
+    assert repositorio.obtener_trabajo(trabajo_id)['estado'] == FALLIDO
+    assert ejecutor._activos == set()
+
+    # Tampoco si falla la escritura del estado final
+    ejecutor = EjecutorTrabajos(repositorio, hilos=1)
+    repositorio.actualizar_trabajo = lambda trabajo_id, cambios: 1 / 0
+    try:
+        ejecutor.encolar('prueba', 'Prueba', lambda progreso: (True, 'Listo'))
+    finally:
+        ejecutor.cerrar()
+    assert ejecutor._activos == set()
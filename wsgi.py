@@ -0,0 +1,13 @@
+# refactorizacion/wsgi.py
+"""
+Punto de entrada para producción con varios procesos:
+    gunicorn -c gunicorn.conf.py wsgi:app
+create_app() no abre conexiones ni pools al importar: cada worker crea los suyos al primer uso.
+Usa la configuración de producción salvo que SIPU_CONFIG indique otra.
+"""
+import os
+
+from config import obtener_configuracion
+from sipu import create_app
+
+app = create_app(obtener_configuracion(os.environ.get('SIPU_CONFIG', 'production')))